@@ -1,20 +1,32 @@
 
 # Imports
-from typing import Optional, Annotated
+import time
+
+# Everything below is timed for the startup report
+IMPORT_STARTED_AT: float = time.perf_counter()
+
+from typing import Optional, Annotated, AsyncIterator, Callable
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from bittensor.core.settings import SS58_FORMAT
-from bittensor.utils import is_valid_bittensor_address_or_public_key
-from bittensor.core.chain_data import decode_account_id
-from async_substrate_interface import AsyncSubstrateInterface
-from tao_redis import TaoRedis
-from tao_celery import celery_instance
-from tao_tests import TaoTests
-from tao_db import TaoDB, TaoDB_Dividend_Requests
-from decouple import config
-from datetime import datetime
+from tao_redis import TaoRedis, trade_trigger_key
+from tao_local_cache import TaoLocalCache
+from tao_serializer import TaoSerializer, TaoJSONResponse, json_dumps
+from tao_substrate import TaoSubstratePool
+from tao_singleflight import TaoSingleFlight
+from tao_scanner import TaoDividendScanner
+from tao_snapshot import TaoDividendSnapshots
+from tao_history import TaoDividendHistory
+from tao_sentiment_stats import TaoSentimentStats, ROLLUP_PERIODS
+from tao_startup import TaoStartupReport
+from tao_db import TaoDB
+from tao_audit import TaoAuditLog
+from decouple import config, Csv
+from datetime import datetime, timedelta
 import asyncio
-import uvicorn
+import importlib
+import uuid
 import logging
 
 # Configuration
@@ -26,29 +38,94 @@ EXAMPLE_TOKEN: str = "fake-token"
 REDIS_HOST: str = config("REDIS_HOST", default="localhost")
 REDIS_PORT: int = config("REDIS_PORT", default=6379)
 REDIS_DB: int = config("REDIS_DB", default=0)
+REDIS_MAX_CONNECTIONS: int = config("REDIS_MAX_CONNECTIONS", default=64, cast=int)
 DATURA_API_KEY: str = config("DATURA_API_KEY")
 CHUTES_API_KEY: str = config("CHUTES_API_KEY")
+SUBSTRATE_ENDPOINTS: list[str] = config("SUBSTRATE_ENDPOINTS", default="wss://entrypoint-finney.opentensor.ai:443", cast=Csv())
+SUBSTRATE_CONNECTIONS_PER_ENDPOINT: int = config("SUBSTRATE_CONNECTIONS_PER_ENDPOINT", default=1, cast=int)
+SUBSTRATE_MAX_CONCURRENCY_PER_CONNECTION: int = config("SUBSTRATE_MAX_CONCURRENCY_PER_CONNECTION", default=32, cast=int)
+SUBSTRATE_HEALTH_CHECK_INTERVAL_SECONDS: float = config("SUBSTRATE_HEALTH_CHECK_INTERVAL_SECONDS", default=15, cast=float)
+SCANNER_CONCURRENCY: int = config("SCANNER_CONCURRENCY", default=8, cast=int)
+SCANNER_NETUID_TIMEOUT_SECONDS: float = config("SCANNER_NETUID_TIMEOUT_SECONDS", default=30, cast=float)
+SCANNER_NETUID_RETRIES: int = config("SCANNER_NETUID_RETRIES", default=2, cast=int)
+SNAPSHOT_REFRESHER_ENABLED: bool = config("SNAPSHOT_REFRESHER_ENABLED", default=True, cast=bool)
+SNAPSHOT_POLL_INTERVAL_SECONDS: float = config("SNAPSHOT_POLL_INTERVAL_SECONDS", default=6, cast=float)
+SNAPSHOT_MAX_AGE_BLOCKS: int = config("SNAPSHOT_MAX_AGE_BLOCKS", default=360, cast=int)
+AUDIT_QUEUE_SIZE: int = config("AUDIT_QUEUE_SIZE", default=10000, cast=int)
+AUDIT_BATCH_SIZE: int = config("AUDIT_BATCH_SIZE", default=500, cast=int)
+AUDIT_FLUSH_INTERVAL_SECONDS: float = config("AUDIT_FLUSH_INTERVAL_SECONDS", default=2, cast=float)
+MAX_HOTKEYS_PER_REQUEST: int = config("MAX_HOTKEYS_PER_REQUEST", default=64, cast=int)
+DEFAULT_PAGE_SIZE: int = config("DEFAULT_PAGE_SIZE", default=100, cast=int)
+MAX_PAGE_SIZE: int = config("MAX_PAGE_SIZE", default=1000, cast=int)
+LOCAL_CACHE_MAX_ENTRIES: int = config("LOCAL_CACHE_MAX_ENTRIES", default=4096, cast=int)
+LOCAL_CACHE_TTL_SECONDS: float = config("LOCAL_CACHE_TTL_SECONDS", default=5, cast=float)
+REDIS_SERIALIZER: str = config("REDIS_SERIALIZER", default="json")
+REDIS_COMPRESSION: bool = config("REDIS_COMPRESSION", default=False, cast=bool)
+REDIS_COMPRESSION_MIN_BYTES: int = config("REDIS_COMPRESSION_MIN_BYTES", default=1024, cast=int)
+TRADE_TRIGGER_TIMEOUT_SECONDS: int = config("TRADE_TRIGGER_TIMEOUT_SECONDS", default=900, cast=int)
+SELF_TESTS_ENABLED: bool = config("SELF_TESTS_ENABLED", default=False, cast=bool)
+HISTORY_ENABLED: bool = config("HISTORY_ENABLED", default=True, cast=bool)
+HISTORY_INGEST_INTERVAL_SECONDS: float = config("HISTORY_INGEST_INTERVAL_SECONDS", default=600, cast=float)
+HISTORY_RETENTION_DAYS: int = config("HISTORY_RETENTION_DAYS", default=90, cast=int)
+HISTORY_BATCH_SIZE: int = config("HISTORY_BATCH_SIZE", default=5000, cast=int)
+HISTORY_DEFAULT_BUCKET_SECONDS: int = config("HISTORY_DEFAULT_BUCKET_SECONDS", default=3600, cast=int)
+HISTORY_MAX_BUCKETS: int = config("HISTORY_MAX_BUCKETS", default=2000, cast=int)
+HISTORY_MAX_POINTS: int = config("HISTORY_MAX_POINTS", default=20000, cast=int)
+SENTIMENT_STATS_MAX_BUCKETS: int = config("SENTIMENT_STATS_MAX_BUCKETS", default=744, cast=int)
+# Imported by the warm-up instead of at module load, bittensor alone takes about a second
+DEFERRED_MODULES: list[str] = ["bittensor.utils", "bittensor.core.chain_data", "async_substrate_interface", "tao_celery_app"]
 
 # Configure Logger
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
-# Utils
-async def exhaust(qmr):
-    r = []
-    async for k, v in await qmr:
-        r.append((k, v))
-    return r
-
 # Logic
+tao_startup_instance: TaoStartupReport = TaoStartupReport(IMPORT_STARTED_AT)
 tao_db_instance: TaoDB = TaoDB()
-tao_redis_instance: TaoRedis = TaoRedis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
-tao_tests_instance: TaoTests = TaoTests()
+tao_audit_instance: TaoAuditLog = TaoAuditLog(tao_db_instance, queue_size=AUDIT_QUEUE_SIZE, batch_size=AUDIT_BATCH_SIZE, flush_interval=AUDIT_FLUSH_INTERVAL_SECONDS)
+tao_local_cache_instance: TaoLocalCache = TaoLocalCache(max_entries=LOCAL_CACHE_MAX_ENTRIES, ttl=LOCAL_CACHE_TTL_SECONDS)
+tao_serializer_instance: TaoSerializer = TaoSerializer(format=REDIS_SERIALIZER, compression=REDIS_COMPRESSION, compression_min_bytes=REDIS_COMPRESSION_MIN_BYTES)
+tao_redis_instance: TaoRedis = TaoRedis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB, max_connections=REDIS_MAX_CONNECTIONS, local_cache=tao_local_cache_instance, serializer=tao_serializer_instance)
+tao_singleflight_instance: TaoSingleFlight = TaoSingleFlight(tao_redis_instance)
+substrate_pool: TaoSubstratePool = TaoSubstratePool(
+    endpoints=SUBSTRATE_ENDPOINTS,
+    connections_per_endpoint=SUBSTRATE_CONNECTIONS_PER_ENDPOINT,
+    max_concurrency_per_connection=SUBSTRATE_MAX_CONCURRENCY_PER_CONNECTION,
+    health_check_interval=SUBSTRATE_HEALTH_CHECK_INTERVAL_SECONDS
+)
+tao_scanner_instance: TaoDividendScanner = TaoDividendScanner(
+    substrate_pool,
+    concurrency=SCANNER_CONCURRENCY,
+    netuid_timeout=SCANNER_NETUID_TIMEOUT_SECONDS,
+    netuid_retries=SCANNER_NETUID_RETRIES
+)
+tao_sentiment_stats_instance: TaoSentimentStats = TaoSentimentStats(tao_db_instance)
+tao_history_instance: TaoDividendHistory = TaoDividendHistory(
+    tao_db_instance,
+    ingest_interval=HISTORY_INGEST_INTERVAL_SECONDS,
+    retention_days=HISTORY_RETENTION_DAYS,
+    batch_size=HISTORY_BATCH_SIZE
+)
+tao_snapshots_instance: TaoDividendSnapshots = TaoDividendSnapshots(
+    tao_redis_instance,
+    tao_scanner_instance,
+    poll_interval=SNAPSHOT_POLL_INTERVAL_SECONDS,
+    max_age_blocks=SNAPSHOT_MAX_AGE_BLOCKS,
+    history=tao_history_instance if HISTORY_ENABLED else None
+)
+
+def is_valid_hotkey(hotkey: str) -> bool:
+    """Checks that a hotkey is a valid SS58 address or public key.
+
+    Args:
+        hotkey (str): The hotkey to check.
 
-# Run Tests
-tao_tests_instance.run_all_tests()
+    Returns:
+        bool: True if the hotkey is valid, False otherwise.
+    """
+    from bittensor.utils import is_valid_bittensor_address_or_public_key
 
-substrate: AsyncSubstrateInterface = AsyncSubstrateInterface("wss://entrypoint-finney.opentensor.ai:443", ss58_format=SS58_FORMAT)
+    return is_valid_bittensor_address_or_public_key(hotkey)
 
 async def get_total_networks() -> int:
     """Fetches the total number of networks from the blockchain.
@@ -58,15 +135,16 @@ async def get_total_networks() -> int:
     Returns:
         int: The total number of networks.
     """
-    cached_total_networks = tao_redis_instance.get_total_networks()
+    cached_total_networks = await tao_redis_instance.get_total_networks()
 
     if cached_total_networks is not None:
         return cached_total_networks
 
-    async with substrate:
+    async with substrate_pool.connection() as substrate:
         total_networks = (await substrate.query( module="SubtensorModule", storage_function="TotalNetworks" )).value
-        tao_redis_instance.set_total_networks(total_networks)
-        return total_networks
+
+    await tao_redis_instance.set_total_networks(total_networks)
+    return total_networks
 
 async def get_tao_dividends_per_subnet(netuid: int, hotkey: str) -> dict[str, float]:
     """Fetches dividends value from our specified netuid and hotkey.
@@ -78,7 +156,7 @@ async def get_tao_dividends_per_subnet(netuid: int, hotkey: str) -> dict[str, fl
     Returns:
         dict[str, float]: The total dividend value for specified netuid and hotkey.
     """
-    async with substrate:
+    async with substrate_pool.connection() as substrate:
         result = await substrate.query("SubtensorModule", "TaoDividendsPerSubnet", [netuid, hotkey])
         return { hotkey: float(result.value) }
 
@@ -91,7 +169,7 @@ async def get_tao_dividends_per_subnet_netuid(netuid: int) -> dict[str, float]:
     Returns:
         dict[str, float]: The total dividend value.
     """
-    async with substrate:
+    async with substrate_pool.connection() as substrate:
         block_hash = await substrate.get_chain_head()
 
         result = await substrate.query_map(
@@ -103,6 +181,8 @@ async def get_tao_dividends_per_subnet_netuid(netuid: int) -> dict[str, float]:
 
         dividend_results = {}
 
+        from bittensor.core.chain_data import decode_account_id
+
         async for k, v in result:
             hotkey: str = decode_account_id(k)
             dividend_results[hotkey] = v.value
@@ -111,6 +191,8 @@ async def get_tao_dividends_per_subnet_netuid(netuid: int) -> dict[str, float]:
 
 async def get_tao_dividends_per_subnet_all() -> dict[str, float]:
     """Fetches total dividends from all netuids.
+
+    Every netuid is scanned at the same block hash, and pages are merged into the total as they arrive.
     
     Args:
         None
@@ -118,34 +200,260 @@ async def get_tao_dividends_per_subnet_all() -> dict[str, float]:
     Returns:
         dict[str, float]: The total dividend value for all netuids.
     """
-    async with substrate:
-        block_hash = await substrate.get_chain_head()
+    total_networks: int = await get_total_networks()
+    block_hash, _ = await tao_scanner_instance.get_block()
 
-        total_networks: int = await get_total_networks()
+    total_dividends: dict[str, float] = {}
 
-        tasks = [
-            substrate.query_map(
-            module="SubtensorModule",
-            storage_function="TaoDividendsPerSubnet",
-            params=[netuid],
-                block_hash=block_hash
-            ) for netuid in range(1, total_networks + 1)
-        ]
-        tasks = [exhaust(task) for task in tasks]
+    async for _, page_dividends in tao_scanner_instance.scan(range(1, total_networks + 1), block_hash):
+        for hotkey, dividends in page_dividends.items():
+            total_dividends[hotkey] = total_dividends.get(hotkey, 0) + dividends
+
+    return total_dividends
+
+async def stream_tao_dividends_per_subnet_all(emit: Callable[[bytes], None]) -> dict[str, float]:
+    """Fetches dividends from all netuids, emitting them as NDJSON lines, one per page as soon as it arrives.
+
+    The first line describes the pinned block, each following line holds one page of a netuid, and the last line
+    marks the end of the stream. The merged total is cached once the scan completes. If the scan fails after the
+    first line, the response has already started, so a last `{"error": ...}` line takes the place of the end marker.
+
+    Args:
+        emit (Callable[[bytes], None]): Receives the next NDJSON line.
+
+    Returns:
+        dict[str, float]: The total dividend value for all netuids.
+    """
+    total_networks: int = await get_total_networks()
+    block_hash, block_number = await tao_scanner_instance.get_block()
+
+    emit(json_dumps({ "block_hash": block_hash, "block_number": block_number, "total_networks": total_networks }) + b"\n")
+
+    total_dividends: dict[str, float] = {}
+
+    try:
+        async for netuid, page_dividends in tao_scanner_instance.scan(range(1, total_networks + 1), block_hash):
+            for hotkey, dividends in page_dividends.items():
+                total_dividends[hotkey] = total_dividends.get(hotkey, 0) + dividends
+
+            emit(json_dumps({ "netuid": netuid, "dividends": page_dividends }) + b"\n")
+    except Exception as e:
+        logger.error(f"Streaming dividends failed: {e}")
+        emit(json_dumps({ "error": "Failed to fetch dividends" }) + b"\n")
+        raise
+
+    await tao_redis_instance.set_tao_dividends(total_dividends)
 
-        total_dividends: dict[str, float] = {}
+    emit(json_dumps({ "done": True, "hotkeys": len(total_dividends) }) + b"\n")
 
-        for future in asyncio.as_completed(tasks):
-            result = await future
-            for hotkey, dividends in result:
-                if hotkey not in total_dividends:
-                    total_dividends[hotkey] = 0
-                total_dividends[hotkey] += dividends
+    return total_dividends
 
-        return total_dividends
+async def prepend_line(first_line: bytes, lines: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yields a line that was already read from a stream, then the rest of the stream.
+
+    Args:
+        first_line (bytes): The line read from the stream.
+        lines (AsyncIterator[bytes]): The rest of the stream.
+
+    Yields:
+        bytes: The next NDJSON line.
+    """
+    yield first_line
+
+    async for line in lines:
+        yield line
+
+async def stream_tao_dividends_snapshot(latest: dict) -> AsyncIterator[bytes]:
+    """Streams dividends from all netuids of a published snapshot as NDJSON, in the same format as the live stream.
+
+    Args:
+        latest (dict): The `block_hash`/`block_number` of the snapshot.
+
+    Yields:
+        bytes: The next NDJSON line.
+    """
+    yield json_dumps({ "block_hash": latest["block_hash"], "block_number": latest["block_number"] }) + b"\n"
+
+    hotkeys: set[str] = set()
+
+    async for netuid, dividends in tao_snapshots_instance.stream_tao_dividends(latest):
+        hotkeys.update(dividends)
+        yield json_dumps({ "netuid": netuid, "dividends": dividends }) + b"\n"
+
+    yield json_dumps({ "done": True, "hotkeys": len(hotkeys) }) + b"\n"
+
+def encode_cursor(offset: int, snapshot_block: dict | None) -> str:
+    """Builds the cursor of the next page, pinning the snapshot the page came from.
+
+    Args:
+        offset (int): The offset of the next page.
+        snapshot_block (dict | None): The `block_hash`/`block_number` of the snapshot, or None if read from the cache.
+
+    Returns:
+        str: The cursor.
+    """
+    if snapshot_block is None:
+        return str(offset)
+
+    return f"{offset}:{snapshot_block['block_number']}:{snapshot_block['block_hash']}"
+
+def decode_cursor(cursor: str) -> tuple[int, dict | None]:
+    """Parses a cursor built by `encode_cursor`.
+
+    Args:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple[int, dict | None]: The offset and the pinned `block_hash`/`block_number`, if any.
+    """
+    try:
+        parts = cursor.split(":")
+
+        if len(parts) == 1:
+            return int(parts[0]), None
+
+        offset, block_number, block_hash = parts
+        return int(offset), { "block_hash": block_hash, "block_number": int(block_number) }
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def get_tao_dividends_page(netuid: Optional[int], offset: int, limit: int, min_dividend: Optional[float], descending: bool, pinned: dict | None) -> tuple[list[tuple[str, float]], int, bool, dict | None]:
+    """Fetches one page of hotkeys ranked by dividend value, from the sorted-set index of a snapshot or the cache.
+
+    Only when neither has the netuid are its dividends fetched from the chain, which also builds the index for the
+    next pages.
+
+    Args:
+        netuid (int | None): The netuid to rank the hotkeys of, or None for the aggregate of all netuids.
+        offset (int): How many ranked hotkeys to skip.
+        limit (int): How many ranked hotkeys to return at most.
+        min_dividend (float | None): The lowest dividend value to include, or None to include every hotkey.
+        descending (bool): Whether the highest dividend values come first.
+        pinned (dict | None): The snapshot block the previous page came from, if any.
+
+    Returns:
+        tuple[list[tuple[str, float]], int, bool, dict | None]: The page of (hotkey, dividend) pairs, the number of
+            hotkeys at or above `min_dividend`, whether it was cached and the snapshot block it came from.
+    """
+    snapshot_page = await tao_snapshots_instance.get_tao_dividends_page(netuid, offset, limit, min_dividend, descending, pinned)
+
+    if snapshot_page is not None:
+        page, total, snapshot_block = snapshot_page
+        return page, total, True, snapshot_block
+
+    cached_page = await tao_redis_instance.get_tao_dividends_page(netuid, offset, limit, min_dividend, descending)
+
+    if cached_page is not None:
+        return *cached_page, True, None
+
+    if netuid is not None:
+        dividends = await tao_singleflight_instance.get_tao_dividends(netuid, None, lambda: get_tao_dividends_per_subnet_netuid(netuid))
+    else:
+        dividends = await tao_singleflight_instance.get_tao_dividends(None, None, get_tao_dividends_per_subnet_all)
+
+    # Rank in-process this once, the index is there for the next page
+    ranked = sorted(
+        ((hotkey, dividend) for hotkey, dividend in dividends.items() if min_dividend is None or dividend >= min_dividend),
+        key=lambda entry: (entry[1], entry[0]),
+        reverse=descending
+    )
+
+    return ranked[offset:offset + limit], len(ranked), False, None
+
+async def trigger_trade(netuid: int, hotkey: Optional[str]) -> str:
+    """Sends the task to stake on a netuid, unless a trade on it is still in flight or within its debounce window.
+
+    Args:
+        netuid (int): The netuid to stake on.
+        hotkey (str | None): The hotkey to stake on, or None if the default hotkey.
+
+    Returns:
+        str: The ID of the newly sent task, or of the pending or recent task a duplicate trigger reuses.
+    """
+    task_id = str(uuid.uuid4())
+
+    try:
+        existing_task_id = await tao_redis_instance.claim_trade_trigger(netuid, hotkey, task_id, TRADE_TRIGGER_TIMEOUT_SECONDS)
+    except Exception as e:
+        # Better a duplicate trade than no trade at all
+        logger.warning(f"Trade trigger debounce failed, sending the task anyway: {e}")
+        existing_task_id = None
+
+    if existing_task_id is not None:
+        logger.info(f"Trade on netuid {netuid} is already in flight, reusing task ID {existing_task_id}.")
+        return existing_task_id
+
+    args = [netuid, hotkey] if hotkey is not None else [netuid]
+
+    from tao_celery_app import celery_instance
+
+    logger.info(f"Sending task to stake on netuid {netuid}" + (f" and hotkey {hotkey}." if hotkey is not None else "."))
+    celery_instance.send_task("tao_celery.sentiment_analysis_and_staking", args=args, kwargs={ "trigger_key": trade_trigger_key(netuid, hotkey) }, task_id=task_id)
+    logger.info(f"Task ID: {task_id}")
+
+    return task_id
+
+async def warm_up():
+    """Connects to the chain and runs the opt-in self-tests in the background, so the API binds without waiting on them.
+
+    Requests arriving before a substrate connection is up wait for one, `/ready` reports when the warm-up is done.
+    """
+    try:
+        # Off the event loop, so requests that do not need the chain are served meanwhile
+        with tao_startup_instance.step("deferred_imports"):
+            for module in DEFERRED_MODULES:
+                await asyncio.to_thread(importlib.import_module, module)
+    except Exception as e:
+        logger.error(f"Failed to import deferred modules on startup: {e}")
+
+    try:
+        with tao_startup_instance.step("substrate"):
+            await substrate_pool.start()
+
+        if SNAPSHOT_REFRESHER_ENABLED:
+            tao_snapshots_instance.start()
+    except Exception as e:
+        logger.error(f"Failed to connect to the chain on startup: {e}")
+
+    if SELF_TESTS_ENABLED:
+        try:
+            with tao_startup_instance.step("self_tests"):
+                # Only imported when enabled, the tests make live LLM calls and send a Celery task
+                from tao_tests import TaoTests
+                await asyncio.to_thread(TaoTests().run_all_tests)
+        except Exception as e:
+            logger.error(f"Self-tests failed: {e}")
+
+    tao_startup_instance.finish()
 
 # FastAPI
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tao_startup_instance.record("import", time.perf_counter() - IMPORT_STARTED_AT)
+
+    with tao_startup_instance.step("background_tasks"):
+        tao_audit_instance.start()
+        tao_redis_instance.start()
+
+        # Partitions are kept up where the history is ingested, outside of its transactions
+        if HISTORY_ENABLED and SNAPSHOT_REFRESHER_ENABLED:
+            tao_history_instance.start()
+
+    warm_up_task = asyncio.create_task(warm_up())
+
+    yield
+    warm_up_task.cancel()
+    await asyncio.gather(warm_up_task, return_exceptions=True)
+    await tao_snapshots_instance.close()
+    await tao_history_instance.close()
+    await substrate_pool.close()
+    await tao_redis_instance.close()
+    await tao_audit_instance.close()
+    await tao_db_instance.close()
+
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=TaoJSONResponse,
     title="Tao Dividends API",
     description="An API to fetch Tao dividends from the blockchain.",
     contact={
@@ -174,8 +482,19 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
 @app.get("/tao_dividends",
          tags=["tao"],
          summary="Fetch Tao dividends.",
-         response_description="Returns a JSON object with the dividends value.")
-async def tao_dividends(token: Annotated[str, Depends(oauth2_scheme)], netuid: Optional[int] = None, hotkey: Optional[str] = None, trade: Optional[bool] = False):
+         response_description="Returns a JSON object with the dividends value. With `stream` and no netuid, NDJSON lines instead, ending with a `done` line, or an `error` line if the scan failed after the first line.")
+async def tao_dividends(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    netuid: Optional[int] = None,
+    hotkey: Optional[str] = None,
+    trade: Optional[bool] = False,
+    stream: Optional[bool] = False,
+    limit: Optional[int] = None,
+    offset: Optional[int] = 0,
+    cursor: Optional[str] = None,
+    min_dividend: Optional[float] = None,
+    order: Optional[str] = "desc"
+):
     if token != EXAMPLE_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid token")
     
@@ -186,55 +505,187 @@ async def tao_dividends(token: Annotated[str, Depends(oauth2_scheme)], netuid: O
     
     if type(hotkey) is str and netuid is None:
         raise HTTPException(status_code=400, detail="Hotkey provided but no netuid")
+
+    # Several hotkeys of the same netuid can be fetched at once, comma-separated
+    hotkeys: list[str] | None = hotkey.split(",") if type(hotkey) is str else None
+
+    if hotkeys is not None and len(hotkeys) > MAX_HOTKEYS_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Too many hotkeys, at most {MAX_HOTKEYS_PER_REQUEST} allowed")
+
+    if hotkeys is not None and not all(is_valid_hotkey(hotkey) for hotkey in hotkeys):
+        raise HTTPException(status_code=400, detail="Invalid hotkey")
+
+    if trade and hotkeys is not None and len(hotkeys) > 1:
+        raise HTTPException(status_code=400, detail="Trade needs a single hotkey")
+
+    # Asking for a page, a cursor or a minimum switches to a ranked, paginated list served from the sorted-set index
+    paginated: bool = limit is not None or cursor is not None or min_dividend is not None
+
+    if paginated and hotkeys is not None:
+        raise HTTPException(status_code=400, detail="Pagination is only supported without a hotkey")
+
+    if limit is not None and (limit < 1 or limit > MAX_PAGE_SIZE):
+        raise HTTPException(status_code=400, detail=f"Invalid limit, must be between 1 and {MAX_PAGE_SIZE}")
+
+    if offset is None or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid offset")
+
+    if order not in ("desc", "asc"):
+        raise HTTPException(status_code=400, detail="Invalid order, must be desc or asc")
     
-    # Insert dividend request into DB
-    with tao_db_instance.session_handler() as session:
-        session.add(TaoDB_Dividend_Requests(
-            timestamp=datetime.now(),
-            netuid=netuid,
-            hotkey=hotkey,
-            trade=trade
-        ))
-        session.commit()
+    # Queue dividend request for the audit log
+    tao_audit_instance.record_dividend_request(netuid, hotkey[:255] if hotkey is not None else None, trade)
     
+    if paginated:
+        pinned: dict | None = None
+
+        if cursor is not None:
+            offset, pinned = decode_cursor(cursor)
+
+        page_size = limit if limit is not None else DEFAULT_PAGE_SIZE
+        page, total, cached, snapshot_block = await get_tao_dividends_page(netuid, offset, page_size, min_dividend, order == "desc", pinned)
+        next_offset = offset + len(page)
+
+        return TaoJSONResponse({
+            "netuid": netuid,
+            "hotkey": None,
+            "dividends": [{ "hotkey": hotkey, "dividend": dividend } for hotkey, dividend in page],
+            "total": total,
+            "next_cursor": encode_cursor(next_offset, snapshot_block) if next_offset < total else None,
+            "cached": cached,
+            "block_number": snapshot_block["block_number"] if snapshot_block is not None else None,
+            "stake_tx_triggered": trade,
+            "task_id": await trigger_trade(netuid, hotkey) if trade and netuid is not None else None
+        })
+
     cached: bool
     dividends: dict[str, float]
+    snapshot_block: dict | None = None
 
-    cached_dividend = tao_redis_instance.get_tao_dividends(netuid, hotkey)
+    snapshot = await tao_snapshots_instance.get_tao_dividends(netuid, hotkeys)
 
-    if cached_dividend is not None:
+    if snapshot is not None and stream and netuid is None:
+        return StreamingResponse(stream_tao_dividends_snapshot(snapshot[1]), media_type="application/x-ndjson")
+
+    if snapshot is not None:
         cached = True
-        dividends = cached_dividend
+        dividends, snapshot_block = snapshot
     else:
-        cached = False
-        if netuid is not None and hotkey is not None:
-            if not is_valid_bittensor_address_or_public_key(hotkey):
-                raise HTTPException(status_code=400, detail="Invalid hotkey")
-
-            dividends = await get_tao_dividends_per_subnet(netuid, hotkey)
-
-            if trade:
-                logger.info(f"Sending task to stake on netuid {netuid} and hotkey {hotkey}.")
-                task_id = celery_instance.send_task("tao_celery.sentiment_analysis_and_staking", args=[netuid, hotkey])
-                logger.info(f"Task ID: {task_id}")
-        elif netuid is not None:
-            dividends = await get_tao_dividends_per_subnet_netuid(netuid)
-
-            if trade:
-                logger.info(f"Sending task to stake on netuid {netuid}.")
-                task_id = celery_instance.send_task("tao_celery.sentiment_analysis_and_staking", args=[netuid])
-                logger.info(f"Task ID: {task_id}")
+        if hotkeys is not None:
+            cached_dividend = await tao_redis_instance.get_tao_dividends_hotkeys(netuid, hotkeys)
         else:
-            dividends = await get_tao_dividends_per_subnet_all()
-        
-        tao_redis_instance.set_tao_dividends(dividends, netuid, hotkey)
-
-    return {
+            cached_dividend = await tao_redis_instance.get_tao_dividends(netuid)
+
+        if cached_dividend is not None:
+            cached = True
+            dividends = cached_dividend
+        elif stream and netuid is None:
+            lines = tao_singleflight_instance.stream_tao_dividends(None, None, stream_tao_dividends_per_subnet_all)
+            # A scan that cannot start fails the request like the non-streaming path, before any status is sent
+            first_line: bytes = await anext(lines)
+            return StreamingResponse(prepend_line(first_line, lines), media_type="application/x-ndjson")
+        else:
+            cached = False
+            if netuid is not None and hotkeys is not None and len(hotkeys) == 1:
+                dividends = await tao_singleflight_instance.get_tao_dividends(netuid, hotkey, lambda: get_tao_dividends_per_subnet(netuid, hotkey))
+            elif netuid is not None and hotkeys is not None:
+                # One netuid-wide query is cheaper than a query per hotkey, and it fills the netuid hash for later lookups
+                netuid_dividends = await tao_singleflight_instance.get_tao_dividends(netuid, None, lambda: get_tao_dividends_per_subnet_netuid(netuid))
+                dividends = { hotkey: netuid_dividends.get(hotkey, 0.0) for hotkey in hotkeys }
+            elif netuid is not None:
+                dividends = await tao_singleflight_instance.get_tao_dividends(netuid, None, lambda: get_tao_dividends_per_subnet_netuid(netuid))
+            else:
+                dividends = await tao_singleflight_instance.get_tao_dividends(None, None, get_tao_dividends_per_subnet_all)
+
+    task_id: str | None = None
+
+    if trade and netuid is not None:
+        task_id = await trigger_trade(netuid, hotkey)
+
+    # Returned as a response directly, so the dividend map skips the `jsonable_encoder` pass
+    return TaoJSONResponse({
         "netuid": netuid,
         "hotkey": hotkey,
         "dividends": dividends,
         "cached": cached,
-        "stake_tx_triggered": trade
+        "block_number": snapshot_block["block_number"] if snapshot_block is not None else None,
+        "stake_tx_triggered": trade,
+        "task_id": task_id
+    })
+
+@app.get("/tao_dividends/history",
+         tags=["tao"],
+         summary="Fetch stored Tao dividend history.",
+         response_description="Returns a JSON object with the min/max/avg dividend per time bucket of every matching netuid and hotkey.")
+async def tao_dividends_history(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    netuid: Optional[int] = None,
+    hotkey: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: Optional[int] = None
+):
+    if token != EXAMPLE_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if netuid is None and hotkey is None:
+        raise HTTPException(status_code=400, detail="A netuid or hotkey is required")
+
+    if type(hotkey) is str and not is_valid_hotkey(hotkey):
+        raise HTTPException(status_code=400, detail="Invalid hotkey")
+
+    # History is stored in naive local time, so aware bounds are converted to it before comparing
+    end = end.astimezone().replace(tzinfo=None) if end is not None and end.tzinfo is not None else end
+    start = start.astimezone().replace(tzinfo=None) if start is not None and start.tzinfo is not None else start
+    end = end if end is not None else datetime.now()
+    start = start if start is not None else end - timedelta(days=1)
+    bucket = bucket if bucket is not None else HISTORY_DEFAULT_BUCKET_SECONDS
+
+    if start >= end:
+        raise HTTPException(status_code=400, detail="Invalid range, start must be before end")
+
+    if bucket < 1 or (end - start).total_seconds() / bucket > HISTORY_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Invalid bucket, the range can span at most {HISTORY_MAX_BUCKETS} buckets")
+
+    # Backtests and dashboards read what the snapshot refresher stored, never the chain
+    series, truncated = await tao_history_instance.get_history(start, end, netuid, hotkey, bucket, HISTORY_MAX_POINTS)
+
+    return {
+        "netuid": netuid,
+        "hotkey": hotkey,
+        "start": start,
+        "end": end,
+        "bucket": bucket,
+        "truncated": truncated,
+        "series": series
+    }
+
+@app.get("/sentiment/stats",
+         tags=["sentiment"],
+         summary="Fetch rolling sentiment and staking stats.",
+         response_description="Returns a JSON object with the average sentiment, staked TAO and trade count over the window and per bucket.")
+async def sentiment_stats(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    netuid: Optional[int] = None,
+    period: Optional[str] = "hour",
+    buckets: Optional[int] = 24
+):
+    if token != EXAMPLE_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    if period not in ROLLUP_PERIODS:
+        raise HTTPException(status_code=400, detail=f"Invalid period, must be one of {', '.join(ROLLUP_PERIODS)}")
+
+    if buckets is None or buckets < 1 or buckets > SENTIMENT_STATS_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Invalid buckets, must be between 1 and {SENTIMENT_STATS_MAX_BUCKETS}")
+
+    # Read from the hourly/daily rollups, never by scanning the raw sentiment rows
+    stats = await tao_sentiment_stats_instance.get_stats(netuid, period, buckets)
+
+    return {
+        "netuid": netuid,
+        "period": period,
+        **stats
     }
 
 @app.get("/total_networks",
@@ -249,12 +700,60 @@ async def total_networks(token: Annotated[str, Depends(oauth2_scheme)]):
         "total_networks": await get_total_networks()
     }
 
+@app.get("/ready",
+         tags=["health"],
+         summary="Check whether the API finished starting up.",
+         response_description="Returns a 200 status code once the chain is connected and the self-tests (if enabled) passed, 503 until then, with the startup timing report.")
+async def ready():
+    startup = tao_startup_instance.report()
+
+    if not SELF_TESTS_ENABLED:
+        self_tests = "disabled"
+    elif "self_tests" in startup["errors"]:
+        self_tests = "failed"
+    elif "self_tests" in startup["timings"]:
+        self_tests = "passed"
+    else:
+        self_tests = "pending"
+
+    substrate_available: bool = substrate_pool.available.is_set()
+    is_ready: bool = startup["done"] and substrate_available and self_tests != "failed"
+
+    return TaoJSONResponse({
+        "ready": is_ready,
+        "substrate": substrate_available,
+        "self_tests": self_tests,
+        "startup": startup
+    }, status_code=200 if is_ready else 503)
+
 @app.get("/health",
          tags=["health"],
          summary="Check the health of the API.",
          response_description="Returns a 200 status code and a JSON object with the status 'ok'.")
 async def health():
-    return {"status": "ok"}
+    # Sentiment lookups run in the workers, their shared counters are read back from Redis
+    try:
+        sentiment_cache = await tao_redis_instance.get_sentiment_cache_stats()
+    except Exception as e:
+        logger.warning(f"Sentiment cache stats lookup failed: {e}")
+        sentiment_cache = None
+
+    # The signer runs in the signing worker, which publishes its counters to Redis
+    try:
+        signer = await tao_redis_instance.get_signer_stats()
+    except Exception as e:
+        logger.warning(f"Signer stats lookup failed: {e}")
+        signer = None
+
+    return {
+        "status": "ok",
+        "audit": tao_audit_instance.stats(),
+        "history": tao_history_instance.stats(),
+        "local_cache": tao_local_cache_instance.stats(),
+        "sentiment_cache": sentiment_cache,
+        "signer": signer
+    }
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
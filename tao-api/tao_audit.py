@@ -0,0 +1,120 @@
+# Imports
+from typing import Optional
+from sqlalchemy import insert
+from tao_db import TaoDB, TaoDB_Dividend_Requests
+from datetime import datetime
+import asyncio
+import logging
+
+# Configuration
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 500
+AUDIT_FLUSH_INTERVAL_SECONDS = 2
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoAuditLog:
+    def __init__(self, tao_db: TaoDB, queue_size: int = AUDIT_QUEUE_SIZE, batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS) -> None:
+        self.tao_db = tao_db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.flush_task: asyncio.Task | None = None
+        self.closing = False
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        """Starts flushing queued records in the background."""
+        self.flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stops the background flush and writes out whatever is still queued."""
+        self.closing = True
+
+        # Let the in-flight batch finish rather than cancelling it halfway through an insert
+        if self.flush_task is not None:
+            await asyncio.gather(self.flush_task, return_exceptions=True)
+            self.flush_task = None
+
+        while not self.queue.empty():
+            await self._flush(self._take_batch())
+
+    def record_dividend_request(self, netuid: Optional[int], hotkey: Optional[str], trade: bool):
+        """Queues a dividend request audit row without waiting on the database.
+
+        When the queue is full because MySQL is lagging, the row is dropped and counted instead of slowing the request.
+
+        Args:
+            netuid (int | None): The requested netuid, or None if all netuids.
+            hotkey (str | None): The requested hotkey, or None if all hotkeys.
+            trade (bool): Whether a trade was requested.
+        """
+        try:
+            self.queue.put_nowait({
+                "timestamp": datetime.now(),
+                "netuid": netuid,
+                "hotkey": hotkey,
+                "trade": trade
+            })
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Audit queue is full, {self.dropped} dividend request records dropped so far.")
+
+    def stats(self) -> dict[str, int]:
+        """Returns the audit pipeline counters.
+
+        Returns:
+            dict[str, int]: The queued, written, dropped and failed record counts.
+        """
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+    def _take_batch(self) -> list[dict]:
+        rows = []
+
+        while len(rows) < self.batch_size and not self.queue.empty():
+            rows.append(self.queue.get_nowait())
+
+        return rows
+
+    async def _flush_loop(self):
+        loop = asyncio.get_running_loop()
+
+        while not self.closing:
+            rows: list[dict] = []
+            deadline = loop.time() + self.flush_interval
+
+            while len(rows) < self.batch_size and not self.closing:
+                try:
+                    rows.append(await asyncio.wait_for(self.queue.get(), timeout=max(0, deadline - loop.time())))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._flush(rows)
+
+    async def _flush(self, rows: list[dict]):
+        if len(rows) == 0:
+            return
+
+        try:
+            await self._insert(rows)
+            self.written += len(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            logger.error(f"Failed to write {len(rows)} dividend request records: {e}")
+
+    async def _insert(self, rows: list[dict]):
+        async with self.tao_db.session_handler() as session:
+            await session.execute(insert(TaoDB_Dividend_Requests), rows)
+            await session.commit()
@@ -0,0 +1,347 @@
+# Imports
+from typing import Any, Awaitable, Callable, Optional
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import logging
+
+# Configuration
+# Set before any repo module is imported, so nothing reads a real .env or reaches a real service
+BENCHMARK_ENVIRONMENT: dict[str, str] = {
+    "DATURA_API_KEY": "benchmark",
+    "CHUTES_API_KEY": "benchmark",
+    "MYSQL_HOST": "localhost",
+    "MYSQL_USER": "benchmark",
+    "MYSQL_PASSWORD": "benchmark",
+    "MYSQL_DATABASE": "benchmark",
+    "CELERY_BROKER_URL": "memory://",
+    "WALLET_NAME": "benchmark",
+    "WALLET_HOTKEY": "benchmark",
+    "SNAPSHOT_REFRESHER_ENABLED": "False",
+    "HISTORY_ENABLED": "False",
+    "SELF_TESTS_ENABLED": "False",
+    "HTTP_RETRIES": "0"
+}
+GRANULARITIES: list[str] = ["hotkey", "netuid", "all"]
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def percentile(samples: list[float], p: float) -> float:
+    """Picks the nearest-rank percentile of the samples.
+
+    Args:
+        samples (list[float]): The samples, sorted.
+        p (float): The percentile, from 0 to 100.
+
+    Returns:
+        float: The sample at the percentile.
+    """
+    if len(samples) == 0:
+        return 0.0
+
+    return samples[min(len(samples) - 1, max(0, round(p / 100 * len(samples)) - 1))]
+
+async def measure(
+    name: str,
+    run_once: Callable[[], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    before_each: Optional[Callable[[], Awaitable[Any]]] = None,
+    warmup: int = 0
+) -> dict:
+    """Runs a scenario and summarizes its latencies.
+
+    Args:
+        name (str): The name of the scenario in the results.
+        run_once (Callable): Runs one iteration, raising on failure.
+        iterations (int): How many iterations are measured.
+        concurrency (int): How many iterations run at the same time.
+        before_each (Callable | None): Runs untimed before every iteration, e.g. to drop caches. Forces a concurrency
+            of 1, so it never runs while another iteration is timed.
+        warmup (int): How many untimed iterations run first.
+
+    Returns:
+        dict: The iteration, error and concurrency counts, the p50/p99/mean/max latency in milliseconds and the
+            throughput in iterations per second.
+    """
+    concurrency = 1 if before_each is not None else concurrency
+
+    for _ in range(warmup):
+        await run_once()
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining, errors
+
+        while remaining > 0:
+            remaining -= 1
+
+            if before_each is not None:
+                await before_each()
+
+            started_at = time.perf_counter()
+
+            try:
+                await run_once()
+                latencies.append(time.perf_counter() - started_at)
+            except Exception as e:
+                errors += 1
+                logger.warning(f"Iteration of {name} failed: {e}")
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    wall = time.perf_counter() - started_at
+
+    latencies.sort()
+
+    return {
+        "name": name,
+        "iterations": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if len(latencies) > 0 else 0.0,
+        "max_ms": round(latencies[-1] * 1000, 3) if len(latencies) > 0 else 0.0,
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall > 0 else 0.0
+    }
+
+class TaoBenchmark:
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.redis_server = None
+        self.database_path: str | None = None
+
+    def make_redis(self):
+        """Builds a client of the local Redis, or of an in-process fakeredis server if none was given."""
+        if self.args.redis_url is not None:
+            import redis.asyncio as redis
+            return redis.from_url(self.args.redis_url)
+
+        import fakeredis
+
+        if self.redis_server is None:
+            self.redis_server = fakeredis.FakeServer()
+
+        return fakeredis.aioredis.FakeRedis(server=self.redis_server)
+
+    async def use_database(self, tao_db):
+        """Points a TaoDB at the given database, or at a throwaway SQLite file, and creates the schema."""
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        from tao_migrate import migrate
+
+        if self.args.database_url is not None:
+            database_url = self.args.database_url
+        else:
+            if self.database_path is None:
+                fd, self.database_path = tempfile.mkstemp(suffix=".db")
+                os.close(fd)
+
+            database_url = f"sqlite+aiosqlite:///{self.database_path}"
+
+        await tao_db.engine.dispose()
+        tao_db.engine = create_async_engine(database_url)
+        tao_db.session_handler = async_sessionmaker(tao_db.engine, expire_on_commit=False)
+
+        async with tao_db.engine.begin() as connection:
+            await connection.run_sync(migrate)
+
+    async def setup(self):
+        """Imports the API with every outside service swapped for a local stand-in."""
+        import async_substrate_interface
+        from tao_benchmark_fakes import FakeSubstrate
+
+        # The pool imports the interface when it connects, so the stand-in is picked up from the package
+        self.substrate = FakeSubstrate(self.args.subnets, self.args.hotkeys, latency=self.args.substrate_latency_ms / 1000)
+        async_substrate_interface.AsyncSubstrateInterface = lambda url, **kwargs: self.substrate
+
+        import main as tao_main
+        self.tao_main = tao_main
+
+        tao_main.tao_redis_instance.redis = self.make_redis()
+        await self.use_database(tao_main.tao_db_instance)
+
+        # Runs the same startup and shutdown as uvicorn would, and waits for the warm-up to connect to the fake chain
+        self.lifespan = tao_main.app.router.lifespan_context(tao_main.app)
+        await self.lifespan.__aenter__()
+
+        while not tao_main.tao_startup_instance.done:
+            await asyncio.sleep(0.01)
+
+        import httpx
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=tao_main.app), base_url="http://benchmark")
+
+    async def close(self):
+        await self.client.aclose()
+        await self.lifespan.__aexit__(None, None, None)
+
+        if self.database_path is not None:
+            os.remove(self.database_path)
+
+    async def drop_caches(self):
+        await self.tao_main.tao_redis_instance.redis.flushdb()
+        self.tao_main.tao_local_cache_instance.clear()
+
+    async def bench_dividends(self) -> list[dict]:
+        """Measures `/tao_dividends` per granularity, served by the chain (uncached) and by the cache."""
+        results: list[dict] = []
+        headers = { "Authorization": f"Bearer {self.tao_main.EXAMPLE_TOKEN}" }
+        params = {
+            "hotkey": { "netuid": 1, "hotkey": self.substrate.hotkeys[0] },
+            "netuid": { "netuid": 1 },
+            "all": {}
+        }
+
+        for granularity in GRANULARITIES:
+            async def request():
+                response = await self.client.get("/tao_dividends", params=params[granularity], headers=headers)
+
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+            iterations = self.args.scan_iterations if granularity == "all" else self.args.iterations
+
+            results.append(await measure(f"tao_dividends_{granularity}_uncached", request, iterations, before_each=self.drop_caches))
+            results.append(await measure(f"tao_dividends_{granularity}_cached", request, self.args.iterations, concurrency=self.args.concurrency, warmup=1))
+
+        return results
+
+    async def bench_scan(self) -> dict:
+        """Measures a scan of every subnet at one block, straight from the scanner."""
+        from tao_benchmark_fakes import FAKE_BLOCK_HASH
+
+        async def scan():
+            async for _ in self.tao_main.tao_scanner_instance.scan(range(1, self.args.subnets + 1), FAKE_BLOCK_HASH):
+                pass
+
+        result = await measure("scan_all_subnets", scan, self.args.scan_iterations)
+
+        # Every subnet holds every hotkey
+        result["records_per_s"] = round(self.args.subnets * self.args.hotkeys / (result["mean_ms"] / 1000), 3) if result["mean_ms"] > 0 else 0.0
+        return result
+
+    async def bench_pipeline(self) -> list[dict]:
+        """Measures `sentiment_analysis_and_staking` end to end, as a worker runs it, against the local stand-ins."""
+        import tao_celery
+        import tao_sentiments
+        from tao_loop import tao_event_loop
+        from tao_benchmark_fakes import FakeSentimentAPIs, FakeWallet, FakeSentimentStats
+
+        apis = FakeSentimentAPIs(tweets=self.args.tweets, latency=self.args.http_latency_ms / 1000, llm_latency=self.args.llm_latency_ms / 1000)
+        url = await apis.start()
+
+        tao_sentiments.datura_api_url = f"{url}/twitter"
+        tao_sentiments.chutes_api_url = f"{url}/v1/chat/completions"
+
+        # Clients are bound to the loop they are used on, the worker runs everything on its background loop
+        async def use_redis():
+            tao_sentiments.tao_redis_instance.redis = self.make_redis()
+
+        tao_event_loop.run(use_redis())
+
+        if self.args.database_url is not None:
+            tao_event_loop.run(self.use_database(tao_celery.tao_db_instance))
+        else:
+            tao_celery.tao_sentiment_stats_instance = FakeSentimentStats()
+
+        tao_celery.tao_wallet_instance = FakeWallet(latency=self.args.stake_latency_ms / 1000)
+        # Tasks run in the calling thread like a worker would run them, the stake hand-off included
+        tao_celery.celery_instance.conf.task_always_eager = True
+        tao_celery.celery_instance.conf.result_backend = "cache+memory://"
+
+        netuids = iter(range(sys.maxsize))
+
+        async def run_pipeline():
+            netuid = next(netuids) % self.args.subnets + 1
+            result = await asyncio.to_thread(tao_celery.sentiment_analysis_and_staking.apply, args=(netuid, self.substrate.hotkeys[0]))
+
+            if not result.successful() or result.result is None:
+                raise RuntimeError(f"Pipeline on netuid {netuid} did not stake: {result.result}")
+
+        async def new_tweets():
+            apis.rotate()
+            tao_sentiments.sentiment_cache.local.clear()
+
+        results = [
+            await measure("sentiment_pipeline_new_tweets", run_pipeline, self.args.iterations, before_each=new_tweets),
+            await measure("sentiment_pipeline_scored_tweets", run_pipeline, self.args.iterations, warmup=self.args.subnets)
+        ]
+
+        await apis.close()
+        tao_event_loop.run(tao_sentiments.close_clients())
+        tao_event_loop.stop()
+
+        return results
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    benchmark = TaoBenchmark(args)
+    await benchmark.setup()
+
+    scenarios: list[dict] = []
+
+    try:
+        if "dividends" in args.scenarios:
+            scenarios.extend(await benchmark.bench_dividends())
+
+        if "scan" in args.scenarios:
+            scenarios.append(await benchmark.bench_scan())
+
+        if "pipeline" in args.scenarios:
+            scenarios.extend(await benchmark.bench_pipeline())
+    finally:
+        await benchmark.close()
+
+    return {
+        "python": platform.python_version(),
+        "config": { key: value for key, value in vars(args).items() if key != "output" },
+        "scenarios": scenarios
+    }
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks the Tao API offline, against local stand-ins for the chain, Datura, Chutes and Redis.")
+    parser.add_argument("--scenarios", nargs="+", default=["dividends", "scan", "pipeline"], choices=["dividends", "scan", "pipeline"])
+    parser.add_argument("--subnets", type=int, default=64, help="Subnets on the fake chain.")
+    parser.add_argument("--hotkeys", type=int, default=256, help="Hotkeys with dividends on every fake subnet.")
+    parser.add_argument("--iterations", type=int, default=200, help="Measured iterations per scenario.")
+    parser.add_argument("--scan-iterations", type=int, default=10, help="Measured iterations of the all-subnet scenarios.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests of the cached scenarios.")
+    parser.add_argument("--substrate-latency-ms", type=float, default=2, help="Round trip of every fake substrate call.")
+    parser.add_argument("--http-latency-ms", type=float, default=5, help="Response time of the fake Datura API.")
+    parser.add_argument("--llm-latency-ms", type=float, default=20, help="Response time of the fake Chutes API.")
+    parser.add_argument("--stake-latency-ms", type=float, default=5, help="Submission time of the fake wallet.")
+    parser.add_argument("--tweets", type=int, default=20, help="Tweets returned per fake Datura search.")
+    parser.add_argument("--redis-url", default=None, help="A local Redis to use instead of fakeredis.")
+    parser.add_argument("--database-url", default=None, help="An async SQLAlchemy URL of a local MySQL, instead of SQLite. Sentiment rollups are only written with it.")
+    parser.add_argument("--output", default=None, help="Where to write the JSON results, stdout if not given.")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    for key, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(key, value)
+
+    # Modules pin their own loggers to DEBUG or INFO, so the per-request logs are filtered at the handler instead
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setLevel(logging.WARNING)
+    logging.basicConfig(level=logging.WARNING, handlers=[handler])
+
+    results = asyncio.run(run_benchmark(args))
+    output = json.dumps(results, indent=2, default=str)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
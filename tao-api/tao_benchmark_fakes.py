@@ -0,0 +1,235 @@
+# Imports
+from typing import Any, AsyncIterator, Optional
+from aiohttp import web
+from bittensor.core.chain_data import decode_account_id
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import logging
+
+# Configuration
+FAKE_BLOCK_HASH = "0x" + "ab" * 32
+FAKE_BLOCK_NUMBER = 1000
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class FakeScaleValue:
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+class FakeQueryMapResult:
+    def __init__(self, substrate: "FakeSubstrate", netuid: int, records: list[tuple[tuple, FakeScaleValue]], last_key: Optional[str], page_size: int) -> None:
+        self.substrate = substrate
+        self.netuid = netuid
+        self.records = records
+        self.last_key = last_key
+        self.page_size = page_size
+
+    async def __aiter__(self) -> AsyncIterator[tuple[tuple, FakeScaleValue]]:
+        page = self
+
+        # Like the real result, further pages are only fetched once the loaded ones are used up
+        while True:
+            for record in page.records:
+                yield record
+
+            if page.last_key is None:
+                return
+
+            page = await self.substrate.query_map("SubtensorModule", "TaoDividendsPerSubnet", [self.netuid], start_key=page.last_key, page_size=self.page_size)
+
+class FakeSubstrate:
+    """Stands in for AsyncSubstrateInterface with deterministic TaoDividendsPerSubnet storage.
+
+    Every subnet holds the same `hotkeys` hotkeys, so the all-subnet total merges them like mainnet does. Every call
+    waits `latency` seconds, like one round trip to a node.
+    """
+    def __init__(self, subnets: int, hotkeys: int, latency: float = 0.0) -> None:
+        self.subnets = subnets
+        self.latency = latency
+        self.account_ids: list[tuple] = [(tuple(hashlib.sha256(f"hotkey:{i}".encode()).digest()),) for i in range(hotkeys)]
+        self.hotkeys: list[str] = [decode_account_id(account_id) for account_id in self.account_ids]
+        self.hotkey_indexes: dict[str, int] = { hotkey: i for i, hotkey in enumerate(self.hotkeys) }
+        self.calls = 0
+
+    def dividend(self, netuid: int, index: int) -> int:
+        return (netuid * 7919 + index * 104729) % 1000003
+
+    async def initialize(self):
+        await self._round_trip()
+
+    async def close(self):
+        pass
+
+    async def get_chain_head(self) -> str:
+        await self._round_trip()
+        return FAKE_BLOCK_HASH
+
+    async def get_block_number(self, block_hash: Optional[str] = None) -> int:
+        await self._round_trip()
+        return FAKE_BLOCK_NUMBER
+
+    async def query(self, module: str, storage_function: str, params: Optional[list] = None, block_hash: Optional[str] = None) -> FakeScaleValue:
+        await self._round_trip()
+
+        if storage_function == "TotalNetworks":
+            return FakeScaleValue(self.subnets)
+
+        if storage_function == "TaoDividendsPerSubnet":
+            netuid, hotkey = params
+            index = self.hotkey_indexes.get(hotkey)
+            return FakeScaleValue(self.dividend(netuid, index) if index is not None and 1 <= netuid <= self.subnets else 0)
+
+        raise ValueError(f"Storage function {module}.{storage_function} is not faked")
+
+    async def query_map(
+        self,
+        module: str,
+        storage_function: str,
+        params: Optional[list] = None,
+        block_hash: Optional[str] = None,
+        start_key: Optional[str] = None,
+        page_size: int = 100
+    ) -> FakeQueryMapResult:
+        await self._round_trip()
+
+        if storage_function != "TaoDividendsPerSubnet":
+            raise ValueError(f"Storage function {module}.{storage_function} is not faked")
+
+        netuid = params[0]
+        start = int(start_key) if start_key is not None else 0
+        end = min(start + page_size, len(self.account_ids)) if 1 <= netuid <= self.subnets else 0
+        records = [(self.account_ids[i], FakeScaleValue(self.dividend(netuid, i))) for i in range(start, end)]
+
+        return FakeQueryMapResult(self, netuid, records, str(end) if end < len(self.account_ids) and end > start else None, page_size)
+
+    async def _round_trip(self):
+        self.calls += 1
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+class FakeWallet:
+    """Stands in for TaoWallet, accepting every stake after `latency` seconds, like one extrinsic submission."""
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.submitted = 0
+
+    async def connect(self):
+        return None
+
+    async def close(self):
+        pass
+
+    async def add_stake(self, netuid: int, amount: float, hotkey: Optional[str] = None, wait_for_inclusion: bool = True) -> bool:
+        return await self._submit()
+
+    async def unstake(self, netuid: int, amount: float, hotkey: Optional[str] = None, wait_for_inclusion: bool = True) -> bool:
+        return await self._submit()
+
+    async def stake_batch(self, stake_deltas: dict[tuple[int, Optional[str]], float], wait_for_inclusion: bool = True) -> dict[tuple[int, Optional[str]], bool]:
+        success = await self._submit()
+        return { key: success for key in stake_deltas }
+
+    async def _submit(self) -> bool:
+        self.submitted += 1
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        return True
+
+class FakeSentimentAPIs:
+    """Serves local stand-ins for the Datura tweet search and the Chutes chat completion APIs.
+
+    Datura returns `tweets` tweets per netuid, new ones on every `rotate` call so cold runs see unscored tweets.
+    Chutes scores a text by its hash, so the same text always gets the same score, and answers a numbered prompt with
+    one `number: score` line per numbered text.
+    """
+    def __init__(self, tweets: int = 20, latency: float = 0.0, llm_latency: float = 0.0) -> None:
+        self.tweets = tweets
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.generation = 0
+        self.runner: web.AppRunner | None = None
+        self.url: str | None = None
+        self.searches = 0
+        self.completions = 0
+
+    async def start(self) -> str:
+        """Starts serving on a free local port.
+
+        Returns:
+            str: The base URL of the server.
+        """
+        app = web.Application()
+        app.router.add_get("/twitter", self._search)
+        app.router.add_post("/v1/chat/completions", self._complete)
+
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def close(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+    def rotate(self):
+        """Makes the next searches return tweets that were never scored."""
+        self.generation += 1
+
+    async def _search(self, request: web.Request) -> web.Response:
+        self.searches += 1
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+        query = request.query.get("query", "")
+        created_at = datetime(2025, 1, 1, tzinfo=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S%z")
+
+        return web.json_response([
+            {
+                "id": f"{self.generation}:{query}:{i}",
+                "text": f"Tweet {i} of generation {self.generation} about {query}, the subnet is doing {'great' if i % 3 else 'badly'} today.",
+                "created_at": created_at,
+                "like_count": i
+            }
+            for i in range(self.tweets)
+        ])
+
+    async def _complete(self, request: web.Request) -> web.Response:
+        self.completions += 1
+        body = await request.json()
+
+        if self.llm_latency > 0:
+            await asyncio.sleep(self.llm_latency)
+
+        content = body["messages"][0]["content"]
+        numbered = [line.split(". ", 1) for line in content.splitlines() if line.split(". ", 1)[0].isdigit()]
+
+        if len(numbered) > 0:
+            answer = "\n".join(f"{number}: {self._score(text)}" for number, text in numbered)
+        else:
+            answer = str(self._score(content))
+
+        return web.json_response({ "choices": [{ "message": { "role": "assistant", "content": answer } }] })
+
+    def _score(self, text: str) -> int:
+        return int(hashlib.sha256(text.encode()).hexdigest(), 16) % 201 - 100
+
+class FakeSentimentStats:
+    """Stands in for TaoSentimentStats when no MySQL database is given, its rollup upserts are MySQL-only."""
+    def __init__(self) -> None:
+        self.recorded = 0
+
+    async def record(self, *args, **kwargs):
+        self.recorded += 1
@@ -1,15 +1,24 @@
 # Imports
-from celery import Celery
+from celery import chord, group
+from celery.signals import worker_process_init, worker_process_shutdown
 from decouple import config
+from tao_celery_app import celery_instance
 from tao_wallet import TaoWallet
-from tao_db import TaoDB, TaoDB_Sentiment
-from datetime import datetime
+from tao_db import TaoDB
+from tao_sentiment_stats import TaoSentimentStats
+from tao_loop import tao_event_loop
 import tao_sentiments
 import logging
 import asyncio
 
 # Configuration
-CELERY_BROKER_URL: str = config("CELERY_BROKER_URL")
+SWEEP_CHUNK_SIZE: int = config("SWEEP_CHUNK_SIZE", default=8, cast=int)
+SWEEP_CONCURRENCY: int = config("SWEEP_CONCURRENCY", default=4, cast=int)
+STAKE_INTENT_WINDOW_SECONDS: float = config("STAKE_INTENT_WINDOW_SECONDS", default=12, cast=float)
+STAKE_INTENT_MAX_ATTEMPTS: int = config("STAKE_INTENT_MAX_ATTEMPTS", default=3, cast=int)
+SIGNER_WAIT_FOR_INCLUSION: bool = config("SIGNER_WAIT_FOR_INCLUSION", default=False, cast=bool)
+SIGNER_STATS_INTERVAL_SECONDS: float = config("SIGNER_STATS_INTERVAL_SECONDS", default=10, cast=float)
+TRADE_DEBOUNCE_SECONDS: int = config("TRADE_DEBOUNCE_SECONDS", default=60, cast=int)
 
 # Configure Logger
 logger = logging.getLogger(__name__)
@@ -18,12 +27,58 @@ logger.setLevel(logging.INFO)
 # Logic
 tao_wallet_instance: TaoWallet = TaoWallet()
 tao_db_instance: TaoDB = TaoDB()
+tao_sentiment_stats_instance: TaoSentimentStats = TaoSentimentStats(tao_db_instance)
+signer_stats_task: asyncio.Task | None = None
 
-celery_instance = Celery(
-    "tao_celery",
-    broker=CELERY_BROKER_URL,
-    backend=CELERY_BROKER_URL
-)
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Gives each worker process one long-lived event loop and one connected AsyncSubtensor for all its tasks."""
+    tao_event_loop.start()
+
+    try:
+        tao_event_loop.run(tao_wallet_instance.connect())
+    except Exception as e:
+        # Tasks connect lazily on first use, so a flaky chain at startup must not kill the worker
+        logger.error(f"Failed to connect AsyncSubtensor on worker start: {e}")
+
+    async def start_signer_stats():
+        global signer_stats_task
+        signer_stats_task = asyncio.create_task(publish_signer_stats())
+
+    tao_event_loop.run(start_signer_stats())
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Closes the worker process's connections and stops its event loop."""
+    async def close_all():
+        if signer_stats_task is not None:
+            signer_stats_task.cancel()
+
+        await tao_wallet_instance.close()
+        await tao_sentiments.close_clients()
+        await tao_db_instance.close()
+
+    try:
+        tao_event_loop.run(close_all(), timeout=10)
+    except Exception as e:
+        logger.error(f"Failed to close connections on worker shutdown: {e}")
+
+    tao_event_loop.stop()
+
+async def publish_signer_stats():
+    """Publishes the signer counters to Redis while this worker process runs, once it signed anything."""
+    while True:
+        await asyncio.sleep(SIGNER_STATS_INTERVAL_SECONDS)
+        signer = tao_wallet_instance.signer
+
+        # Only the signing worker submits, the other workers would overwrite its counters with empty ones
+        if signer is None or signer.submitted == 0:
+            continue
+
+        try:
+            await tao_sentiments.tao_redis_instance.set_signer_stats(signer.stats(), int(SIGNER_STATS_INTERVAL_SECONDS * 3))
+        except Exception as e:
+            logger.warning(f"Failed to publish signer stats: {e}")
 
 @celery_instance.task
 def search_recent_tweets(netuid: int) -> dict | None:
@@ -37,14 +92,20 @@ def perform_sentiment_analysis(text: str) -> int:
 def sentiment_analysis_on_recent_tweets(netuid: int) -> int | None:
     return tao_sentiments.sentiment_analysis_on_recent_tweets(netuid)
 
-@celery_instance.task
-def sentiment_analysis_and_staking(netuid: int = 18, hotkey: str = "5FFApaS75bv5pJHfAp2FVLBj9ZaXuFDjEypsaBNc1wCfe52v") -> bool:
-    logger.info("Starting sentiment analysis and staking...")
+def stake_on_sentiment(netuid: int, hotkey: str | None, sentiment_score: float | None) -> bool:
+    """Stakes or unstakes on a netuid in proportion to its sentiment score and records the result.
 
-    sentiment_score: float | None = tao_sentiments.sentiment_analysis_on_recent_tweets(netuid)
+    With a stake intent window, the amount is only queued as an intent. Intents on the same netuid and hotkey are
+    netted and submitted together by `flush_stake_intents` once the window closes.
 
-    logger.info(f"Sentiment score: {sentiment_score}")
+    Args:
+        netuid (int): The netuid to stake on.
+        hotkey (str | None): The hotkey to stake on, or None if the subnet owner hotkey should be used.
+        sentiment_score (float | None): The sentiment score of the netuid.
 
+    Returns:
+        bool: True if a stake or unstake was made or queued successfully, False otherwise.
+    """
     if sentiment_score is None:
         logger.info("Sentiment score is None, not going to stake.")
         return False
@@ -58,44 +119,230 @@ def sentiment_analysis_and_staking(netuid: int = 18, hotkey: str = "5FFApaS75bv5
         return False
     
     success: bool = False
+    queued: bool = STAKE_INTENT_WINDOW_SECONDS > 0
     
-    # Create a new event loop for this task
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
+    if queued:
+        success = queue_stake_intent(netuid, hotkey, stake_amount)
+    # Run on the worker process's event loop, which owns the connected AsyncSubtensor
+    elif stake_amount > 0:
+        success: bool = tao_event_loop.run(tao_wallet_instance.add_stake(netuid, stake_amount, hotkey, wait_for_inclusion=SIGNER_WAIT_FOR_INCLUSION))
+
+        if success:
+            logger.info(f"Successfully staked {stake_amount} on netuid {netuid}.")
+        else:
+            logger.info(f"Failed to stake {stake_amount} on netuid {netuid}.")
+    elif stake_amount < 0:
+        success: bool = tao_event_loop.run(tao_wallet_instance.unstake(netuid, abs(stake_amount), hotkey, wait_for_inclusion=SIGNER_WAIT_FOR_INCLUSION))
+
+        if success:
+            logger.info(f"Successfully unstaked {abs(stake_amount)} on netuid {netuid}.")
+        else:
+            logger.info(f"Failed to unstake {abs(stake_amount)} on netuid {netuid}.")
+
+    # Insert sentiment into DB, the stake already happened so a failed write must not fail the task
+    # A queued intent only becomes a trade when its flush succeeds, flush_stake_intents records it then
     try:
-        if stake_amount > 0:
-            success: bool = loop.run_until_complete(tao_wallet_instance.add_stake(netuid, stake_amount, hotkey))
-
-            if success:
-                logger.info(f"Successfully staked {stake_amount} on netuid {netuid}.")
-            else:
-                logger.info(f"Failed to stake {stake_amount} on netuid {netuid}.")
-        elif stake_amount < 0:
-            stake_amount = abs(stake_amount)
-            success: bool = loop.run_until_complete(tao_wallet_instance.unstake(netuid, stake_amount, hotkey))
-
-            if success:
-                logger.info(f"Successfully unstaked {stake_amount} on netuid {netuid}.")
-            else:
-                logger.info(f"Failed to unstake {stake_amount} on netuid {netuid}.")
-    finally:
-        # Clean up the event loop
-        loop.close()
-
-    # Insert sentiment into DB
-    with tao_db_instance.session_handler() as session:
-        session.add(TaoDB_Sentiment(
-            timestamp=datetime.now(),
-            netuid=netuid,
-            hotkey=hotkey,
-            sentiment=sentiment_score,
-            stake_amount=stake_amount
-        ))
-        session.commit()
+        tao_event_loop.run(tao_sentiment_stats_instance.record(netuid, hotkey, sentiment_score, stake_amount, success and not queued))
+    except Exception as e:
+        logger.error(f"Failed to record sentiment of netuid {netuid}: {e}")
 
     return success
 
+def queue_stake_intent(netuid: int, hotkey: str | None, stake_amount: float) -> bool:
+    """Queues a stake delta for the current window and schedules the window's flush if nobody did yet.
+
+    Args:
+        netuid (int): The netuid to stake on.
+        hotkey (str | None): The hotkey to stake on, or None if the subnet owner hotkey should be used.
+        stake_amount (float): The amount of TAO to stake, negative to unstake.
+
+    Returns:
+        bool: True if the intent was queued, False otherwise.
+    """
+    try:
+        schedule_flush: bool = tao_event_loop.run(tao_sentiments.tao_redis_instance.add_stake_intent(netuid, hotkey, stake_amount, STAKE_INTENT_WINDOW_SECONDS))
+    except Exception as e:
+        logger.error(f"Failed to queue stake intent of {stake_amount} on netuid {netuid}: {e}")
+        return False
+
+    if schedule_flush:
+        flush_stake_intents.apply_async(countdown=STAKE_INTENT_WINDOW_SECONDS)
+
+    logger.info(f"Queued stake intent of {stake_amount} on netuid {netuid}.")
+    return True
+
+@celery_instance.task
+def stake_sentiment(netuid: int, hotkey: str | None, sentiment_score: float | None) -> bool:
+    return stake_on_sentiment(netuid, hotkey, sentiment_score)
+
+@celery_instance.task(bind=True)
+def sentiment_analysis_and_staking(self, netuid: int = 18, hotkey: str = "5FFApaS75bv5pJHfAp2FVLBj9ZaXuFDjEypsaBNc1wCfe52v", trigger_key: str | None = None) -> str | None:
+    logger.info("Starting sentiment analysis and staking...")
+
+    try:
+        sentiment_score: float | None = tao_sentiments.sentiment_analysis_on_recent_tweets(netuid)
+
+        logger.info(f"Sentiment score: {sentiment_score}")
+
+        if sentiment_score is None:
+            logger.info("Sentiment score is None, not going to stake.")
+            return None
+
+        # Staking is handed to the signing queue, so this worker is free for the next LLM call right away
+        return stake_sentiment.delay(netuid, hotkey, sentiment_score).id
+    finally:
+        if trigger_key is not None:
+            finish_trade_trigger(trigger_key, self.request.id)
+
+def finish_trade_trigger(trigger_key: str, task_id: str):
+    """Starts the debounce window of a triggered trade once its task is done.
+
+    Args:
+        trigger_key (str): The Redis key of the trade's in-flight marker.
+        task_id (str): The ID of the finished task.
+    """
+    try:
+        tao_event_loop.run(tao_sentiments.tao_redis_instance.finish_trade_trigger(trigger_key, task_id, TRADE_DEBOUNCE_SECONDS))
+    except Exception as e:
+        logger.error(f"Failed to finish trade trigger {trigger_key}: {e}")
+
+@celery_instance.task
+def score_netuids(netuids: list[int]) -> list[tuple[int, float | None]]:
+    """Scores the sentiment of several netuids concurrently, with at most SWEEP_CONCURRENCY in flight."""
+    async def score_all() -> list[float | None]:
+        semaphore = asyncio.Semaphore(SWEEP_CONCURRENCY)
+
+        async def score(netuid: int) -> float | None:
+            async with semaphore:
+                return await tao_sentiments.sentiment_analysis_on_recent_tweets_async(netuid)
+
+        return await asyncio.gather(*[score(netuid) for netuid in netuids])
+
+    return list(zip(netuids, tao_event_loop.run(score_all())))
+
+@celery_instance.task
+def stake_sentiment_sweep(scored_chunks: list[list[tuple[int, float | None]]], hotkey: str | None = None) -> dict[int, bool]:
+    """Stakes on every netuid scored by a sweep, one after another from the single wallet."""
+    results: dict[int, bool] = {}
+
+    for netuid, sentiment_score in [scored for scored_chunk in scored_chunks for scored in scored_chunk]:
+        logger.info(f"Sweep sentiment score for netuid {netuid}: {sentiment_score}")
+
+        try:
+            results[netuid] = stake_on_sentiment(netuid, hotkey, sentiment_score)
+        except Exception as e:
+            logger.error(f"Sweep staking on netuid {netuid} failed: {e}")
+            results[netuid] = False
+
+    return results
+
+@celery_instance.task
+def sentiment_sweep(netuids: list[int] | None = None, hotkey: str | None = None) -> str:
+    """Re-ranks several netuids at once: scores them in parallel, then hands every score to a single staking step.
+
+    Args:
+        netuids (list[int] | None): The netuids to sweep, or None for every subnet on the staking network.
+        hotkey (str | None): The hotkey to stake on, or None if each subnet owner hotkey should be used.
+
+    Returns:
+        str: The ID of the chord that stakes on the scored netuids.
+    """
+    if netuids is None:
+        async def get_total_subnets() -> int:
+            subtensor = await tao_wallet_instance.connect()
+            return await subtensor.get_total_subnets()
+
+        total_subnets: int = tao_event_loop.run(get_total_subnets())
+        netuids = list(range(1, total_subnets))
+
+    chunks = [netuids[i:i + SWEEP_CHUNK_SIZE] for i in range(0, len(netuids), SWEEP_CHUNK_SIZE)]
+
+    logger.info(f"Sweeping sentiment over {len(netuids)} netuids in {len(chunks)} chunks.")
+
+    result = chord(group(score_netuids.s(chunk) for chunk in chunks), stake_sentiment_sweep.s(hotkey=hotkey)).apply_async()
+
+    return result.id
+
+@celery_instance.task
+def flush_stake_intents() -> dict[str, bool]:
+    """Nets every stake intent queued during the last window and submits them as one batched extrinsic.
+
+    The intents only leave Redis once they are submitted, failed ones are queued again for the next window. Unless
+    SIGNER_WAIT_FOR_INCLUSION, whether they dispatched is reconciled in the background by `reconcile_stake_intents`.
+
+    Returns:
+        dict[str, bool]: Whether the stake or unstake succeeded, or was submitted, per `{netuid}:{hotkey}` intent.
+    """
+    stake_intents = tao_event_loop.run(tao_sentiments.tao_redis_instance.take_stake_intents())
+    results: dict[tuple[int, str | None], bool] = {}
+
+    if len(stake_intents) > 0:
+        logger.info(f"Flushing {len(stake_intents)} netted stake intents.")
+
+        async def on_dispatched(dispatch_results: dict[tuple[int, str | None], bool]):
+            await reconcile_stake_intents(stake_intents, dispatch_results)
+
+        try:
+            results = tao_event_loop.run(tao_wallet_instance.stake_batch(
+                stake_intents,
+                wait_for_inclusion=SIGNER_WAIT_FOR_INCLUSION,
+                on_dispatched=None if SIGNER_WAIT_FOR_INCLUSION else on_dispatched
+            ))
+        except Exception as e:
+            logger.error(f"Failed to flush stake intents: {e}")
+
+        if SIGNER_WAIT_FOR_INCLUSION:
+            tao_event_loop.run(record_stake_intent_trades({ key: amount for key, amount in stake_intents.items() if results.get(key, False) }))
+
+    schedule_flush: bool = tao_event_loop.run(tao_sentiments.tao_redis_instance.finish_stake_intents(
+        stake_intents,
+        results,
+        STAKE_INTENT_MAX_ATTEMPTS,
+        STAKE_INTENT_WINDOW_SECONDS,
+        dispatched=SIGNER_WAIT_FOR_INCLUSION
+    ))
+
+    if schedule_flush:
+        flush_stake_intents.apply_async(countdown=STAKE_INTENT_WINDOW_SECONDS)
+
+    return { f"{netuid}:{hotkey or ''}": results.get((netuid, hotkey), False) for netuid, hotkey in stake_intents }
+
+async def reconcile_stake_intents(stake_intents: dict[tuple[int, str | None], float], dispatch_results: dict[tuple[int, str | None], bool]):
+    """Settles submitted stake intents once the signer knows whether they dispatched in their block.
+
+    Args:
+        stake_intents (dict[tuple[int, str | None], float]): The flushed intents.
+        dispatch_results (dict[tuple[int, str | None], bool]): Whether each submitted intent dispatched successfully.
+    """
+    await record_stake_intent_trades({ key: stake_intents[key] for key, success in dispatch_results.items() if success })
+
+    schedule_flush: bool = await tao_sentiments.tao_redis_instance.finish_stake_intents(
+        { key: stake_intents[key] for key in dispatch_results },
+        dispatch_results,
+        STAKE_INTENT_MAX_ATTEMPTS,
+        STAKE_INTENT_WINDOW_SECONDS,
+        release=False
+    )
+
+    if schedule_flush:
+        # Runs on the worker's event loop, so the blocking broker call goes to a thread
+        await asyncio.to_thread(flush_stake_intents.apply_async, countdown=STAKE_INTENT_WINDOW_SECONDS)
+
+async def record_stake_intent_trades(traded_intents: dict[tuple[int, str | None], float]):
+    """Adds successfully staked or unstaked intents to the trade rollups.
+
+    Args:
+        traded_intents (dict[tuple[int, str | None], float]): The net amount of TAO per (netuid, hotkey), negative
+            if unstaked.
+    """
+    if len(traded_intents) == 0:
+        return
+
+    try:
+        await tao_sentiment_stats_instance.record_trades(traded_intents)
+    except Exception as e:
+        logger.error(f"Failed to record flushed stake intents: {e}")
+
 @celery_instance.task
 def test_task():
     logger.info("Test task ran.")
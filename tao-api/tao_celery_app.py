@@ -0,0 +1,21 @@
+# Imports
+from celery import Celery
+from decouple import config
+
+# Configuration
+CELERY_BROKER_URL: str = config("CELERY_BROKER_URL")
+
+# Logic
+# Only the app and its routing, so the API can send tasks without importing the wallet and the tasks themselves
+celery_instance = Celery(
+    "tao_celery",
+    broker=CELERY_BROKER_URL,
+    backend=CELERY_BROKER_URL
+)
+
+# Everything that signs with the wallet runs on its own queue, served by a single signer process that owns the nonce
+celery_instance.conf.task_routes = {
+    "tao_celery.stake_sentiment": { "queue": "signing" },
+    "tao_celery.stake_sentiment_sweep": { "queue": "signing" },
+    "tao_celery.flush_stake_intents": { "queue": "signing" }
+}
@@ -0,0 +1,186 @@
+# Imports
+from typing import Any, Awaitable, Callable
+from bittensor import Balance
+from bittensor.core.async_subtensor import AsyncSubtensor
+from bittensor.core.chain_data import DynamicInfo
+import asyncio
+import time
+import logging
+
+# Configuration
+CHAIN_STATE_HEAD_MAX_AGE_SECONDS = 6
+CHAIN_STATE_FEED_RETRY_SECONDS = 5
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoChainState:
+    def __init__(self, subtensor: AsyncSubtensor, coldkey_ss58: str, head_max_age: float = CHAIN_STATE_HEAD_MAX_AGE_SECONDS) -> None:
+        self.subtensor = subtensor
+        self.coldkey_ss58 = coldkey_ss58
+        self.head_max_age = head_max_age
+        self.feed_task: asyncio.Task | None = None
+
+        self.block_hash: str | None = None
+        self.block_number: int | None = None
+        self.head_updated = 0.0
+
+        # Every entry holds the block number it was read at and is only served while that block is the head
+        self.subnets: dict[int, tuple[int, DynamicInfo]] = {}
+        self.stakes: dict[tuple[int, str], tuple[int, Balance]] = {}
+        self.balance: tuple[int, Balance] | None = None
+
+        # The existential deposit only changes with a runtime upgrade
+        self.existential_deposits: dict[int, Balance] = {}
+
+    def start_block_feed(self):
+        """Follows new block heads in the background, so the head is never fetched on the trade path."""
+        if self.feed_task is None:
+            self.feed_task = asyncio.create_task(self._feed_loop())
+
+    async def close(self):
+        """Stops following new block heads."""
+        if self.feed_task is not None:
+            self.feed_task.cancel()
+            await asyncio.gather(self.feed_task, return_exceptions=True)
+            self.feed_task = None
+
+    async def get_head(self) -> tuple[str, int]:
+        """Fetches the chain head, reusing the last one while it is fresh or the block feed is running.
+
+        Returns:
+            tuple[str, int]: The block hash and block number of the chain head.
+        """
+        feed_running = self.feed_task is not None and not self.feed_task.done()
+
+        if self.block_hash is None or (not feed_running and time.monotonic() - self.head_updated > self.head_max_age):
+            block_hash = await self.subtensor.substrate.get_chain_head()
+            self._set_head(block_hash, await self.subtensor.substrate.get_block_number(block_hash))
+
+        return self.block_hash, self.block_number
+
+    async def get_subnet(self, netuid: int) -> DynamicInfo:
+        """Fetches the subnet info of a netuid at the chain head.
+
+        Args:
+            netuid (int): The netuid of the subnet.
+
+        Returns:
+            DynamicInfo: The subnet info.
+        """
+        return await self._get_at_head(self.subnets, netuid, lambda block_hash: self.subtensor.subnet(netuid=netuid, block_hash=block_hash))
+
+    async def get_balance(self) -> Balance:
+        """Fetches the free balance of the wallet coldkey at the chain head.
+
+        Returns:
+            Balance: The free balance.
+        """
+        block_hash, block_number = await self.get_head()
+
+        if self.balance is None or self.balance[0] != block_number:
+            self.balance = (block_number, await self.subtensor.get_balance(self.coldkey_ss58, block_hash=block_hash))
+
+        return self.balance[1]
+
+    async def get_stake(self, netuid: int, hotkey: str) -> Balance:
+        """Fetches the stake of the wallet coldkey on a hotkey at the chain head.
+
+        Args:
+            netuid (int): The netuid of the stake.
+            hotkey (str): The hotkey of the stake.
+
+        Returns:
+            Balance: The staked amount.
+        """
+        return await self._get_at_head(
+            self.stakes,
+            (netuid, hotkey),
+            lambda block_hash: self.subtensor.get_stake(coldkey_ss58=self.coldkey_ss58, hotkey_ss58=hotkey, netuid=netuid, block_hash=block_hash)
+        )
+
+    async def get_existential_deposit(self) -> Balance:
+        """Fetches the existential deposit, which is only read again after a runtime upgrade.
+
+        Returns:
+            Balance: The existential deposit.
+        """
+        block_hash, _ = await self.get_head()
+        runtime_version: int = await self.subtensor.substrate.get_block_runtime_version_for(block_hash)
+
+        if runtime_version not in self.existential_deposits:
+            self.existential_deposits[runtime_version] = await self.subtensor.get_existential_deposit(block_hash=block_hash)
+
+        return self.existential_deposits[runtime_version]
+
+    def record_stake(self, netuid: int, hotkey: str, amount: Balance):
+        """Applies a successful stake of ours to the cached state, until the chain head moves past it.
+
+        The received alpha depends on the pool price, so the cached stake is dropped rather than guessed.
+
+        Args:
+            netuid (int): The netuid staked on.
+            hotkey (str): The hotkey staked on.
+            amount (Balance): The staked amount of TAO.
+        """
+        if self.balance is not None:
+            self.balance = (self.balance[0], self.balance[1] - amount)
+
+        self.stakes.pop((netuid, hotkey), None)
+
+    def record_unstake(self, netuid: int, hotkey: str, amount: Balance):
+        """Applies a successful unstake of ours to the cached state, until the chain head moves past it.
+
+        The returned TAO depends on the pool price, so the cached balance is dropped rather than guessed.
+
+        Args:
+            netuid (int): The netuid unstaked from.
+            hotkey (str): The hotkey unstaked from.
+            amount (Balance): The unstaked amount.
+        """
+        stake = self.stakes.get((netuid, hotkey))
+
+        if stake is not None:
+            self.stakes[(netuid, hotkey)] = (stake[0], stake[1] - amount)
+
+        self.balance = None
+
+    async def _get_at_head(self, entries: dict, key: Any, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        block_hash, block_number = await self.get_head()
+        entry = entries.get(key)
+
+        if entry is None or entry[0] != block_number:
+            entry = (block_number, await fetch(block_hash))
+            entries[key] = entry
+
+        return entry[1]
+
+    def _set_head(self, block_hash: str, block_number: int):
+        if block_number != self.block_number:
+            # Drop entries of older blocks so the per-block maps do not grow without bound
+            self.subnets = { key: entry for key, entry in self.subnets.items() if entry[0] == block_number }
+            self.stakes = { key: entry for key, entry in self.stakes.items() if entry[0] == block_number }
+
+        self.block_hash = block_hash
+        self.block_number = block_number
+        self.head_updated = time.monotonic()
+
+    async def _feed_loop(self):
+        async def on_block_header(block: dict):
+            block_number: int = block["header"]["number"]
+            self._set_head(await self.subtensor.substrate.get_block_hash(block_number), block_number)
+
+            # Warm the values every trade reads
+            await asyncio.gather(self.get_balance(), self.get_existential_deposit())
+
+        while True:
+            try:
+                await self.subtensor.substrate.subscribe_block_headers(on_block_header)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Block header feed failed, resubscribing: {e}")
+
+            await asyncio.sleep(CHAIN_STATE_FEED_RETRY_SECONDS)
@@ -1,7 +1,8 @@
 # Imports
 from decouple import config
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker, scoped_session
+from sqlalchemy import event, Column, Integer, SmallInteger, String, Float, Double, Boolean, DateTime, ForeignKey, Index, DDL
+from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from datetime import datetime
 import logging
 
@@ -10,6 +11,11 @@ MYSQL_HOST: str = config("MYSQL_HOST")
 MYSQL_USER: str = config("MYSQL_USER")
 MYSQL_PASSWORD: str = config("MYSQL_PASSWORD")
 MYSQL_DATABASE: str = config("MYSQL_DATABASE")
+MYSQL_POOL_SIZE: int = config("MYSQL_POOL_SIZE", default=10, cast=int)
+MYSQL_MAX_OVERFLOW: int = config("MYSQL_MAX_OVERFLOW", default=10, cast=int)
+MYSQL_POOL_TIMEOUT_SECONDS: float = config("MYSQL_POOL_TIMEOUT_SECONDS", default=10, cast=float)
+MYSQL_POOL_RECYCLE_SECONDS: int = config("MYSQL_POOL_RECYCLE_SECONDS", default=1800, cast=int)
+MYSQL_POOL_PRE_PING: bool = config("MYSQL_POOL_PRE_PING", default=True, cast=bool)
 
 # Configure Logger
 logger = logging.getLogger(__name__)
@@ -37,8 +43,74 @@ class TaoDB_Sentiment(Base):
     sentiment_score = Column(Float)
     stake_amount = Column(Float)
 
+    __table_args__ = (
+        Index("ix_sentiment_netuid_timestamp", "netuid", "timestamp"),
+    )
+
+class TaoDB_Sentiment_Rollup_Hourly(Base):
+    __tablename__ = "sentiment_rollup_hourly"
+
+    netuid = Column(Integer, primary_key=True, autoincrement=False)
+    bucket = Column(DateTime, primary_key=True)
+    samples = Column(Integer, default=0)
+    sentiment_sum = Column(Double, default=0)
+    staked = Column(Double, default=0)
+    unstaked = Column(Double, default=0)
+    trades = Column(Integer, default=0)
+
+class TaoDB_Sentiment_Rollup_Daily(Base):
+    __tablename__ = "sentiment_rollup_daily"
+
+    netuid = Column(Integer, primary_key=True, autoincrement=False)
+    bucket = Column(DateTime, primary_key=True)
+    samples = Column(Integer, default=0)
+    sentiment_sum = Column(Double, default=0)
+    staked = Column(Double, default=0)
+    unstaked = Column(Double, default=0)
+    trades = Column(Integer, default=0)
+
+class TaoDB_Dividend_History(Base):
+    __tablename__ = "dividend_history"
+
+    # Clustered by series, so a (netuid, hotkey) range query reads one contiguous run of rows
+    netuid = Column(SmallInteger, primary_key=True, autoincrement=False)
+    hotkey = Column(String(48), primary_key=True)
+    timestamp = Column(DateTime, primary_key=True)
+    block_number = Column(Integer)
+    dividend = Column(Double)
+
+    __table_args__ = (
+        Index("ix_dividend_history_hotkey_timestamp", "hotkey", "timestamp"),
+    )
+
+# Partitioned by day so range queries prune whole days and retention drops partitions instead of deleting rows
+event.listen(
+    TaoDB_Dividend_History.__table__,
+    "after_create",
+    DDL("ALTER TABLE dividend_history PARTITION BY RANGE (TO_DAYS(timestamp)) (PARTITION pmax VALUES LESS THAN MAXVALUE)").execute_if(dialect="mysql")
+)
+
 class TaoDB():
-    def __init__(self) -> None:
-        self.engine = create_engine(f"mysql+mysqldb://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}")
-        Base.metadata.create_all(self.engine)
-        self.session_handler = scoped_session(sessionmaker(bind=self.engine))
\ No newline at end of file
+    def __init__(
+        self,
+        pool_size: int = MYSQL_POOL_SIZE,
+        max_overflow: int = MYSQL_MAX_OVERFLOW,
+        pool_timeout: float = MYSQL_POOL_TIMEOUT_SECONDS,
+        pool_recycle: int = MYSQL_POOL_RECYCLE_SECONDS,
+        pool_pre_ping: bool = MYSQL_POOL_PRE_PING
+    ) -> None:
+        # Nothing connects until the first query, so this is cheap to build at import. The schema is created by
+        # tao_migrate.py, not here.
+        self.engine = create_async_engine(
+            f"mysql+asyncmy://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}",
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping
+        )
+        self.session_handler = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def close(self):
+        """Closes every pooled connection."""
+        await self.engine.dispose()
\ No newline at end of file
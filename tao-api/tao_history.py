@@ -0,0 +1,223 @@
+# Imports
+from typing import Optional
+from sqlalchemy import insert, select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from tao_db import TaoDB, TaoDB_Dividend_History
+from datetime import date, datetime, timedelta
+import asyncio
+import time
+import logging
+
+# Configuration
+HISTORY_INGEST_INTERVAL_SECONDS = 600
+HISTORY_RETENTION_DAYS = 90
+HISTORY_BATCH_SIZE = 5000
+HISTORY_PARTITION_DAYS_AHEAD = 7
+HISTORY_PARTITION_CHECK_SECONDS = 3600
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoDividendHistory:
+    def __init__(
+        self,
+        tao_db: TaoDB,
+        ingest_interval: float = HISTORY_INGEST_INTERVAL_SECONDS,
+        retention_days: int = HISTORY_RETENTION_DAYS,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        partition_days_ahead: int = HISTORY_PARTITION_DAYS_AHEAD,
+        partition_check_interval: float = HISTORY_PARTITION_CHECK_SECONDS
+    ) -> None:
+        self.tao_db = tao_db
+        self.ingest_interval = ingest_interval
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.partition_days_ahead = partition_days_ahead
+        self.partition_check_interval = partition_check_interval
+        self.maintenance_task: asyncio.Task | None = None
+        self.last_window: int | None = None
+        self.partitions_maintained_on: date | None = None
+        self.ingested = 0
+        self.failed = 0
+        self.partition_failures = 0
+
+    def start(self):
+        """Starts maintaining the daily partitions in the background, apart from the ingest."""
+        self.maintenance_task = asyncio.create_task(self._maintenance_loop())
+
+    async def close(self):
+        """Stops maintaining the daily partitions."""
+        if self.maintenance_task is not None:
+            self.maintenance_task.cancel()
+            await asyncio.gather(self.maintenance_task, return_exceptions=True)
+            self.maintenance_task = None
+
+    async def record_snapshot(self, block_number: int, netuid_dividends: dict[int, dict[str, float]]) -> bool:
+        """Stores the dividends of a snapshot, at most once per ingest interval.
+
+        Rows are stamped with the start of the interval, so a refresher that takes over mid-interval hits the primary
+        key of the rows already written and its duplicates are ignored.
+
+        Args:
+            block_number (int): The block number the snapshot was taken at.
+            netuid_dividends (dict[int, dict[str, float]]): The dividend value per hotkey of every netuid.
+
+        Returns:
+            bool: Whether the snapshot was stored, False if this interval was already stored.
+        """
+        window = int(time.time() // self.ingest_interval)
+
+        if window == self.last_window:
+            return False
+
+        timestamp = datetime.fromtimestamp(window * self.ingest_interval)
+        rows = [
+            { "netuid": netuid, "hotkey": hotkey, "timestamp": timestamp, "block_number": block_number, "dividend": dividend }
+            for netuid, dividends in netuid_dividends.items()
+            for hotkey, dividend in dividends.items()
+        ]
+
+        try:
+            await self._ingest(rows)
+        except Exception:
+            self.failed += len(rows)
+            raise
+
+        self.last_window = window
+        self.ingested += len(rows)
+        logger.info(f"Stored {len(rows)} dividend history rows of block {block_number}.")
+        return True
+
+    async def get_history(
+        self,
+        start: datetime,
+        end: datetime,
+        netuid: Optional[int] = None,
+        hotkey: Optional[str] = None,
+        bucket_seconds: int = 3600,
+        limit: int = 10000
+    ) -> tuple[list[dict], bool]:
+        """Fetches stored dividends downsampled to fixed time buckets, aggregated by MySQL.
+
+        Args:
+            start (datetime): The start of the range, inclusive.
+            end (datetime): The end of the range, exclusive.
+            netuid (int | None): The netuid to fetch the history of, or None for every netuid.
+            hotkey (str | None): The hotkey to fetch the history of, or None for every hotkey.
+            bucket_seconds (int): The length of one bucket.
+            limit (int): How many buckets are returned at most, over all series.
+
+        Returns:
+            tuple[list[dict], bool]: One series per `netuid` and `hotkey`, each with its `points` holding the bucket
+                `timestamp` and the `min`, `max` and `avg` dividend and `samples` count of the bucket, and whether
+                buckets past the limit were left out.
+        """
+        # One row past the limit tells a cut-off range apart from one that fit exactly
+        rows = await self._query(start, end, netuid, hotkey, bucket_seconds, limit + 1)
+        truncated = len(rows) > limit
+        series: dict[tuple[int, str], dict] = {}
+
+        for row_netuid, row_hotkey, bucket, min_dividend, max_dividend, avg_dividend, samples in rows[:limit]:
+            points = series.setdefault((row_netuid, row_hotkey), { "netuid": row_netuid, "hotkey": row_hotkey, "points": [] })["points"]
+            points.append({ "timestamp": bucket, "min": min_dividend, "max": max_dividend, "avg": float(avg_dividend), "samples": samples })
+
+        return list(series.values()), truncated
+
+    def stats(self) -> dict[str, int]:
+        """Returns the history ingest counters.
+
+        Returns:
+            dict[str, int]: The ingested and failed row counts, and the failed partition maintenance count.
+        """
+        return {
+            "ingested": self.ingested,
+            "failed": self.failed,
+            "partition_failures": self.partition_failures
+        }
+
+    async def maintain_partitions(self):
+        """Adds the daily partitions of the coming days and drops the ones past retention.
+
+        Runs in a session of its own, MySQL commits around every ALTER TABLE so it must never share an ingest
+        transaction.
+        """
+        async with self.tao_db.session_handler() as session:
+            await self._maintain_partitions(session)
+
+    async def _ingest(self, rows: list[dict]):
+        async with self.tao_db.session_handler() as session:
+            for i in range(0, len(rows), self.batch_size):
+                await session.execute(insert(TaoDB_Dividend_History).prefix_with("IGNORE"), rows[i:i + self.batch_size])
+
+            await session.commit()
+
+    async def _maintenance_loop(self):
+        while True:
+            if self.partitions_maintained_on != date.today():
+                try:
+                    await self.maintain_partitions()
+                    self.partitions_maintained_on = date.today()
+                except Exception as e:
+                    # Retried on the next check, the partitions are added days ahead so the ingest keeps working
+                    self.partition_failures += 1
+                    logger.error(f"Maintaining the dividend history partitions failed: {e}")
+
+            await asyncio.sleep(self.partition_check_interval)
+
+    async def _maintain_partitions(self, session: AsyncSession):
+        names = (await session.execute(text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'dividend_history' AND PARTITION_NAME IS NOT NULL"
+        ))).scalars().all()
+
+        # A table created before partitioning was added has none, it keeps working without them
+        if len(names) == 0:
+            return
+
+        days = sorted(datetime.strptime(name, "p%Y%m%d").date() for name in names if name != "pmax")
+        today = date.today()
+
+        # Partitions can only be split off the end, so only days after the newest partition are added
+        new_days = [today + timedelta(days=i) for i in range(self.partition_days_ahead + 1)]
+        new_days = [day for day in new_days if len(days) == 0 or day > days[-1]]
+
+        if len(new_days) > 0:
+            partitions = ", ".join(f"PARTITION p{day:%Y%m%d} VALUES LESS THAN (TO_DAYS('{day + timedelta(days=1)}'))" for day in new_days)
+            await session.execute(text(f"ALTER TABLE dividend_history REORGANIZE PARTITION pmax INTO ({partitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"))
+
+        expired = [day for day in days if day < today - timedelta(days=self.retention_days)]
+
+        if len(expired) > 0:
+            await session.execute(text(f"ALTER TABLE dividend_history DROP PARTITION {', '.join(f'p{day:%Y%m%d}' for day in expired)}"))
+
+        logger.info(f"Added {len(new_days)} and dropped {len(expired)} dividend history partitions.")
+
+    async def _query(self, start: datetime, end: datetime, netuid: Optional[int], hotkey: Optional[str], bucket_seconds: int, limit: int) -> list[tuple]:
+        # Grouped by the alias, MySQL would not match the select expression again with its bound parameters
+        bucket = func.from_unixtime(func.floor(func.unix_timestamp(TaoDB_Dividend_History.timestamp) / bucket_seconds) * bucket_seconds).label("bucket")
+        query = (
+            select(
+                TaoDB_Dividend_History.netuid,
+                TaoDB_Dividend_History.hotkey,
+                bucket,
+                func.min(TaoDB_Dividend_History.dividend),
+                func.max(TaoDB_Dividend_History.dividend),
+                func.avg(TaoDB_Dividend_History.dividend),
+                func.count()
+            )
+            .where(TaoDB_Dividend_History.timestamp >= start, TaoDB_Dividend_History.timestamp < end)
+            .group_by(TaoDB_Dividend_History.netuid, TaoDB_Dividend_History.hotkey, text("bucket"))
+            .order_by(TaoDB_Dividend_History.netuid, TaoDB_Dividend_History.hotkey, text("bucket"))
+            .limit(limit)
+        )
+
+        if netuid is not None:
+            query = query.where(TaoDB_Dividend_History.netuid == netuid)
+
+        if hotkey is not None:
+            query = query.where(TaoDB_Dividend_History.hotkey == hotkey)
+
+        async with self.tao_db.session_handler() as session:
+            return [tuple(row) for row in (await session.execute(query)).all()]
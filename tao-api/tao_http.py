@@ -0,0 +1,108 @@
+# Imports
+from typing import Any, Optional
+import aiohttp
+import asyncio
+import random
+import logging
+
+# Configuration
+HTTP_CONNECT_TIMEOUT_SECONDS = 5
+HTTP_READ_TIMEOUT_SECONDS = 60
+HTTP_RETRIES = 3
+HTTP_BACKOFF_BASE_SECONDS = 0.5
+HTTP_BACKOFF_MAX_SECONDS = 10
+HTTP_MAX_CONNECTIONS_PER_HOST = 16
+HTTP_KEEPALIVE_SECONDS = 60
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoHTTPClient:
+    def __init__(
+        self,
+        headers: Optional[dict] = None,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = HTTP_READ_TIMEOUT_SECONDS,
+        retries: int = HTTP_RETRIES,
+        max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST
+    ) -> None:
+        self.headers = headers or {}
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.max_connections_per_host = max_connections_per_host
+        self.session: aiohttp.ClientSession | None = None
+        self.session_loop: asyncio.AbstractEventLoop | None = None
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Returns the pooled keep-alive session, creating it on first use.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session.
+        """
+        loop = asyncio.get_running_loop()
+
+        # Sessions are bound to the loop they were created on
+        if self.session is None or self.session.closed or self.session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit_per_host=self.max_connections_per_host, keepalive_timeout=HTTP_KEEPALIVE_SECONDS)
+            self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+            self.session_loop = loop
+
+        return self.session
+
+    async def close(self):
+        """Closes the pooled session and all of its connections."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+        self.session = None
+        self.session_loop = None
+
+    async def request_json(self, method: str, url: str, **kwargs) -> tuple[int, Any]:
+        """Sends a request and decodes its JSON body, retrying with jittered backoff on 429/5xx and network errors.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            **kwargs: Passed through to `aiohttp.ClientSession.request` (e.g. `params`, `json`).
+
+        Returns:
+            tuple[int, Any]: The status code and decoded JSON body (None if the body is not JSON) of the last attempt.
+
+        Raises:
+            aiohttp.ClientError | asyncio.TimeoutError: If the last attempt failed without a response.
+        """
+        session = await self.get_session()
+        attempt = 0
+
+        while True:
+            retry_after: float | None = None
+
+            try:
+                async with session.request(method, url, **kwargs) as response:
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError:
+                        data = None
+
+                    if response.status not in RETRY_STATUS_CODES or attempt >= self.retries:
+                        return response.status, data
+
+                    logger.warning(f"{method} {url} returned {response.status} (attempt {attempt + 1}), retrying.")
+
+                    if "Retry-After" in response.headers:
+                        try:
+                            retry_after = float(response.headers["Retry-After"])
+                        except ValueError:
+                            pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries:
+                    raise
+
+                logger.warning(f"{method} {url} failed (attempt {attempt + 1}), retrying: {e}")
+
+            attempt += 1
+            backoff = min(HTTP_BACKOFF_MAX_SECONDS, HTTP_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+            await asyncio.sleep(retry_after if retry_after is not None else random.uniform(0, backoff))
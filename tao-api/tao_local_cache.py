@@ -0,0 +1,119 @@
+# Imports
+from typing import Any, Hashable
+from collections import OrderedDict
+import time
+
+# Configuration
+LOCAL_CACHE_MAX_ENTRIES = 4096
+LOCAL_CACHE_TTL_SECONDS = 5
+
+# Logic
+class TaoLocalCache:
+    def __init__(self, max_entries: int = LOCAL_CACHE_MAX_ENTRIES, ttl: float = LOCAL_CACHE_TTL_SECONDS) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: OrderedDict[Hashable, tuple[Any, float, str]] = OrderedDict()
+        self.tags: dict[str, set[Hashable]] = {}
+        self.generations: dict[str, int] = {}
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """Fetches a value, unless it expired or was invalidated.
+
+        Values are shared between callers, so they must not be mutated.
+
+        Args:
+            key (Hashable): The key of the value.
+
+        Returns:
+            Any | None: The value, or None if not cached.
+        """
+        entry = self.entries.get(key)
+
+        if entry is None or entry[1] <= time.monotonic():
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def generation(self, tag: str) -> tuple[int, int]:
+        """Returns how often the cache was cleared and the tag was invalidated, to be passed back to `set` once the value is read.
+
+        Args:
+            tag (str): The Redis key the value is read from.
+
+        Returns:
+            tuple[int, int]: The clear count of the cache and the invalidation count of the tag.
+        """
+        return self.epoch, self.generations.get(tag, 0)
+
+    def set(self, key: Hashable, value: Any, tag: str, generation: tuple[int, int], ttl: float | None = None):
+        """Caches a value read from Redis, unless its Redis key was invalidated while it was being read.
+
+        Args:
+            key (Hashable): The key of the value.
+            value (Any): The value to cache.
+            tag (str): The Redis key the value was read from, its invalidations drop the value.
+            generation (tuple[int, int]): The `generation` of the tag from before the value was read.
+            ttl (float | None): How long the value stays cached, or None for the default.
+        """
+        if self.generation(tag) != generation:
+            return
+
+        self._remove(key)
+        self.entries[key] = (value, time.monotonic() + (ttl if ttl is not None else self.ttl), tag)
+        self.tags.setdefault(tag, set()).add(key)
+
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    def invalidate(self, tag: str):
+        """Drops every value read from a Redis key.
+
+        Args:
+            tag (str): The Redis key that was written.
+        """
+        self.generations[tag] = self.generations.get(tag, 0) + 1
+        self.invalidations += 1
+
+        for key in self.tags.pop(tag, set()):
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Drops every value, for when invalidations may have been missed."""
+        self.epoch += 1
+        self.entries.clear()
+        self.tags.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the cache counters of this process.
+
+        Returns:
+            dict[str, int | float]: The entry count, the hits, misses and invalidations, and the hit ratio.
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups > 0 else 0.0
+        }
+
+    def _remove(self, key: Hashable):
+        entry = self.entries.pop(key, None)
+
+        if entry is not None:
+            keys = self.tags.get(entry[2])
+
+            if keys is not None:
+                keys.discard(key)
+
+                if len(keys) == 0:
+                    del self.tags[entry[2]]
@@ -0,0 +1,65 @@
+# Imports
+from typing import Any, Coroutine, Optional
+import threading
+import asyncio
+import os
+import logging
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoEventLoop:
+    def __init__(self) -> None:
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread: threading.Thread | None = None
+        self.pid: int | None = None
+        self.lock = threading.Lock()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Starts the background event loop thread, unless it is already running in this process.
+
+        Returns:
+            asyncio.AbstractEventLoop: The running background event loop.
+        """
+        with self.lock:
+            # A forked child (e.g. a prefork Celery worker) inherits the loop object but not its thread
+            if self.loop is not None and self.pid == os.getpid() and self.thread.is_alive():
+                return self.loop
+
+            self.loop = asyncio.new_event_loop()
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self.loop.run_forever, name="tao-event-loop", daemon=True)
+            self.thread.start()
+
+            logger.info(f"Started background event loop in process {self.pid}.")
+
+            return self.loop
+
+    def run(self, coroutine: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+        """Runs a coroutine on the background event loop and blocks until it finishes.
+
+        Args:
+            coroutine (Coroutine): The coroutine to run.
+            timeout (float | None): How long to wait for the result, or None to wait forever.
+
+        Returns:
+            Any: The result of the coroutine.
+        """
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+    def stop(self):
+        """Stops the background event loop and waits for its thread to exit."""
+        with self.lock:
+            if self.loop is None or self.pid != os.getpid():
+                return
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.loop = None
+            self.thread = None
+
+tao_event_loop: TaoEventLoop = TaoEventLoop()
@@ -0,0 +1,57 @@
+# Imports
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from decouple import config
+from tao_db import TaoDB, Base
+from tao_history import TaoDividendHistory
+import asyncio
+import logging
+
+# Configuration
+HISTORY_ENABLED: bool = config("HISTORY_ENABLED", default=True, cast=bool)
+HISTORY_RETENTION_DAYS: int = config("HISTORY_RETENTION_DAYS", default=90, cast=int)
+
+# Configure Logger
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def migrate(connection: Connection):
+    """Creates missing tables, and the indexes added since an existing table was created.
+
+    Args:
+        connection (Connection): The connection to migrate with.
+    """
+    Base.metadata.create_all(connection)
+
+    inspector = inspect(connection)
+
+    for table in Base.metadata.sorted_tables:
+        existing = { index["name"] for index in inspector.get_indexes(table.name) }
+
+        for index in table.indexes:
+            if index.name not in existing:
+                logger.info(f"Creating index {index.name} on {table.name}.")
+                index.create(connection)
+
+async def main():
+    tao_db = TaoDB(pool_size=1, max_overflow=0)
+
+    try:
+        async with tao_db.engine.begin() as connection:
+            await connection.run_sync(migrate)
+
+        # The API keeps them up from then on, this only makes sure a fresh deploy starts with today's partitions
+        if HISTORY_ENABLED:
+            try:
+                await TaoDividendHistory(tao_db, retention_days=HISTORY_RETENTION_DAYS).maintain_partitions()
+            except Exception as e:
+                logger.error(f"Maintaining the dividend history partitions failed: {e}")
+    finally:
+        await tao_db.close()
+
+    logger.info("Database schema is up to date.")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,23 +1,213 @@
 
-# TODO: Check for async support.
-
 # Imports
-import redis
+import redis.asyncio as redis
+from redis.asyncio.lock import Lock
+from tao_local_cache import TaoLocalCache
+from tao_serializer import TaoSerializer
+import asyncio
 import json
-from typing import Optional
+import time
+import logging
+from typing import Optional, AsyncIterator, Any, Awaitable, Callable, Hashable
 
 # Configuration
 TAO_DIVIDEND_EXPIRY_SECONDS = 120
 TOTAL_NETWORKS_EXPIRY_SECONDS = 300
+REDIS_MAX_CONNECTIONS = 64
+TAO_DIVIDEND_LOCK_TIMEOUT_SECONDS = 60
+SNAPSHOT_EXPIRY_SECONDS = 3600
+# A replaced snapshot is kept this long, so requests and cursors still reading it can finish
+SNAPSHOT_GRACE_SECONDS = 300
+SNAPSHOT_LOCK_TIMEOUT_SECONDS = 120
+# Hotkeys are SS58 addresses, so this field can never collide with one. It marks a hash holding every hotkey.
+COMPLETE_FIELD = "*"
+SENTIMENT_CACHE_EXPIRY_SECONDS = 86400
+SENTIMENT_CACHE_MAX_ENTRIES = 100000
+TWEET_SCORE_EXPIRY_SECONDS = 604800
+CACHE_INVALIDATION_CHANNEL = "tao_cache:invalidate"
+CACHE_INVALIDATION_RETRY_SECONDS = 1
+STAKE_INTENT_FLUSH_GRACE_SECONDS = 60
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
 
 # Logic
+def tao_dividends_key(netuid: Optional[int] = None, hotkey: Optional[str] = None) -> str:
+    """Builds the Redis key used to cache Tao Dividend values.
+
+    Args:
+        netuid (int | None): The netuid of the key, or None if all netuids.
+        hotkey (str | None): The hotkey of the key, or None if all hotkeys.
+
+    Returns:
+        str: The Redis key.
+    """
+    netuid_part = str(netuid) if netuid is not None else "*"
+    hotkey_part = hotkey if hotkey is not None else "*"
+    return f"tao_dividends:{netuid_part}:{hotkey_part}"
+
+def tao_dividends_hash_key(netuid: Optional[int] = None) -> str:
+    """Builds the Redis key of the hash caching the dividend value per hotkey of a netuid.
+
+    Args:
+        netuid (int | None): The netuid of the hash, or None for the aggregate of all netuids.
+
+    Returns:
+        str: The Redis key.
+    """
+    netuid_part = str(netuid) if netuid is not None else "*"
+    return f"tao_dividends:{netuid_part}"
+
+def snapshot_key(block_hash: str, netuid: Optional[int] = None) -> str:
+    """Builds the Redis key of a netuid hash of the dividend snapshot taken at the given block.
+
+    Args:
+        block_hash (str): The block hash the snapshot was taken at.
+        netuid (int | None): The netuid of the hash, or None for the aggregate of all netuids.
+
+    Returns:
+        str: The Redis key.
+    """
+    netuid_part = str(netuid) if netuid is not None else "*"
+    return f"tao_dividends_snapshot:{block_hash}:{netuid_part}"
+
+def dividends_blob_key(hash_key: str, serializer: TaoSerializer) -> str:
+    """Builds the Redis key of the serialized copy of a complete dividend hash, tagged with the serializer format.
+
+    Args:
+        hash_key (str): The Redis key of the dividend hash.
+        serializer (TaoSerializer): The serializer the copy is written with.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"{hash_key}:{serializer.prefix}"
+
+def tao_dividends_rank_key(netuid: Optional[int] = None) -> str:
+    """Builds the Redis key of the sorted set ranking the hotkeys of a netuid by cached dividend value.
+
+    Args:
+        netuid (int | None): The netuid of the sorted set, or None for the aggregate of all netuids.
+
+    Returns:
+        str: The Redis key.
+    """
+    netuid_part = str(netuid) if netuid is not None else "*"
+    return f"tao_dividends_rank:{netuid_part}"
+
+def snapshot_rank_key(block_hash: str, netuid: Optional[int] = None) -> str:
+    """Builds the Redis key of the sorted set ranking the hotkeys of a netuid in the dividend snapshot taken at the given block.
+
+    Args:
+        block_hash (str): The block hash the snapshot was taken at.
+        netuid (int | None): The netuid of the sorted set, or None for the aggregate of all netuids.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"{snapshot_key(block_hash, netuid)}:rank"
+
+def snapshot_netuids_key(block_hash: str) -> str:
+    """Builds the Redis key of the set of netuids in the dividend snapshot taken at the given block.
+
+    Args:
+        block_hash (str): The block hash the snapshot was taken at.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"tao_dividends_snapshot:{block_hash}:netuids"
+
+def decode_dividends(hash_value: dict[bytes, bytes]) -> dict[str, float]:
+    """Decodes a dividend hash read from Redis, leaving out the completeness marker.
+
+    Args:
+        hash_value (dict[bytes, bytes]): The raw hash.
+
+    Returns:
+        dict[str, float]: The dividend value per hotkey.
+    """
+    return { hotkey.decode(): float(dividend) for hotkey, dividend in hash_value.items() if hotkey.decode() != COMPLETE_FIELD }
+
+def encode_dividends(dividends: dict[str, float]) -> dict[str, float | int]:
+    """Encodes a complete dividend map as a Redis hash mapping, including the completeness marker.
+
+    Args:
+        dividends (dict[str, float]): The dividend value per hotkey.
+
+    Returns:
+        dict[str, float | int]: The hash mapping.
+    """
+    return { **dividends, COMPLETE_FIELD: 1 }
+
+def tweet_scores_key(netuid: int, serializer: TaoSerializer) -> str:
+    """Builds the Redis key of the hash storing the per-tweet sentiment scores of a netuid.
+
+    Args:
+        netuid (int): The netuid the tweets were found for.
+        serializer (TaoSerializer): The serializer the score records are written with.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"tweet_sentiment:{serializer.prefix}:{netuid}"
+
+def tweet_scores_index_key(netuid: int, serializer: TaoSerializer) -> str:
+    """Builds the Redis key of the sorted set indexing the per-tweet sentiment scores of a netuid by tweet time.
+
+    Args:
+        netuid (int): The netuid the tweets were found for.
+        serializer (TaoSerializer): The serializer the score records are written with.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"{tweet_scores_key(netuid, serializer)}:index"
+
+def trade_trigger_key(netuid: int, hotkey: Optional[str] = None) -> str:
+    """Builds the Redis key marking a pending or recent trade on the given netuid and hotkey.
+
+    Args:
+        netuid (int): The netuid of the trade.
+        hotkey (str | None): The hotkey of the trade, or None if the default hotkey.
+
+    Returns:
+        str: The Redis key.
+    """
+    hotkey_part = hotkey if hotkey is not None else "*"
+    return f"trade_trigger:{netuid}:{hotkey_part}"
+
 class TaoRedis:
-    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0) -> None:
-        self.redis = redis.Redis(host=host, port=port, db=db)
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, max_connections: int = REDIS_MAX_CONNECTIONS, local_cache: Optional[TaoLocalCache] = None, serializer: Optional[TaoSerializer] = None) -> None:
+        self.pool = redis.ConnectionPool(host=host, port=port, db=db, max_connections=max_connections)
+        self.redis = redis.Redis(connection_pool=self.pool)
+
+        # Complete dividend maps are also stored serialized, so reading a whole netuid is one GET instead of an HGETALL
+        self.serializer = serializer if serializer is not None else TaoSerializer()
+
+        # Hot reads are served from the in-process cache, every write publishes its key so all processes drop it
+        self.local_cache = local_cache
+        self.invalidation_task: asyncio.Task | None = None
+
+    def start(self):
+        """Starts listening for invalidations of the in-process cache, if there is one."""
+        if self.local_cache is not None:
+            self.invalidation_task = asyncio.create_task(self._listen_invalidations())
+
+    async def close(self):
+        """Closes the client and disconnects every pooled connection."""
+        if self.invalidation_task is not None:
+            self.invalidation_task.cancel()
+            await asyncio.gather(self.invalidation_task, return_exceptions=True)
+            self.invalidation_task = None
+
+        await self.redis.aclose()
+        await self.pool.disconnect()
 
-    def get_tao_dividends(self, netuid: Optional[int] = None, hotkey: Optional[str] = None) -> dict[str, float] | None:
+    async def get_tao_dividends(self, netuid: Optional[int] = None, hotkey: Optional[str] = None) -> dict[str, float] | None:
         """Fetches cached Tao Dividend values from Redis.
-        
+
         Args:
             netuid (int | None): The netuid to fetch the value for, or None if all netuids.
             hotkey (str | None): The hotkey to fetch the value for, or None if all hotkeys.
@@ -25,41 +215,594 @@ class TaoRedis:
         Returns:
             dict[str, float] | None: The total dividend value for specified netuid and hotkey, or None if no cached value.
         """
-        netuid_part = str(netuid) if netuid is not None else "*"
-        hotkey_part = hotkey if hotkey is not None else "*"
-        key = f"tao_dividends:{netuid_part}:{hotkey_part}"
+        if hotkey is not None:
+            return await self.get_tao_dividends_hotkeys(netuid, [hotkey])
+
+        async def fetch() -> dict[str, float] | None:
+            return await self._get_complete_dividends(tao_dividends_hash_key(netuid))
+
+        return await self._read_through(("tao_dividends", netuid), tao_dividends_hash_key(netuid), fetch)
+
+    async def get_tao_dividends_hotkeys(self, netuid: int, hotkeys: list[str]) -> dict[str, float] | None:
+        """Fetches cached Tao Dividend values of several hotkeys of a netuid in a single HMGET.
+
+        A hotkey missing from a complete netuid hash has no dividends, so it is answered with 0.
+
+        Args:
+            netuid (int): The netuid to fetch the values for.
+            hotkeys (list[str]): The hotkeys to fetch the values for.
+
+        Returns:
+            dict[str, float] | None: The dividend value per hotkey, or None if any hotkey has no cached value.
+        """
+        async def fetch() -> dict[str, float] | None:
+            complete, *dividend_values = await self.redis.hmget(tao_dividends_hash_key(netuid), [COMPLETE_FIELD, *hotkeys])
+
+            if complete is None and any(dividend_value is None for dividend_value in dividend_values):
+                return None
 
-        dividend_value = self.redis.get(key)
+            return { hotkey: float(dividend_value) if dividend_value is not None else 0.0 for hotkey, dividend_value in zip(hotkeys, dividend_values) }
 
-        return json.loads(dividend_value) if dividend_value is not None else None
+        return await self._read_through(("tao_dividends", netuid, tuple(hotkeys)), tao_dividends_hash_key(netuid), fetch)
 
-    def set_tao_dividends(self, dividends: dict[str, float], netuid: Optional[int] = None, hotkey: Optional[str] = None):
+    async def set_tao_dividends(self, dividends: dict[str, float], netuid: Optional[int] = None, hotkey: Optional[str] = None):
         """Updates cached Tao Dividend values in Redis.
-        
+
+        A netuid-wide (or all-netuid) result replaces the whole hash, marks it complete and stores its serialized copy.
+        A single hotkey result is only added to the netuid hash and its rank, without pushing back when the rest of
+        the hash expires, and drops the serialized copy it would make stale.
+
         Args:
             dividends (dict[str, float]): The dividend value to update the cache with.
             netuid (int | None): The netuid to update the cache for, or None if all netuids.
             hotkey (str | None): The hotkey to update the cache for, or None if all hotkeys.
         """
-        netuid_part = str(netuid) if netuid is not None else "*"
-        hotkey_part = hotkey if hotkey is not None else "*"
-        key = f"tao_dividends:{netuid_part}:{hotkey_part}"
+        key = tao_dividends_hash_key(netuid)
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if hotkey is None:
+                pipe.delete(key)
+                pipe.hset(key, mapping=encode_dividends(dividends))
+                pipe.expire(key, TAO_DIVIDEND_EXPIRY_SECONDS)
+                pipe.set(dividends_blob_key(key, self.serializer), self.serializer.dumps(dividends), ex=TAO_DIVIDEND_EXPIRY_SECONDS)
+                self._set_rank(pipe, tao_dividends_rank_key(netuid), dividends, TAO_DIVIDEND_EXPIRY_SECONDS)
+            else:
+                rank_key = tao_dividends_rank_key(netuid)
+                pipe.hset(key, mapping=dividends)
+                pipe.expire(key, TAO_DIVIDEND_EXPIRY_SECONDS, nx=True)
+                pipe.delete(dividends_blob_key(key, self.serializer))
+                # Keeps the rank of a complete hash in step with it, pages of an incomplete hash are never served
+                pipe.zadd(rank_key, dividends)
+                pipe.expire(rank_key, TAO_DIVIDEND_EXPIRY_SECONDS, nx=True)
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, key)
+            await pipe.execute()
+
+        self._invalidate_local(key)
+
+    async def get_tao_dividends_page(
+        self,
+        netuid: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        min_dividend: Optional[float] = None,
+        descending: bool = True,
+        block_hash: Optional[str] = None
+    ) -> tuple[list[tuple[str, float]], int] | None:
+        """Fetches one page of hotkeys ranked by dividend value, from the cache or from a snapshot.
+
+        Args:
+            netuid (int | None): The netuid to rank the hotkeys of, or None for the aggregate of all netuids.
+            offset (int): How many ranked hotkeys to skip.
+            limit (int): How many ranked hotkeys to return at most.
+            min_dividend (float | None): The lowest dividend value to include, or None to include every hotkey.
+            descending (bool): Whether the highest dividend values come first.
+            block_hash (str | None): The block hash of the snapshot to read, or None to read the cache.
+
+        Returns:
+            tuple[list[tuple[str, float]], int] | None: The page of (hotkey, dividend) pairs and the number of hotkeys
+                at or above `min_dividend`, or None if the netuid has no complete cached value.
+        """
+        hash_key = snapshot_key(block_hash, netuid) if block_hash is not None else tao_dividends_hash_key(netuid)
+        rank_key = snapshot_rank_key(block_hash, netuid) if block_hash is not None else tao_dividends_rank_key(netuid)
+        min_score = min_dividend if min_dividend is not None else "-inf"
+
+        async def fetch() -> tuple[list[tuple[str, float]], int] | None:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # The rank is written with the complete hash, an empty netuid has the marker but no sorted set
+                pipe.hexists(hash_key, COMPLETE_FIELD)
+                pipe.zcount(rank_key, min_score, "+inf")
+
+                if descending:
+                    pipe.zrevrangebyscore(rank_key, "+inf", min_score, start=offset, num=limit, withscores=True)
+                else:
+                    pipe.zrangebyscore(rank_key, min_score, "+inf", start=offset, num=limit, withscores=True)
+
+                complete, total, page = await pipe.execute()
+
+            if not complete:
+                return None
+
+            return [(hotkey.decode(), dividend) for hotkey, dividend in page], total
+
+        return await self._read_through(("tao_dividends_page", block_hash, netuid, offset, limit, min_dividend, descending), hash_key, fetch)
+
+    def tao_dividends_lock(self, netuid: Optional[int] = None, hotkey: Optional[str] = None) -> Lock:
+        """Builds the distributed lock guarding a chain fetch of the given Tao Dividend key.
+
+        The lock expires on its own so a crashed replica can never hold it forever.
+
+        Args:
+            netuid (int | None): The netuid of the key, or None if all netuids.
+            hotkey (str | None): The hotkey of the key, or None if all hotkeys.
+
+        Returns:
+            Lock: The (not yet acquired) Redis lock.
+        """
+        return self.redis.lock(f"lock:{tao_dividends_key(netuid, hotkey)}", timeout=TAO_DIVIDEND_LOCK_TIMEOUT_SECONDS)
+
+    async def get_latest_snapshot(self) -> dict | None:
+        """Fetches the block of the newest published dividend snapshot.
+
+        Returns:
+            dict | None: The `block_hash` and `block_number` of the newest snapshot, or None if none was published.
+        """
+        async def fetch() -> dict | None:
+            latest = await self.redis.get("tao_dividends_snapshot:latest")
+            return json.loads(latest) if latest is not None else None
+
+        return await self._read_through("tao_dividends_snapshot:latest", "tao_dividends_snapshot:latest", fetch)
+
+    async def get_snapshot_dividends(self, block_hash: str, netuid: Optional[int] = None, hotkeys: Optional[list[str]] = None) -> dict[str, float] | None:
+        """Fetches the dividends of one netuid, or the all-netuid aggregate, from a snapshot.
+
+        Args:
+            block_hash (str): The block hash of the snapshot.
+            netuid (int | None): The netuid to fetch the value for, or None for the aggregate of all netuids.
+            hotkeys (list[str] | None): The hotkeys to fetch the values for with a single HMGET, or None for all hotkeys.
+
+        Returns:
+            dict[str, float] | None: The dividend value per hotkey, or None if the snapshot or netuid is missing.
+        """
+        async def fetch() -> dict[str, float] | None:
+            if hotkeys is None:
+                return await self._get_complete_dividends(snapshot_key(block_hash, netuid))
+
+            complete, *dividend_values = await self.redis.hmget(snapshot_key(block_hash, netuid), [COMPLETE_FIELD, *hotkeys])
+
+            if complete is None:
+                return None
+
+            return { hotkey: float(dividend_value) if dividend_value is not None else 0.0 for hotkey, dividend_value in zip(hotkeys, dividend_values) }
+
+        # A snapshot never changes once published, so its values only leave the cache by expiring
+        return await self._read_through(("tao_dividends_snapshot", block_hash, netuid, tuple(hotkeys) if hotkeys is not None else None), snapshot_key(block_hash, netuid), fetch)
+
+    async def iter_snapshot_netuids(self, block_hash: str) -> AsyncIterator[tuple[int, dict[str, float]]]:
+        """Iterates over every netuid stored in a snapshot without loading the whole snapshot at once.
+
+        Args:
+            block_hash (str): The block hash of the snapshot.
+
+        Yields:
+            tuple[int, dict[str, float]]: The netuid and its dividend value per hotkey.
+        """
+        netuids = sorted(int(netuid) for netuid in await self.redis.smembers(snapshot_netuids_key(block_hash)))
+
+        for netuid in netuids:
+            dividends = await self.get_snapshot_dividends(block_hash, netuid)
+
+            if dividends is not None:
+                yield netuid, dividends
+
+    async def set_snapshot(self, block_hash: str, block_number: int, netuid_dividends: dict[int, dict[str, float]], total_dividends: dict[str, float]):
+        """Stores a dividend snapshot and publishes it as the newest one.
+
+        Every netuid gets its own hash, so hotkey lookups read single fields instead of the whole netuid. The snapshot
+        is fully written before the latest pointer moves, so readers never see a partial snapshot. The snapshot it
+        replaces only stays for `SNAPSHOT_GRACE_SECONDS`.
+
+        Args:
+            block_hash (str): The block hash the snapshot was taken at.
+            block_number (int): The block number the snapshot was taken at.
+            netuid_dividends (dict[int, dict[str, float]]): The dividend value per hotkey of every netuid.
+            total_dividends (dict[str, float]): The dividend value per hotkey summed over all netuids.
+        """
+        previous = await self.redis.get("tao_dividends_snapshot:latest")
+        previous_block_hash = json.loads(previous)["block_hash"] if previous is not None else None
+        previous_netuids: list[int | None] = []
+
+        if previous_block_hash is not None and previous_block_hash != block_hash:
+            previous_netuids = [int(netuid) for netuid in await self.redis.smembers(snapshot_netuids_key(previous_block_hash))] + [None]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for netuid, dividends in [*netuid_dividends.items(), (None, total_dividends)]:
+                pipe.delete(snapshot_key(block_hash, netuid))
+                pipe.hset(snapshot_key(block_hash, netuid), mapping=encode_dividends(dividends))
+                pipe.expire(snapshot_key(block_hash, netuid), SNAPSHOT_EXPIRY_SECONDS)
+                pipe.set(dividends_blob_key(snapshot_key(block_hash, netuid), self.serializer), self.serializer.dumps(dividends), ex=SNAPSHOT_EXPIRY_SECONDS)
+                self._set_rank(pipe, snapshot_rank_key(block_hash, netuid), dividends, SNAPSHOT_EXPIRY_SECONDS)
+
+            pipe.delete(snapshot_netuids_key(block_hash))
+
+            if len(netuid_dividends) > 0:
+                pipe.sadd(snapshot_netuids_key(block_hash), *netuid_dividends.keys())
+
+            pipe.expire(snapshot_netuids_key(block_hash), SNAPSHOT_EXPIRY_SECONDS)
+            # The pointer never outlives the snapshot it points to, even if no replica refreshes it anymore
+            pipe.set("tao_dividends_snapshot:latest", json.dumps({ "block_hash": block_hash, "block_number": block_number }), ex=SNAPSHOT_EXPIRY_SECONDS)
+
+            for netuid in previous_netuids:
+                pipe.expire(snapshot_key(previous_block_hash, netuid), SNAPSHOT_GRACE_SECONDS, lt=True)
+                pipe.expire(dividends_blob_key(snapshot_key(previous_block_hash, netuid), self.serializer), SNAPSHOT_GRACE_SECONDS, lt=True)
+                pipe.expire(snapshot_rank_key(previous_block_hash, netuid), SNAPSHOT_GRACE_SECONDS, lt=True)
+
+            if previous_block_hash is not None and previous_block_hash != block_hash:
+                pipe.expire(snapshot_netuids_key(previous_block_hash), SNAPSHOT_GRACE_SECONDS, lt=True)
+
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, "tao_dividends_snapshot:latest")
+            await pipe.execute()
+
+        self._invalidate_local("tao_dividends_snapshot:latest")
+
+    def snapshot_refresh_lock(self) -> Lock:
+        """Builds the distributed lock electing the single API replica that refreshes snapshots.
+
+        Returns:
+            Lock: The (not yet acquired) Redis lock.
+        """
+        return self.redis.lock("lock:tao_dividends_snapshot", timeout=SNAPSHOT_LOCK_TIMEOUT_SECONDS)
+
+    async def get_sentiment_score(self, digest: str) -> float | None:
+        """Fetches a cached sentiment score from Redis.
+
+        Args:
+            digest (str): The content hash of the scored model, prompt and text.
+
+        Returns:
+            float | None: The sentiment score, or None if no cached value.
+        """
+        score = await self.redis.get(f"sentiment_score:{digest}")
+        return float(score) if score is not None else None
+
+    async def set_sentiment_score(self, digest: str, score: float, expiry_seconds: int = SENTIMENT_CACHE_EXPIRY_SECONDS, max_entries: int = SENTIMENT_CACHE_MAX_ENTRIES):
+        """Updates a cached sentiment score in Redis, evicting the oldest scores beyond `max_entries`.
+
+        Args:
+            digest (str): The content hash of the scored model, prompt and text.
+            score (float): The sentiment score to update the cache with.
+            expiry_seconds (int): How long the score stays cached.
+            max_entries (int): How many scores are kept at most.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(f"sentiment_score:{digest}", score, ex=expiry_seconds)
+            pipe.zadd("sentiment_score:index", { digest: time.time() })
+            pipe.zcard("sentiment_score:index")
+            _, _, entries = await pipe.execute()
+
+        if entries > max_entries:
+            evicted = await self.redis.zpopmin("sentiment_score:index", entries - max_entries)
+
+            if len(evicted) > 0:
+                await self.redis.delete(*[f"sentiment_score:{evicted_digest.decode()}" for evicted_digest, _ in evicted])
+
+    async def increment_sentiment_cache_stats(self, hits: int = 0, misses: int = 0):
+        """Adds to the shared sentiment cache hit/miss counters.
+
+        Args:
+            hits (int): The number of hits to add.
+            misses (int): The number of misses to add.
+        """
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hincrby("sentiment_score:stats", "hits", hits)
+            pipe.hincrby("sentiment_score:stats", "misses", misses)
+            await pipe.execute()
+
+    async def get_sentiment_cache_stats(self) -> dict[str, int]:
+        """Fetches the shared sentiment cache hit/miss counters.
+
+        Returns:
+            dict[str, int]: The `hits` and `misses` counted by every process.
+        """
+        stats = await self.redis.hgetall("sentiment_score:stats")
+        return { "hits": int(stats.get(b"hits", 0)), "misses": int(stats.get(b"misses", 0)) }
+
+    async def get_tweet_scores(self, netuid: int, tweet_ids: list[str]) -> dict[str, dict]:
+        """Fetches the stored per-tweet sentiment scores of a netuid.
+
+        Args:
+            netuid (int): The netuid the tweets were found for.
+            tweet_ids (list[str]): The tweet IDs to fetch the scores for.
+
+        Returns:
+            dict[str, dict]: The stored score record per tweet ID, tweets without a stored score are left out.
+        """
+        if len(tweet_ids) == 0:
+            return {}
+
+        tweet_scores = await self.redis.hmget(tweet_scores_key(netuid, self.serializer), tweet_ids)
+
+        return { tweet_id: self.serializer.loads(tweet_score) for tweet_id, tweet_score in zip(tweet_ids, tweet_scores) if tweet_score is not None }
+
+    async def set_tweet_scores(self, netuid: int, tweet_scores: dict[str, dict], expiry_seconds: int = TWEET_SCORE_EXPIRY_SECONDS):
+        """Stores per-tweet sentiment scores of a netuid, pruning the scores of tweets older than `expiry_seconds`.
+
+        Tweets without a known time are aged from when they were first stored.
+
+        Args:
+            netuid (int): The netuid the tweets were found for.
+            tweet_scores (dict[str, dict]): The score record per tweet ID.
+            expiry_seconds (int): How long a tweet's score is kept after the tweet was posted.
+        """
+        if len(tweet_scores) == 0:
+            return
+
+        key = tweet_scores_key(netuid, self.serializer)
+        index_key = tweet_scores_index_key(netuid, self.serializer)
+        now = time.time()
+        cutoff = now - expiry_seconds
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={ tweet_id: self.serializer.dumps(tweet_score) for tweet_id, tweet_score in tweet_scores.items() })
+            # NX keeps the first-seen time of tweets without a timestamp, so a rescored tweet still ages out
+            pipe.zadd(index_key, { tweet_id: tweet_score.get("created_at") or now for tweet_id, tweet_score in tweet_scores.items() }, nx=True)
+            pipe.zrangebyscore(index_key, "-inf", cutoff)
+            pipe.expire(key, expiry_seconds)
+            pipe.expire(index_key, expiry_seconds)
+            _, _, stale_tweet_ids, _, _ = await pipe.execute()
+
+        # Old tweets still returned by the search keep the score just paid for until a later write
+        stale_tweet_ids = [tweet_id for tweet_id in stale_tweet_ids if tweet_id.decode() not in tweet_scores]
+
+        if len(stale_tweet_ids) > 0:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hdel(key, *stale_tweet_ids)
+                pipe.zrem(index_key, *stale_tweet_ids)
+                await pipe.execute()
+
+    async def add_stake_intent(self, netuid: int, hotkey: Optional[str], amount: float, flush_after_seconds: float) -> bool:
+        """Adds a stake delta to the pending stake intents, netted with earlier deltas of the same netuid and hotkey.
+
+        Args:
+            netuid (int): The netuid to stake on.
+            hotkey (str | None): The hotkey to stake on, or None if the subnet owner hotkey should be used.
+            amount (float): The amount of TAO to stake, negative to unstake.
+            flush_after_seconds (float): How long the caller waits before flushing the pending intents.
+
+        Returns:
+            bool: True if no flush is scheduled yet for the pending intents and the caller should schedule one.
+        """
+        # The marker outlives the window, so a flush that never ran does not block later windows forever
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrbyfloat("stake_intents", f"{netuid}:{hotkey or ''}", amount)
+            pipe.set("stake_intents:flush_scheduled", 1, nx=True, ex=int(flush_after_seconds) + STAKE_INTENT_FLUSH_GRACE_SECONDS)
+            _, scheduled = await pipe.execute()
+
+        return bool(scheduled)
+
+    async def take_stake_intents(self) -> dict[tuple[int, Optional[str]], float]:
+        """Moves every pending stake intent to the processing hash, so deltas added afterwards go into the next window.
+
+        The intents stay there until `finish_stake_intents`, so a flush that never finishes does not lose them. If
+        such a flush left intents behind, those are taken again instead and the pending ones wait for the next flush.
+
+        Returns:
+            dict[tuple[int, str | None], float]: The net amount of TAO to stake per (netuid, hotkey), negative to unstake.
+        """
+        try:
+            await self.redis.renamenx("stake_intents", "stake_intents:processing")
+        except redis.ResponseError:
+            # Nothing was queued since the last flush
+            pass
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete("stake_intents:flush_scheduled")
+            pipe.hgetall("stake_intents:processing")
+            _, intents = await pipe.execute()
+
+        stake_intents: dict[tuple[int, Optional[str]], float] = {}
+
+        for field, amount in intents.items():
+            netuid, hotkey = field.decode().split(":", 1)
+            stake_intents[(int(netuid), hotkey or None)] = float(amount)
+
+        return stake_intents
 
-        self.redis.set(key, json.dumps(dividends), ex=TAO_DIVIDEND_EXPIRY_SECONDS)
+    async def finish_stake_intents(
+        self,
+        stake_intents: dict[tuple[int, Optional[str]], float],
+        results: dict[tuple[int, Optional[str]], bool],
+        max_attempts: int,
+        flush_after_seconds: float,
+        release: bool = True,
+        dispatched: bool = True
+    ) -> bool:
+        """Drops the intents taken by `take_stake_intents`, adding the failed ones back to the pending intents.
 
-    def get_total_networks(self) -> int | None:
+        A failed intent is netted with the deltas queued in the meantime and retried with the next flush, until it
+        failed `max_attempts` times.
+
+        Args:
+            stake_intents (dict[tuple[int, str | None], float]): The intents returned by `take_stake_intents`.
+            results (dict[tuple[int, str | None], bool]): Whether each intent was staked or unstaked, missing ones failed.
+            max_attempts (int): How many flushes an intent is tried in at most.
+            flush_after_seconds (float): How long the caller waits before flushing the pending intents.
+            release (bool): Whether to drop the processing hash, False when reconciling intents that were already
+                released.
+            dispatched (bool): Whether `results` are the dispatch results, False if only the submission results. The
+                attempts of a submitted intent are then still counted until it dispatched.
+
+        Returns:
+            bool: True if intents are pending, no flush is scheduled yet and the caller should schedule one.
+        """
+        fields = { key: f"{key[0]}:{key[1] or ''}" for key in stake_intents }
+        failed = [key for key in stake_intents if not results.get(key, False)]
+        attempts = await self.redis.hmget("stake_intents:attempts", [fields[key] for key in failed]) if len(failed) > 0 else []
+        retried: dict[str, float] = {}
+
+        for key, key_attempts in zip(failed, attempts):
+            if int(key_attempts or 0) + 1 >= max_attempts:
+                logger.error(f"Dropping stake intent of {stake_intents[key]} on {fields[key]} after {max_attempts} failed attempts")
+            else:
+                retried[fields[key]] = stake_intents[key]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for field, amount in retried.items():
+                pipe.hincrbyfloat("stake_intents", field, amount)
+                pipe.hincrby("stake_intents:attempts", field, 1)
+
+            finished = [fields[key] for key in stake_intents if fields[key] not in retried and (dispatched or not results.get(key, False))]
+
+            if len(finished) > 0:
+                pipe.hdel("stake_intents:attempts", *finished)
+
+            pipe.expire("stake_intents:attempts", int(flush_after_seconds) * max_attempts + STAKE_INTENT_FLUSH_GRACE_SECONDS)
+
+            if release:
+                pipe.delete("stake_intents:processing")
+
+            pipe.exists("stake_intents")
+            *_, pending = await pipe.execute()
+
+        if not pending:
+            return False
+
+        return bool(await self.redis.set("stake_intents:flush_scheduled", 1, nx=True, ex=int(flush_after_seconds) + STAKE_INTENT_FLUSH_GRACE_SECONDS))
+
+    async def set_signer_stats(self, stats: dict, expiry_seconds: int):
+        """Publishes the counters of the signing worker's signer, so API replicas can report them.
+
+        Args:
+            stats (dict): The signer counters.
+            expiry_seconds (int): How long the counters stay if the signing worker stops publishing them.
+        """
+        await self.redis.set("tao_signer:stats", json.dumps(stats), ex=expiry_seconds)
+
+    async def get_signer_stats(self) -> dict | None:
+        """Fetches the counters last published by the signing worker.
+
+        Returns:
+            dict | None: The signer counters, or None if no signing worker published them recently.
+        """
+        stats = await self.redis.get("tao_signer:stats")
+        return json.loads(stats) if stats is not None else None
+
+    async def claim_trade_trigger(self, netuid: int, hotkey: Optional[str], task_id: str, timeout_seconds: int) -> str | None:
+        """Marks a trade on the given netuid and hotkey as in flight, unless one is already pending or recent.
+
+        Args:
+            netuid (int): The netuid of the trade.
+            hotkey (str | None): The hotkey of the trade, or None if the default hotkey.
+            task_id (str): The task ID the trade will be submitted with.
+            timeout_seconds (int): How long the marker stays if the task never finishes.
+
+        Returns:
+            str | None: The task ID of the pending or recent trade, or None if the caller claimed the trade and should
+                submit it.
+        """
+        existing_task_id = await self.redis.set(trade_trigger_key(netuid, hotkey), task_id, nx=True, ex=timeout_seconds, get=True)
+        return existing_task_id.decode() if existing_task_id is not None else None
+
+    async def finish_trade_trigger(self, key: str, task_id: str, debounce_seconds: int):
+        """Keeps a finished trade's marker only for the debounce window, so the next trigger after it starts a new trade.
+
+        Args:
+            key (str): The Redis key of the marker, as built by `trade_trigger_key`.
+            task_id (str): The task ID of the finished trade.
+            debounce_seconds (int): How long duplicate triggers keep reusing the finished task.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # A marker that already expired and was claimed by a newer trade is left alone
+            await pipe.watch(key)
+            current_task_id = await pipe.get(key)
+
+            if current_task_id is None or current_task_id.decode() != task_id:
+                await pipe.unwatch()
+                return
+
+            pipe.multi()
+            pipe.expire(key, debounce_seconds)
+            await pipe.execute()
+
+    async def get_total_networks(self) -> int | None:
         """Fetches cached Total Networks value from Redis.
-        
+
         Returns:
             int | None: The total number of networks, or None if no cached value.
         """
-        total_networks = self.redis.get("total_networks")
-        return int(total_networks) if total_networks is not None else None
-    
-    def set_total_networks(self, total_networks: int):
+        async def fetch() -> int | None:
+            total_networks = await self.redis.get("total_networks")
+            return int(total_networks) if total_networks is not None else None
+
+        # Invalidated on every write, so it can stay as long as Redis keeps it
+        return await self._read_through("total_networks", "total_networks", fetch, ttl=TOTAL_NETWORKS_EXPIRY_SECONDS)
+
+    async def set_total_networks(self, total_networks: int):
         """Updates cached Total Networks value in Redis.
-        
+
         Args:
             total_networks (int): The total number of networks to update the cache with.
         """
-        self.redis.set("total_networks", total_networks, ex=TOTAL_NETWORKS_EXPIRY_SECONDS)
\ No newline at end of file
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set("total_networks", total_networks, ex=TOTAL_NETWORKS_EXPIRY_SECONDS)
+            pipe.publish(CACHE_INVALIDATION_CHANNEL, "total_networks")
+            await pipe.execute()
+
+        self._invalidate_local("total_networks")
+
+    async def _get_complete_dividends(self, hash_key: str) -> dict[str, float] | None:
+        blob = await self.redis.get(dividends_blob_key(hash_key, self.serializer))
+
+        if blob is not None:
+            return self.serializer.loads(blob)
+
+        # Written by another format, or a hotkey was added since, so decode the hash itself
+        hash_value = await self.redis.hgetall(hash_key)
+        return decode_dividends(hash_value) if COMPLETE_FIELD.encode() in hash_value else None
+
+    def _set_rank(self, pipe, rank_key: str, dividends: dict[str, float], expiry_seconds: int):
+        pipe.delete(rank_key)
+
+        if len(dividends) > 0:
+            pipe.zadd(rank_key, dividends)
+            pipe.expire(rank_key, expiry_seconds)
+
+    async def _read_through(self, key: Hashable, tag: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[float] = None) -> Any:
+        if self.local_cache is None:
+            return await fetch()
+
+        value = self.local_cache.get(key)
+
+        if value is not None:
+            return value
+
+        generation = self.local_cache.generation(tag)
+        value = await fetch()
+
+        # Misses are not cached, the next read should see the value as soon as it is written
+        if value is not None:
+            self.local_cache.set(key, value, tag, generation, ttl=ttl)
+
+        return value
+
+    def _invalidate_local(self, tag: str):
+        if self.local_cache is not None:
+            self.local_cache.invalidate(tag)
+
+    async def _listen_invalidations(self):
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+
+                    # Anything written while we were not subscribed was never invalidated
+                    self.local_cache.clear()
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.local_cache.invalidate(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed, resubscribing: {e}")
+
+            await asyncio.sleep(CACHE_INVALIDATION_RETRY_SECONDS)
@@ -0,0 +1,140 @@
+# Imports
+from typing import AsyncIterator, Iterable
+from tao_substrate import TaoSubstratePool
+import asyncio
+import logging
+
+# Configuration
+SCANNER_CONCURRENCY = 8
+SCANNER_NETUID_TIMEOUT_SECONDS = 30
+SCANNER_NETUID_RETRIES = 2
+SCANNER_RETRY_BACKOFF_SECONDS = 0.5
+SCANNER_PAGE_SIZE = 100
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoDividendScanner:
+    def __init__(
+        self,
+        substrate_pool: TaoSubstratePool,
+        concurrency: int = SCANNER_CONCURRENCY,
+        netuid_timeout: float = SCANNER_NETUID_TIMEOUT_SECONDS,
+        netuid_retries: int = SCANNER_NETUID_RETRIES,
+        page_size: int = SCANNER_PAGE_SIZE
+    ) -> None:
+        self.substrate_pool = substrate_pool
+        self.concurrency = concurrency
+        self.netuid_timeout = netuid_timeout
+        self.netuid_retries = netuid_retries
+        self.page_size = page_size
+
+    async def get_block(self) -> tuple[str, int]:
+        """Fetches the chain head so a whole scan can be pinned to one block.
+
+        Returns:
+            tuple[str, int]: The block hash and block number of the chain head.
+        """
+        async with self.substrate_pool.connection() as substrate:
+            block_hash = await substrate.get_chain_head()
+            block_number = await substrate.get_block_number(block_hash)
+
+        return block_hash, block_number
+
+    async def scan_netuid(self, netuid: int, block_hash: str) -> AsyncIterator[dict[str, float]]:
+        """Streams the dividends of one netuid page by page at a pinned block.
+
+        A page that fails or times out is retried from the last key that was already yielded, so no hotkey is ever
+        yielded twice.
+
+        Args:
+            netuid (int): The netuid to scan.
+            block_hash (str): The block hash to pin the scan to.
+
+        Yields:
+            dict[str, float]: The dividend value per hotkey of the next page.
+        """
+        start_key: str | None = None
+        attempt = 0
+
+        while True:
+            try:
+                async with self.substrate_pool.connection() as substrate:
+                    page = await asyncio.wait_for(substrate.query_map(
+                        module="SubtensorModule",
+                        storage_function="TaoDividendsPerSubnet",
+                        params=[netuid],
+                        block_hash=block_hash,
+                        start_key=start_key,
+                        page_size=self.page_size
+                    ), timeout=self.netuid_timeout)
+            except Exception as e:
+                attempt += 1
+
+                if attempt > self.netuid_retries:
+                    logger.error(f"Scanning netuid {netuid} failed after {attempt} attempts: {e}")
+                    raise
+
+                logger.warning(f"Scanning netuid {netuid} failed (attempt {attempt}), retrying: {e}")
+                await asyncio.sleep(SCANNER_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+                continue
+
+            from bittensor.core.chain_data import decode_account_id
+
+            page_dividends: dict[str, float] = {}
+
+            for k, v in page.records:
+                page_dividends[decode_account_id(k)] = float(v.value)
+
+            if len(page_dividends) > 0:
+                yield page_dividends
+
+            if page.last_key is None or len(page.records) < self.page_size:
+                return
+
+            start_key = page.last_key
+
+    async def scan(self, netuids: Iterable[int], block_hash: str) -> AsyncIterator[tuple[int, dict[str, float]]]:
+        """Streams the dividends of several netuids with bounded concurrency, pinned to one block.
+
+        Pages are yielded in the order they arrive rather than in netuid order, so fast subnets are never held back by
+        slow ones.
+
+        Args:
+            netuids (Iterable[int]): The netuids to scan.
+            block_hash (str): The block hash to pin the scan to.
+
+        Yields:
+            tuple[int, dict[str, float]]: The netuid and the dividend value per hotkey of the next page.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        queue: asyncio.Queue[tuple[int, dict[str, float]] | None] = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def scan_one(netuid: int):
+            async with semaphore:
+                async for page_dividends in self.scan_netuid(netuid, block_hash):
+                    await queue.put((netuid, page_dividends))
+
+        tasks = [asyncio.create_task(scan_one(netuid)) for netuid in netuids]
+
+        async def scan_all():
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                await queue.put(None)
+
+        runner = asyncio.create_task(scan_all())
+
+        try:
+            while (item := await queue.get()) is not None:
+                yield item
+
+            # Re-raises the first netuid failure, if any
+            await runner
+        finally:
+            for task in tasks + [runner]:
+                task.cancel()
+
+            await asyncio.gather(*tasks, runner, return_exceptions=True)
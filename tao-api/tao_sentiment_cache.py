@@ -0,0 +1,140 @@
+# Imports
+from collections import OrderedDict
+from tao_redis import TaoRedis
+import hashlib
+import unicodedata
+import time
+import logging
+
+# Configuration
+LOCAL_CACHE_SIZE = 1024
+SENTIMENT_CACHE_EXPIRY_SECONDS = 86400
+SENTIMENT_CACHE_MAX_ENTRIES = 100000
+STATS_FLUSH_SECONDS = 10
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def sentiment_digest(model: str, prompt_template: str, text: str) -> str:
+    """Hashes the inputs of a sentiment analysis call into its cache key.
+
+    The text is normalized first, so whitespace and unicode form differences do not cause misses.
+
+    Args:
+        model (str): The model that scores the text.
+        prompt_template (str): The prompt template the text is inserted into.
+        text (str): The text to score.
+
+    Returns:
+        str: The hex digest.
+    """
+    normalized_text = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256("\0".join([model, prompt_template, normalized_text]).encode()).hexdigest()
+
+class TaoSentimentCache:
+    def __init__(self, tao_redis: TaoRedis, local_size: int = LOCAL_CACHE_SIZE, expiry_seconds: int = SENTIMENT_CACHE_EXPIRY_SECONDS, max_entries: int = SENTIMENT_CACHE_MAX_ENTRIES, stats_flush_seconds: float = STATS_FLUSH_SECONDS) -> None:
+        self.tao_redis = tao_redis
+        self.local_size = local_size
+        self.expiry_seconds = expiry_seconds
+        self.max_entries = max_entries
+        self.stats_flush_seconds = stats_flush_seconds
+        self.local: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+        # Shared counters are added up here and written at most once per flush interval, not once per lookup
+        self.pending_hits = 0
+        self.pending_misses = 0
+        self.next_stats_flush = time.monotonic() + stats_flush_seconds
+
+    async def get(self, model: str, prompt_template: str, text: str) -> float | None:
+        """Fetches a cached sentiment score, checking the in-process LRU before Redis.
+
+        Args:
+            model (str): The model that scores the text.
+            prompt_template (str): The prompt template the text is inserted into.
+            text (str): The text to score.
+
+        Returns:
+            float | None: The sentiment score, or None if no cached value.
+        """
+        digest = sentiment_digest(model, prompt_template, text)
+        local_entry = self.local.get(digest)
+
+        if local_entry is not None and local_entry[1] > time.monotonic():
+            self.local.move_to_end(digest)
+            # Local hits stay off the network, they only show up in this process's stats
+            self.local_hits += 1
+            return local_entry[0]
+
+        try:
+            score = await self.tao_redis.get_sentiment_score(digest)
+        except Exception as e:
+            logger.warning(f"Sentiment cache lookup failed: {e}")
+            score = None
+
+        if score is not None:
+            self._set_local(digest, score)
+            self.redis_hits += 1
+            self.pending_hits += 1
+        else:
+            self.misses += 1
+            self.pending_misses += 1
+
+        if time.monotonic() >= self.next_stats_flush:
+            await self.flush_stats()
+
+        return score
+
+    async def set(self, model: str, prompt_template: str, text: str, score: float):
+        """Caches a sentiment score both in-process and in Redis.
+
+        Args:
+            model (str): The model that scored the text.
+            prompt_template (str): The prompt template the text was inserted into.
+            text (str): The scored text.
+            score (float): The sentiment score.
+        """
+        digest = sentiment_digest(model, prompt_template, text)
+        self._set_local(digest, score)
+
+        try:
+            await self.tao_redis.set_sentiment_score(digest, score, expiry_seconds=self.expiry_seconds, max_entries=self.max_entries)
+        except Exception as e:
+            logger.warning(f"Sentiment cache update failed: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Returns the hit/miss counters of this process.
+
+        Returns:
+            dict[str, int]: The local hits, Redis hits and misses.
+        """
+        return {
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses
+        }
+
+    async def flush_stats(self):
+        """Adds the hits and misses counted since the last flush to the shared Redis counters."""
+        hits, misses = self.pending_hits, self.pending_misses
+        self.pending_hits = self.pending_misses = 0
+        self.next_stats_flush = time.monotonic() + self.stats_flush_seconds
+
+        if hits == 0 and misses == 0:
+            return
+
+        try:
+            await self.tao_redis.increment_sentiment_cache_stats(hits=hits, misses=misses)
+        except Exception as e:
+            logger.warning(f"Sentiment cache stats update failed: {e}")
+
+    def _set_local(self, digest: str, score: float):
+        self.local[digest] = (score, time.monotonic() + self.expiry_seconds)
+        self.local.move_to_end(digest)
+
+        while len(self.local) > self.local_size:
+            self.local.popitem(last=False)
@@ -0,0 +1,156 @@
+# Imports
+from typing import Optional
+from sqlalchemy import select, func
+from sqlalchemy.dialects.mysql import insert
+from tao_db import TaoDB, TaoDB_Sentiment, TaoDB_Sentiment_Rollup_Hourly, TaoDB_Sentiment_Rollup_Daily
+from datetime import datetime, timedelta
+import logging
+
+# Configuration
+ROLLUP_PERIODS = {
+    "hour": (TaoDB_Sentiment_Rollup_Hourly, timedelta(hours=1)),
+    "day": (TaoDB_Sentiment_Rollup_Daily, timedelta(days=1))
+}
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def rollup_bucket(timestamp: datetime, period: str) -> datetime:
+    """Truncates a timestamp to the start of its rollup bucket.
+
+    Args:
+        timestamp (datetime): The timestamp to truncate.
+        period (str): The rollup period, `hour` or `day`.
+
+    Returns:
+        datetime: The start of the bucket.
+    """
+    if period == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+class TaoSentimentStats:
+    def __init__(self, tao_db: TaoDB) -> None:
+        self.tao_db = tao_db
+
+    async def record(self, netuid: int, hotkey: Optional[str], sentiment_score: float, stake_amount: float, traded: bool, timestamp: Optional[datetime] = None):
+        """Stores a sentiment score and its stake, and adds them to the hourly and daily rollups in the same transaction.
+
+        Args:
+            netuid (int): The netuid that was scored.
+            hotkey (str | None): The hotkey that was staked on, or None if the subnet owner hotkey.
+            sentiment_score (float): The sentiment score of the netuid.
+            stake_amount (float): The amount of TAO staked, negative if unstaked.
+            traded (bool): Whether the stake or unstake was made successfully. A queued stake intent is not a trade
+                yet, it is added with `record_trades` once its flush is known to have succeeded.
+            timestamp (datetime | None): When the netuid was scored, or None for now.
+        """
+        timestamp = timestamp if timestamp is not None else datetime.now()
+        staked = stake_amount if traded and stake_amount > 0 else 0.0
+        unstaked = -stake_amount if traded and stake_amount < 0 else 0.0
+
+        async with self.tao_db.session_handler() as session:
+            session.add(TaoDB_Sentiment(
+                timestamp=timestamp,
+                netuid=netuid,
+                hotkey=hotkey,
+                sentiment_score=sentiment_score,
+                stake_amount=stake_amount
+            ))
+
+            await self._add_to_rollups(session, netuid, timestamp, samples=1, sentiment_sum=sentiment_score, staked=staked, unstaked=unstaked, trades=1 if traded else 0)
+            await session.commit()
+
+    async def record_trades(self, stake_amounts: dict[tuple[int, Optional[str]], float], timestamp: Optional[datetime] = None):
+        """Adds successfully flushed stake intents to the trade columns of the hourly and daily rollups.
+
+        Args:
+            stake_amounts (dict[tuple[int, str | None], float]): The net amount of TAO staked per (netuid, hotkey),
+                negative if unstaked.
+            timestamp (datetime | None): When the intents were flushed, or None for now.
+        """
+        timestamp = timestamp if timestamp is not None else datetime.now()
+        netuid_trades: dict[int, tuple[float, float, int]] = {}
+
+        for (netuid, _), stake_amount in stake_amounts.items():
+            staked, unstaked, trades = netuid_trades.get(netuid, (0.0, 0.0, 0))
+            netuid_trades[netuid] = (staked + max(stake_amount, 0.0), unstaked + max(-stake_amount, 0.0), trades + 1)
+
+        async with self.tao_db.session_handler() as session:
+            for netuid, (staked, unstaked, trades) in netuid_trades.items():
+                await self._add_to_rollups(session, netuid, timestamp, samples=0, sentiment_sum=0.0, staked=staked, unstaked=unstaked, trades=trades)
+
+            await session.commit()
+
+    async def get_stats(self, netuid: Optional[int] = None, period: str = "hour", buckets: int = 24) -> dict:
+        """Fetches rolling sentiment and stake stats from the rollups, reading at most one row per netuid and bucket.
+
+        Args:
+            netuid (int | None): The netuid to fetch the stats of, or None for every netuid combined.
+            period (str): The rollup period, `hour` or `day`.
+            buckets (int): How many of the latest buckets to cover, including the current one.
+
+        Returns:
+            dict: The `totals` over the whole window and the `buckets` in it, each with the `avg_sentiment`, the
+                `staked` and `unstaked` TAO, and the `trades` and `samples` counts.
+        """
+        rollup, length = ROLLUP_PERIODS[period]
+        since = rollup_bucket(datetime.now(), period) - length * (buckets - 1)
+        query = (
+            select(
+                rollup.bucket,
+                func.sum(rollup.samples),
+                func.sum(rollup.sentiment_sum),
+                func.sum(rollup.staked),
+                func.sum(rollup.unstaked),
+                func.sum(rollup.trades)
+            )
+            .where(rollup.bucket >= since)
+            .group_by(rollup.bucket)
+            .order_by(rollup.bucket)
+        )
+
+        if netuid is not None:
+            query = query.where(rollup.netuid == netuid)
+
+        async with self.tao_db.session_handler() as session:
+            rows = (await session.execute(query)).all()
+
+        bucket_stats = [{ "bucket": bucket, **self._summarize(samples, sentiment_sum, staked, unstaked, trades) } for bucket, samples, sentiment_sum, staked, unstaked, trades in rows]
+        totals = self._summarize(*[sum(row[i] or 0 for row in rows) for i in range(1, 6)])
+
+        return { "since": since, "totals": totals, "buckets": bucket_stats }
+
+    def _summarize(self, samples, sentiment_sum, staked, unstaked, trades) -> dict:
+        samples = int(samples or 0)
+
+        return {
+            "avg_sentiment": float(sentiment_sum) / samples if samples > 0 else None,
+            "staked": float(staked or 0),
+            "unstaked": float(unstaked or 0),
+            "trades": int(trades or 0),
+            "samples": samples
+        }
+
+    async def _add_to_rollups(self, session, netuid: int, timestamp: datetime, samples: int, sentiment_sum: float, staked: float, unstaked: float, trades: int):
+        # Each row is only ever added to, so the rollups stay exact without rescanning the raw table
+        for period, (rollup, _) in ROLLUP_PERIODS.items():
+            statement = insert(rollup).values(
+                netuid=netuid,
+                bucket=rollup_bucket(timestamp, period),
+                samples=samples,
+                sentiment_sum=sentiment_sum,
+                staked=staked,
+                unstaked=unstaked,
+                trades=trades
+            )
+            await session.execute(statement.on_duplicate_key_update(
+                samples=rollup.samples + statement.inserted.samples,
+                sentiment_sum=rollup.sentiment_sum + statement.inserted.sentiment_sum,
+                staked=rollup.staked + statement.inserted.staked,
+                unstaked=rollup.unstaked + statement.inserted.unstaked,
+                trades=rollup.trades + statement.inserted.trades
+            ))
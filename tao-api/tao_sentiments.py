@@ -1,13 +1,40 @@
-
 # Imports
 from decouple import config
-import requests
-from typing import Optional
+from tao_http import TaoHTTPClient
+from tao_loop import tao_event_loop
+from tao_redis import TaoRedis
+from tao_sentiment_cache import TaoSentimentCache
+from datetime import datetime
+import asyncio
+import hashlib
+import math
+import re
+import time
 import logging
 
 # Configuration
 DATURA_API_KEY: str = config("DATURA_API_KEY")
 CHUTES_API_KEY: str = config("CHUTES_API_KEY")
+HTTP_CONNECT_TIMEOUT_SECONDS: float = config("HTTP_CONNECT_TIMEOUT_SECONDS", default=5, cast=float)
+HTTP_READ_TIMEOUT_SECONDS: float = config("HTTP_READ_TIMEOUT_SECONDS", default=60, cast=float)
+HTTP_RETRIES: int = config("HTTP_RETRIES", default=3, cast=int)
+REDIS_HOST: str = config("REDIS_HOST", default="localhost")
+REDIS_PORT: int = config("REDIS_PORT", default=6379, cast=int)
+REDIS_DB: int = config("REDIS_DB", default=0, cast=int)
+SENTIMENT_CACHE_LOCAL_SIZE: int = config("SENTIMENT_CACHE_LOCAL_SIZE", default=1024, cast=int)
+SENTIMENT_CACHE_EXPIRY_SECONDS: int = config("SENTIMENT_CACHE_EXPIRY_SECONDS", default=86400, cast=int)
+SENTIMENT_CACHE_MAX_ENTRIES: int = config("SENTIMENT_CACHE_MAX_ENTRIES", default=100000, cast=int)
+SENTIMENT_CACHE_STATS_FLUSH_SECONDS: float = config("SENTIMENT_CACHE_STATS_FLUSH_SECONDS", default=10, cast=float)
+TWEET_WEIGHTING: str = config("TWEET_WEIGHTING", default="uniform")
+TWEET_RECENCY_HALF_LIFE_HOURS: float = config("TWEET_RECENCY_HALF_LIFE_HOURS", default=24, cast=float)
+TWEET_SCORING_CONCURRENCY: int = config("TWEET_SCORING_CONCURRENCY", default=4, cast=int)
+SENTIMENT_CHUNK_TOKEN_BUDGET: int = config("SENTIMENT_CHUNK_TOKEN_BUDGET", default=2048, cast=int)
+TWEET_DATE_FORMATS: list[str] = ["%a %b %d %H:%M:%S %z %Y", "%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z"]
+TWEET_ENGAGEMENT_FIELDS: list[str] = ["like_count", "retweet_count", "reply_count", "quote_count"]
+SENTIMENT_MODEL: str = "unsloth/Llama-3.2-3B-Instruct"
+SENTIMENT_PROMPT_TEMPLATE: str = "Return ONLY a sentiment score of -100 to 100 for the following text: {text}\nPlease make sure you ONLY return the sentiment score number (-100 to 100) and nothing else."
+SENTIMENT_BATCH_PROMPT_TEMPLATE: str = "Return ONLY a sentiment score of -100 to 100 for each of the following numbered texts, one line per text as `number: score`:\n{text}\nPlease make sure you ONLY return the numbered sentiment scores (-100 to 100) and nothing else."
+SENTIMENT_BATCH_LINE_PATTERN: re.Pattern = re.compile(r"^\s*(\d+)\s*[:.)]\s*(-?\d+(?:\.\d+)?)\s*$")
 
 # Configure Logger
 logger = logging.getLogger(__name__)
@@ -27,9 +54,28 @@ chutes_api_headers: dict = {
     "Content-Type": "application/json"
 }
 
-def search_recent_tweets(netuid: int) -> dict | None:
+datura_client: TaoHTTPClient = TaoHTTPClient(headers=datura_api_headers, connect_timeout=HTTP_CONNECT_TIMEOUT_SECONDS, read_timeout=HTTP_READ_TIMEOUT_SECONDS, retries=HTTP_RETRIES)
+chutes_client: TaoHTTPClient = TaoHTTPClient(headers=chutes_api_headers, connect_timeout=HTTP_CONNECT_TIMEOUT_SECONDS, read_timeout=HTTP_READ_TIMEOUT_SECONDS, retries=HTTP_RETRIES)
+
+tao_redis_instance: TaoRedis = TaoRedis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+sentiment_cache: TaoSentimentCache = TaoSentimentCache(
+    tao_redis_instance,
+    local_size=SENTIMENT_CACHE_LOCAL_SIZE,
+    expiry_seconds=SENTIMENT_CACHE_EXPIRY_SECONDS,
+    max_entries=SENTIMENT_CACHE_MAX_ENTRIES,
+    stats_flush_seconds=SENTIMENT_CACHE_STATS_FLUSH_SECONDS
+)
+
+async def close_clients():
+    """Closes the pooled HTTP sessions to Datura and Chutes and the Redis pool."""
+    await datura_client.close()
+    await chutes_client.close()
+    await sentiment_cache.flush_stats()
+    await tao_redis_instance.close()
+
+async def search_recent_tweets_async(netuid: int) -> dict | None:
     """Fetches recent tweets about the given netuid.
-    
+
     Args:
         netuid (int): The netuid to search for.
 
@@ -41,19 +87,19 @@ def search_recent_tweets(netuid: int) -> dict | None:
     }
 
     try:
-        response = requests.get(url=datura_api_url, headers=datura_api_headers, params=params)
+        status, response_data = await datura_client.request_json("GET", datura_api_url, params=params)
 
-        if response.status_code == 200:
-            logger.info(f"Search recent tweets successful, tweet count: {len(response.json())}")
-            return response.json()
+        if status == 200:
+            logger.info(f"Search recent tweets successful, tweet count: {len(response_data)}")
+            return response_data
         else:
-            logger.error(f"Search recent tweets failed: {str(response.json())}")
+            logger.error(f"Search recent tweets failed: {str(response_data)}")
             return None
     except Exception as e:
         logger.error(f"Search recent tweets failed: {str(e)}")
         return None
-    
-def perform_sentiment_analysis(text: str) -> float | None:
+
+async def perform_sentiment_analysis_async(text: str) -> float | None:
     """Performs sentiment analysis on the given text.
 
     Args:
@@ -62,10 +108,16 @@ def perform_sentiment_analysis(text: str) -> float | None:
     Returns:
         float | None: The sentiment score, or None if the score is out of range or the request fails.
     """
-    prompt = f"Return ONLY a sentiment score of -100 to 100 for the following text: {text}\nPlease make sure you ONLY return the sentiment score number (-100 to 100) and nothing else."
+    cached_score = await sentiment_cache.get(SENTIMENT_MODEL, SENTIMENT_PROMPT_TEMPLATE, text)
+
+    if cached_score is not None:
+        logger.info(f"Sentiment analysis score (cached): {cached_score}")
+        return cached_score
+
+    prompt = SENTIMENT_PROMPT_TEMPLATE.format(text=text)
 
     params = {
-        "model": "unsloth/Llama-3.2-3B-Instruct",
+        "model": SENTIMENT_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "stream": False,
         "max_tokens": 1024,
@@ -73,44 +125,300 @@ def perform_sentiment_analysis(text: str) -> float | None:
     }
 
     try:
-        response = requests.post(url=chutes_api_url, headers=chutes_api_headers, json=params)
+        status, response_data = await chutes_client.request_json("POST", chutes_api_url, json=params)
 
-        if response.status_code == 200:
-            response_data = response.json()
+        if status == 200:
             content: str = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
             score: float = float(content.strip())
 
             if -100 <= score <= 100:
                 logger.info(f"Sentiment analysis score: {score}")
+                await sentiment_cache.set(SENTIMENT_MODEL, SENTIMENT_PROMPT_TEMPLATE, text, score)
                 return score
             else:
                 logger.error(f"Sentiment analysis score is out of range: {score}")
                 return None
         else:
-            logger.error(f"Sentiment analysis failed: {str(response.json())}")
+            logger.error(f"Sentiment analysis failed: {str(response_data)}")
             return None
     except Exception as e:
         logger.error(f"Sentiment analysis failed: {str(e)}")
         return None
 
-def sentiment_analysis_on_recent_tweets(netuid: int) -> float | None:
-    """Performs sentiment analysis on the recent tweets about the given netuid.
-    
+async def perform_batch_sentiment_analysis_async(texts: list[str]) -> list[float | None]:
+    """Performs sentiment analysis on several texts with one request, scoring each text on its own.
+
+    Texts scored before are served from the sentiment cache, only the rest go into the numbered prompt.
+
+    Args:
+        texts (list[str]): The texts to analyze, one line each.
+
+    Returns:
+        list[float | None]: The sentiment score of each text, None where the model returned no score in range or the
+            request fails.
+    """
+    scores: list[float | None] = list(await asyncio.gather(*[sentiment_cache.get(SENTIMENT_MODEL, SENTIMENT_BATCH_PROMPT_TEMPLATE, text) for text in texts]))
+    uncached: list[int] = [i for i, score in enumerate(scores) if score is None]
+
+    if len(uncached) == 0:
+        return scores
+
+    prompt = SENTIMENT_BATCH_PROMPT_TEMPLATE.format(text="\n".join(f"{number}. {texts[i]}" for number, i in enumerate(uncached, 1)))
+
+    params = {
+        "model": SENTIMENT_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "stream": False,
+        "max_tokens": 1024,
+        "temperature": 0.6
+    }
+
+    try:
+        status, response_data = await chutes_client.request_json("POST", chutes_api_url, json=params)
+
+        if status != 200:
+            logger.error(f"Sentiment analysis failed: {str(response_data)}")
+            return scores
+
+        content: str = response_data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    except Exception as e:
+        logger.error(f"Sentiment analysis failed: {str(e)}")
+        return scores
+
+    for line in content.splitlines():
+        match = SENTIMENT_BATCH_LINE_PATTERN.match(line)
+
+        if match is None:
+            continue
+
+        number, score = int(match.group(1)), float(match.group(2))
+
+        if 1 <= number <= len(uncached) and -100 <= score <= 100:
+            scores[uncached[number - 1]] = score
+
+    missing = sum(1 for i in uncached if scores[i] is None)
+
+    if missing > 0:
+        logger.error(f"Sentiment analysis returned no score in range for {missing} of {len(uncached)} texts")
+
+    await asyncio.gather(*[sentiment_cache.set(SENTIMENT_MODEL, SENTIMENT_BATCH_PROMPT_TEMPLATE, texts[i], scores[i]) for i in uncached if scores[i] is not None])
+
+    return scores
+
+def normalize_tweet(tweet: dict | str) -> dict:
+    """Extracts the fields used for scoring and weighting from a Datura tweet.
+
+    Args:
+        tweet (dict | str): The tweet as returned by Datura.
+
+    Returns:
+        dict: The tweet `id`, `text`, `created_at` (unix seconds, or None if unknown) and `engagement`.
+    """
+    if not isinstance(tweet, dict):
+        tweet = { "text": str(tweet) }
+
+    text: str = str(tweet.get("text") or tweet.get("full_text") or "")
+    tweet_id = tweet.get("id") or tweet.get("id_str") or hashlib.sha256(text.encode()).hexdigest()
+
+    created_at: float | None = None
+    raw_created_at = tweet.get("created_at")
+
+    if isinstance(raw_created_at, str):
+        for date_format in TWEET_DATE_FORMATS:
+            try:
+                created_at = datetime.strptime(raw_created_at, date_format).timestamp()
+                break
+            except ValueError:
+                continue
+    elif isinstance(raw_created_at, (int, float)):
+        created_at = float(raw_created_at)
+
+    engagement: int = sum(int(tweet.get(field) or 0) for field in TWEET_ENGAGEMENT_FIELDS)
+
+    return {
+        "id": str(tweet_id),
+        "text": text,
+        "created_at": created_at,
+        "engagement": engagement
+    }
+
+def tweet_weight(tweet_score: dict, weighting: str, now: float) -> float:
+    """Works out how much a tweet counts towards the netuid score.
+
+    Args:
+        tweet_score (dict): The stored score record of the tweet.
+        weighting (str): "uniform", "recency" (exponential decay by age) or "engagement" (log of interactions).
+        now (float): The current unix time.
+
+    Returns:
+        float: The weight of the tweet.
+    """
+    if weighting == "recency" and tweet_score.get("created_at") is not None:
+        age_hours = max(0.0, now - tweet_score["created_at"]) / 3600
+        return 0.5 ** (age_hours / TWEET_RECENCY_HALF_LIFE_HOURS)
+
+    if weighting == "engagement":
+        return 1 + math.log1p(tweet_score.get("engagement", 0))
+
+    return 1.0
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimates how many model tokens a text takes, at about four characters per token.
+
+    Args:
+        text (str): The text to estimate.
+
+    Returns:
+        int: The estimated token count.
+    """
+    return len(text) // 4 + 1
+
+def build_prompt_chunks(tweets: list[dict], token_budget: int) -> list[tuple[list[dict], list[str]]]:
+    """Packs tweets into chunks that each fit the token budget.
+
+    Only the tweet text goes into the prompt, one numbered tweet per line, and a tweet longer than the whole budget is
+    cut down to fit.
+
+    Args:
+        tweets (list[dict]): The normalized tweets to pack.
+        token_budget (int): The most tokens the tweets of one chunk may take.
+
+    Returns:
+        list[tuple[list[dict], list[str]]]: The tweets of each chunk and the line to score for each of them.
+    """
+    chunks: list[tuple[list[dict], list[str]]] = []
+    chunk_tweets: list[dict] = []
+    chunk_lines: list[str] = []
+    chunk_tokens = 0
+
+    for tweet in tweets:
+        line = " ".join(tweet["text"].split())[:token_budget * 4]
+        # The line number and its separator take about one more token
+        line_tokens = estimate_tokens(line) + 1
+
+        if len(chunk_tweets) > 0 and chunk_tokens + line_tokens > token_budget:
+            chunks.append((chunk_tweets, chunk_lines))
+            chunk_tweets, chunk_lines, chunk_tokens = [], [], 0
+
+        chunk_tweets.append(tweet)
+        chunk_lines.append(line)
+        chunk_tokens += line_tokens
+
+    if len(chunk_tweets) > 0:
+        chunks.append((chunk_tweets, chunk_lines))
+
+    return chunks
+
+async def score_recent_tweets_async(netuid: int) -> dict | None:
+    """Scores the recent tweets about the given netuid and reports how confident the score is.
+
+    Each tweet is scored once and its score stored by tweet ID, so only tweets not seen before cost an LLM call. New
+    tweets are packed into chunks that fit SENTIMENT_CHUNK_TOKEN_BUDGET and the chunks are scored concurrently, the
+    model returning one score per tweet of a chunk. The netuid score is the weighted mean over the current tweets.
+
     Args:
         netuid (int): The netuid to search for.
 
     Returns:
-        float | None: The sentiment score, or None if the score is out of range or the request fails.
+        dict | None: The `score`, a `confidence` from 0 to 1 (the share of tweets that could be scored, reduced when the
+            scores disagree) and the `tweets`/`scored` counts, or None if nothing could be scored.
     """
-    recent_tweets = search_recent_tweets(netuid)
+    recent_tweets = await search_recent_tweets_async(netuid)
 
     if recent_tweets is None or len(recent_tweets) == 0:
         return None
 
-    recent_tweets_string: str = ""
+    tweets: dict[str, dict] = {}
+
     for tweet in recent_tweets:
-        recent_tweets_string += f"{tweet}\n"
+        normalized_tweet = normalize_tweet(tweet)
+
+        if len(normalized_tweet["text"].strip()) > 0:
+            tweets[normalized_tweet["id"]] = normalized_tweet
+
+    if len(tweets) == 0:
+        return None
+
+    tweet_scores: dict[str, dict] = await tao_redis_instance.get_tweet_scores(netuid, list(tweets))
+    new_tweets: list[dict] = [tweet for tweet_id, tweet in tweets.items() if tweet_id not in tweet_scores]
+    chunks = build_prompt_chunks(new_tweets, SENTIMENT_CHUNK_TOKEN_BUDGET)
+
+    logger.info(f"Scoring {len(new_tweets)} new tweets out of {len(tweets)} in {len(chunks)} chunks for netuid {netuid}.")
+
+    semaphore = asyncio.Semaphore(TWEET_SCORING_CONCURRENCY)
 
-    sentiment_score: float = perform_sentiment_analysis(recent_tweets_string)
+    async def score_chunk(chunk_lines: list[str]) -> list[float | None]:
+        async with semaphore:
+            return await perform_batch_sentiment_analysis_async(chunk_lines)
 
-    return sentiment_score
\ No newline at end of file
+    chunk_scores = await asyncio.gather(*[score_chunk(chunk_lines) for _, chunk_lines in chunks])
+
+    # A tweet the model skipped stays unscored, so it is tried again on the next run
+    new_tweet_scores: dict[str, dict] = {
+        tweet["id"]: { "score": tweet_score, "created_at": tweet["created_at"], "engagement": tweet["engagement"] }
+        for (chunk_tweets, _), scores in zip(chunks, chunk_scores)
+        for tweet, tweet_score in zip(chunk_tweets, scores) if tweet_score is not None
+    }
+
+    await tao_redis_instance.set_tweet_scores(netuid, new_tweet_scores)
+    tweet_scores.update(new_tweet_scores)
+
+    if len(tweet_scores) == 0:
+        return None
+
+    now = time.time()
+    total_weight: float = 0
+    weighted_score: float = 0
+    weighted_square: float = 0
+
+    for tweet_score in tweet_scores.values():
+        weight = tweet_weight(tweet_score, TWEET_WEIGHTING, now)
+        total_weight += weight
+        weighted_score += weight * tweet_score["score"]
+        weighted_square += weight * tweet_score["score"] ** 2
+
+    if total_weight == 0:
+        return None
+
+    sentiment_score: float = weighted_score / total_weight
+    deviation: float = math.sqrt(max(0.0, weighted_square / total_weight - sentiment_score ** 2))
+    confidence: float = len(tweet_scores) / len(tweets) * (1 - min(1.0, deviation / 100))
+
+    logger.info(f"Sentiment score for netuid {netuid}: {sentiment_score} (confidence {confidence:.2f}) from {len(tweet_scores)} tweets.")
+
+    return {
+        "score": sentiment_score,
+        "confidence": confidence,
+        "tweets": len(tweets),
+        "scored": len(tweet_scores)
+    }
+
+async def sentiment_analysis_on_recent_tweets_async(netuid: int) -> float | None:
+    """Performs sentiment analysis on the recent tweets about the given netuid.
+
+    Args:
+        netuid (int): The netuid to search for.
+
+    Returns:
+        float | None: The sentiment score, or None if the score is out of range or the request fails.
+    """
+    result = await score_recent_tweets_async(netuid)
+
+    return result["score"] if result is not None else None
+
+# The sync functions run on the shared background loop so the pooled sessions survive between calls
+def search_recent_tweets(netuid: int) -> dict | None:
+    """Sync wrapper around `search_recent_tweets_async`."""
+    return tao_event_loop.run(search_recent_tweets_async(netuid))
+
+def perform_sentiment_analysis(text: str) -> float | None:
+    """Sync wrapper around `perform_sentiment_analysis_async`."""
+    return tao_event_loop.run(perform_sentiment_analysis_async(text))
+
+def score_recent_tweets(netuid: int) -> dict | None:
+    """Sync wrapper around `score_recent_tweets_async`."""
+    return tao_event_loop.run(score_recent_tweets_async(netuid))
+
+def sentiment_analysis_on_recent_tweets(netuid: int) -> float | None:
+    """Sync wrapper around `sentiment_analysis_on_recent_tweets_async`."""
+    return tao_event_loop.run(sentiment_analysis_on_recent_tweets_async(netuid))
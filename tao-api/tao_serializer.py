@@ -0,0 +1,119 @@
+# Imports
+from typing import Any
+from fastapi.responses import Response
+import json
+import zlib
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Configuration
+SERIALIZER_VERSION = 1
+SERIALIZER_FORMATS = ("json", "msgpack")
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_LEVEL = 1
+
+# Every serialized value starts with one of these, so compressed and uncompressed values can share a key prefix
+RAW_HEADER = b"\x00"
+ZLIB_HEADER = b"\x01"
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def json_dumps(obj: Any) -> bytes:
+    """Encodes a value as compact JSON, with orjson when it is installed.
+
+    Args:
+        obj (Any): The value to encode.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def json_loads(data: bytes | str) -> Any:
+    """Decodes a JSON document, with orjson when it is installed.
+
+    Args:
+        data (bytes | str): The JSON document.
+
+    Returns:
+        Any: The decoded value.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+class TaoSerializer:
+    def __init__(self, format: str = "json", compression: bool = False, compression_min_bytes: int = COMPRESSION_MIN_BYTES, compression_level: int = COMPRESSION_LEVEL) -> None:
+        if format not in SERIALIZER_FORMATS:
+            raise ValueError(f"Unknown serializer format {format}, must be one of {', '.join(SERIALIZER_FORMATS)}")
+
+        if format == "msgpack" and msgpack is None:
+            logger.warning("msgpack is not installed, falling back to JSON values.")
+            format = "json"
+
+        self.format = format
+        self.compression = compression
+        self.compression_min_bytes = compression_min_bytes
+        self.compression_level = compression_level
+
+        # Part of every key holding serialized values, so a new format starts on fresh keys while the old ones expire
+        self.prefix = f"v{SERIALIZER_VERSION}.{format}"
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serializes a value, compressing it when compression is on and the value is large enough to be worth it.
+
+        Args:
+            obj (Any): The value to serialize.
+
+        Returns:
+            bytes: The serialized value.
+        """
+        data = msgpack.packb(obj) if self.format == "msgpack" else json_dumps(obj)
+
+        if self.compression and len(data) >= self.compression_min_bytes:
+            return ZLIB_HEADER + zlib.compress(data, self.compression_level)
+
+        return RAW_HEADER + data
+
+    def loads(self, data: bytes) -> Any:
+        """Deserializes a value written by `dumps`.
+
+        Args:
+            data (bytes): The serialized value.
+
+        Returns:
+            Any: The value.
+        """
+        header, payload = data[:1], data[1:]
+
+        if header == ZLIB_HEADER:
+            payload = zlib.decompress(payload)
+
+        return msgpack.unpackb(payload) if self.format == "msgpack" else json_loads(payload)
+
+class TaoJSONResponse(Response):
+    """JSON response rendered with orjson when it is installed.
+
+    Returning it directly from an endpoint also skips FastAPI's `jsonable_encoder` pass, which dominates the cost of
+    large dividend maps.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
@@ -0,0 +1,242 @@
+# Imports
+from typing import Callable, Optional
+from async_substrate_interface import AsyncSubstrateInterface, AsyncExtrinsicReceipt
+from bittensor_wallet import Keypair
+from scalecodec.types import GenericCall
+import asyncio
+import time
+import logging
+
+# Configuration
+SIGNER_ERA_PERIOD = 64
+SIGNER_TRACK_INTERVAL_SECONDS = 6
+SIGNER_BLOCK_TIME_SECONDS = 12
+SIGNER_NONCE_ERRORS = ("outdated", "stale", "priority is too low", "already imported", "nonce")
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoSigner:
+    def __init__(self, substrate: AsyncSubstrateInterface, keypair: Keypair, era_period: int = SIGNER_ERA_PERIOD, track_interval: float = SIGNER_TRACK_INTERVAL_SECONDS) -> None:
+        self.substrate = substrate
+        self.keypair = keypair
+        self.era_period = era_period
+        self.track_interval = track_interval
+        self.lock = asyncio.Lock()
+        self.track_task: asyncio.Task | None = None
+
+        # The next nonce is handed out locally, so extrinsics never wait for each other's inclusion
+        self.next_nonce: int | None = None
+        self.pending: dict[int, dict] = {}
+        self.scanned_block: int | None = None
+        self.submitted = 0
+        self.included = 0
+        self.failed = 0
+        self.finalized = 0
+        self.dropped = 0
+        self.resyncs = 0
+
+    async def close(self):
+        """Stops tracking pending extrinsics and fails everyone still waiting on one."""
+        if self.track_task is not None:
+            self.track_task.cancel()
+            await asyncio.gather(self.track_task, return_exceptions=True)
+            self.track_task = None
+
+        for entry in self.pending.values():
+            if not entry["result"].done():
+                entry["result"].set_result((False, f"Extrinsic {entry['extrinsic_hash']} was not tracked to the end", []))
+
+        self.pending = {}
+        self.scanned_block = None
+
+    async def submit(self, call: GenericCall, wait_for_inclusion: bool = False, on_result: Optional[Callable[[bool, str, list[dict]], None]] = None) -> tuple[bool, str, list[dict]]:
+        """Signs and submits a call with the next local nonce.
+
+        Submission only waits for the transaction pool to accept the extrinsic. Several extrinsics can therefore go
+        into the same block. A nonce error resyncs the local nonce from the node and retries once. The pending
+        extrinsic is then tracked in the background until its dispatch result is known.
+
+        Args:
+            call (GenericCall): The call to submit.
+            wait_for_inclusion (bool): Whether to also wait until the extrinsic is included in a block and its dispatch
+                result is known.
+            on_result (Callable[[bool, str, list[dict]], None] | None): Called with whether the extrinsic dispatched
+                successfully, its hash or the error, and the events it triggered, once the tracker knows. Not called if
+                the extrinsic was not accepted.
+
+        Returns:
+            tuple[bool, str, list[dict]]: Whether the extrinsic was accepted, or dispatched successfully if waited for,
+                its hash or the error, and the events it triggered if waited for.
+        """
+        async with self.lock:
+            # The extrinsic cannot land in a block that already exists, so its inclusion is searched from here on
+            start_block: int = await self.substrate.get_block_number(None)
+
+            for attempt in range(2):
+                if self.next_nonce is None:
+                    await self._resync()
+
+                nonce = self.next_nonce
+
+                try:
+                    extrinsic = await self.substrate.create_signed_extrinsic(call=call, keypair=self.keypair, era={ "period": self.era_period }, nonce=nonce)
+                    receipt = await self.substrate.submit_extrinsic(extrinsic, wait_for_inclusion=False, wait_for_finalization=False)
+                except Exception as e:
+                    if attempt == 0 and any(error in str(e).lower() for error in SIGNER_NONCE_ERRORS):
+                        logger.warning(f"Nonce {nonce} was rejected, resyncing: {e}")
+                        self.next_nonce = None
+                        continue
+
+                    logger.error(f"Failed to submit extrinsic with nonce {nonce}: {e}")
+                    return False, str(e), []
+
+                break
+
+            replaced = self.pending.get(nonce)
+
+            if replaced is not None and not replaced["result"].done():
+                # A resync handed out the nonce again, so the extrinsic that had it left the pool
+                replaced["result"].set_result((False, f"Extrinsic {replaced['extrinsic_hash']} was dropped", []))
+                self.dropped += 1
+
+            self.next_nonce = nonce + 1
+            self.submitted += 1
+            self.scanned_block = start_block if self.scanned_block is None else min(self.scanned_block, start_block)
+            entry = self.pending[nonce] = {
+                "extrinsic_hash": receipt.extrinsic_hash,
+                "submitted_at": time.monotonic(),
+                "result": asyncio.get_running_loop().create_future()
+            }
+
+            if on_result is not None:
+                entry["result"].add_done_callback(lambda result: on_result(*result.result()))
+
+            if self.track_task is None or self.track_task.done():
+                self.track_task = asyncio.create_task(self._track_loop())
+
+        logger.info(f"Submitted extrinsic {receipt.extrinsic_hash} with nonce {nonce}")
+
+        if not wait_for_inclusion:
+            return True, receipt.extrinsic_hash, []
+
+        return await asyncio.shield(entry["result"])
+
+    def stats(self) -> dict[str, int | None]:
+        """Returns the signer counters.
+
+        Returns:
+            dict[str, int | None]: The next nonce, the pending count and the submitted, included, failed, finalized,
+                dropped and resync counts.
+        """
+        return {
+            "next_nonce": self.next_nonce,
+            "pending": len(self.pending),
+            "submitted": self.submitted,
+            "included": self.included,
+            "failed": self.failed,
+            "finalized": self.finalized,
+            "dropped": self.dropped,
+            "resyncs": self.resyncs
+        }
+
+    async def _resync(self):
+        # account_nextIndex counts the transaction pool too, so our own pending extrinsics are not reused
+        self.next_nonce = await self.substrate.get_account_next_index(self.keypair.ss58_address, use_cache=False)
+        self.resyncs += 1
+        logger.info(f"Resynced nonce of {self.keypair.ss58_address} to {self.next_nonce}")
+
+    async def _track_loop(self):
+        while len(self.pending) > 0:
+            await asyncio.sleep(self.track_interval)
+
+            try:
+                await self._track()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tracking pending extrinsics failed: {e}")
+
+        self.scanned_block = None
+
+    async def _track(self):
+        """Moves pending extrinsics along by comparing their nonces with the account nonce on chain.
+
+        Every extrinsic with a nonce below the best block's account nonce is included, and is resolved with its
+        dispatch result from the block it is in. Below the finalized block's account nonce it is finalized. One that
+        outlived its era without being included was dropped.
+        """
+        address = self.keypair.ss58_address
+        best_hash, finalized_hash = await asyncio.gather(self.substrate.get_chain_head(), self.substrate.get_chain_finalised_head())
+        best_nonce, finalized_nonce = await asyncio.gather(
+            self.substrate.runtime_call("AccountNonceApi", "account_nonce", [address], block_hash=best_hash),
+            self.substrate.runtime_call("AccountNonceApi", "account_nonce", [address], block_hash=finalized_hash)
+        )
+        best_nonce = getattr(best_nonce, "value", best_nonce)
+        finalized_nonce = getattr(finalized_nonce, "value", finalized_nonce)
+        expiry_seconds = (self.era_period + 1) * SIGNER_BLOCK_TIME_SECONDS
+
+        included = { entry["extrinsic_hash"]: entry for nonce, entry in self.pending.items() if nonce < best_nonce and not entry["result"].done() }
+
+        if len(included) > 0:
+            await self._resolve(included, await self.substrate.get_block_number(best_hash))
+
+        for nonce, entry in list(self.pending.items()):
+            if nonce < best_nonce and not entry["result"].done():
+                # Searched up to the best block without finding it, so another extrinsic used the nonce
+                entry["result"].set_result((False, f"Extrinsic {entry['extrinsic_hash']} was replaced by another extrinsic with nonce {nonce}", []))
+                self.dropped += 1
+
+            if nonce < finalized_nonce:
+                del self.pending[nonce]
+                self.finalized += 1
+                logger.info(f"Extrinsic {entry['extrinsic_hash']} with nonce {nonce} is finalized")
+            elif nonce >= best_nonce and time.monotonic() - entry["submitted_at"] > expiry_seconds:
+                del self.pending[nonce]
+                self.dropped += 1
+                entry["result"].set_result((False, f"Extrinsic {entry['extrinsic_hash']} was dropped", []))
+                logger.warning(f"Extrinsic {entry['extrinsic_hash']} with nonce {nonce} was dropped, resyncing")
+
+                # A gap would hold every later nonce in the future queue, so start again from the chain
+                async with self.lock:
+                    self.next_nonce = None
+
+    async def _resolve(self, included: dict[str, dict], best_block: int):
+        """Finds included extrinsics in the blocks since the last search and resolves them with their dispatch result.
+
+        Args:
+            included (dict[str, dict]): The pending entries known to be included, per extrinsic hash.
+            best_block (int): The number of the block the account nonce was read at.
+        """
+        for block_number in range(self.scanned_block + 1, best_block + 1):
+            block_hash = await self.substrate.get_block_hash(block_number)
+            block = await self.substrate.get_block(block_hash=block_hash)
+
+            for extrinsic_idx, extrinsic in enumerate(block["extrinsics"]):
+                extrinsic_hash = f"0x{extrinsic.extrinsic_hash.hex()}" if extrinsic.extrinsic_hash else None
+                entry = included.pop(extrinsic_hash, None)
+
+                if entry is None or entry["result"].done():
+                    continue
+
+                # An extrinsic in a block can still fail to dispatch, e.g. a price limit or too little balance
+                receipt = AsyncExtrinsicReceipt(self.substrate, extrinsic_hash=extrinsic_hash, block_hash=block_hash, block_number=block_number, extrinsic_idx=extrinsic_idx)
+                success: bool = await receipt.is_success
+                events: list[dict] = await receipt.triggered_events
+
+                if success:
+                    self.included += 1
+                    entry["result"].set_result((True, extrinsic_hash, events))
+                    logger.info(f"Extrinsic {extrinsic_hash} succeeded in block {block_number}")
+                else:
+                    error = await receipt.error_message
+                    self.failed += 1
+                    entry["result"].set_result((False, f"Extrinsic {extrinsic_hash} failed in block {block_number}: {error}", events))
+                    logger.warning(f"Extrinsic {extrinsic_hash} failed in block {block_number}: {error}")
+
+            self.scanned_block = block_number
+
+            if len(included) == 0:
+                return
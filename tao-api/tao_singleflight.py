@@ -0,0 +1,180 @@
+# Imports
+from typing import Optional, Callable, Awaitable, AsyncIterator
+from tao_redis import TaoRedis
+import asyncio
+import logging
+
+# Configuration
+LOCK_WAIT_TIMEOUT_SECONDS = 30
+LOCK_POLL_INTERVAL_SECONDS = 0.1
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoSingleFlight:
+    def __init__(self, tao_redis: TaoRedis, lock_wait_timeout: float = LOCK_WAIT_TIMEOUT_SECONDS, lock_poll_interval: float = LOCK_POLL_INTERVAL_SECONDS) -> None:
+        self.tao_redis = tao_redis
+        self.lock_wait_timeout = lock_wait_timeout
+        self.lock_poll_interval = lock_poll_interval
+        self.in_flight: dict[tuple[Optional[int], Optional[str]], asyncio.Future] = {}
+        self.streams: dict[tuple[Optional[int], Optional[str]], dict] = {}
+
+    async def get_tao_dividends(self, netuid: Optional[int], hotkey: Optional[str], fetch: Callable[[], Awaitable[dict[str, float]]]) -> dict[str, float]:
+        """Fetches uncached Tao Dividend values, coalescing concurrent callers into a single chain query.
+
+        Callers in this process share one future per (netuid, hotkey). The leader then takes a Redis lock so only one
+        API replica queries the chain, while the others poll the cache until the value lands.
+
+        Args:
+            netuid (int | None): The netuid to fetch the value for, or None if all netuids.
+            hotkey (str | None): The hotkey to fetch the value for, or None if all hotkeys.
+            fetch (Callable[[], Awaitable[dict[str, float]]]): Queries the chain for the value.
+
+        Returns:
+            dict[str, float]: The dividend value for specified netuid and hotkey.
+        """
+        key = (netuid, hotkey)
+        future = self.in_flight.get(key)
+
+        if future is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled rather than us, so take over the fetch
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                return await self.get_tao_dividends(netuid, hotkey, fetch)
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+
+        try:
+            dividends = await self._fetch_with_lock(netuid, hotkey, fetch)
+            future.set_result(dividends)
+            return dividends
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+
+    async def stream_tao_dividends(
+        self,
+        netuid: Optional[int],
+        hotkey: Optional[str],
+        fetch: Callable[[Callable[[bytes], None]], Awaitable[dict[str, float]]]
+    ) -> AsyncIterator[bytes]:
+        """Streams uncached Tao Dividend values while they are fetched, coalescing concurrent streams into one chain query.
+
+        The first caller starts `fetch` in the background, so a client that disconnects does not stop it for the
+        others. Every caller replays the lines emitted so far and then follows new ones. Callers of
+        `get_tao_dividends` for the same key wait for the same fetch, unless one of theirs was already in flight.
+
+        Args:
+            netuid (int | None): The netuid to fetch the value for, or None if all netuids.
+            hotkey (str | None): The hotkey to fetch the value for, or None if all hotkeys.
+            fetch (Callable[[Callable[[bytes], None]], Awaitable[dict[str, float]]]): Queries the chain for the
+                value, passing each line to stream to the given callback.
+
+        Yields:
+            bytes: The next line emitted by the fetch. If it fails before emitting any line, its error is raised.
+        """
+        key = (netuid, hotkey)
+        stream = self.streams.get(key)
+
+        if stream is None:
+            stream = self.streams[key] = { "lines": [], "changed": asyncio.Event(), "task": None }
+
+            def emit(line: bytes):
+                stream["lines"].append(line)
+                changed, stream["changed"] = stream["changed"], asyncio.Event()
+                changed.set()
+
+            future = asyncio.get_running_loop().create_future() if key not in self.in_flight else None
+
+            if future is not None:
+                self.in_flight[key] = future
+
+            async def run() -> dict[str, float]:
+                try:
+                    dividends = await fetch(emit)
+
+                    if future is not None:
+                        future.set_result(dividends)
+
+                    return dividends
+                except Exception as e:
+                    if future is not None:
+                        future.set_exception(e)
+                        future.exception()
+                    raise
+                finally:
+                    if future is not None:
+                        del self.in_flight[key]
+                    del self.streams[key]
+                    stream["changed"].set()
+
+            stream["task"] = asyncio.create_task(run())
+            # Readers only re-raise an error that came before any line, the task still owns the rest
+            stream["task"].add_done_callback(lambda task: task.cancelled() or task.exception())
+
+        index = 0
+
+        while True:
+            changed = stream["changed"]
+
+            while index < len(stream["lines"]):
+                yield stream["lines"][index]
+                index += 1
+
+            task: asyncio.Task = stream["task"]
+
+            if task.done():
+                if index == 0 and not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+                break
+
+            await changed.wait()
+
+    async def _fetch_with_lock(self, netuid: Optional[int], hotkey: Optional[str], fetch: Callable[[], Awaitable[dict[str, float]]]) -> dict[str, float]:
+        lock = self.tao_redis.tao_dividends_lock(netuid, hotkey)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.lock_wait_timeout
+
+        while not await lock.acquire(blocking=False):
+            cached_dividend = await self.tao_redis.get_tao_dividends(netuid, hotkey)
+
+            if cached_dividend is not None:
+                return cached_dividend
+
+            if loop.time() >= deadline:
+                logger.warning(f"Timed out waiting for the dividends lock on netuid {netuid} and hotkey {hotkey}, fetching anyway.")
+                return await self._fetch_and_cache(netuid, hotkey, fetch)
+
+            await asyncio.sleep(self.lock_poll_interval)
+
+        try:
+            # Another replica may have filled the cache between our miss and taking the lock
+            cached_dividend = await self.tao_redis.get_tao_dividends(netuid, hotkey)
+
+            if cached_dividend is not None:
+                return cached_dividend
+
+            return await self._fetch_and_cache(netuid, hotkey, fetch)
+        finally:
+            try:
+                await lock.release()
+            except Exception as e:
+                logger.warning(f"Failed to release the dividends lock on netuid {netuid} and hotkey {hotkey}: {e}")
+
+    async def _fetch_and_cache(self, netuid: Optional[int], hotkey: Optional[str], fetch: Callable[[], Awaitable[dict[str, float]]]) -> dict[str, float]:
+        dividends = await fetch()
+        await self.tao_redis.set_tao_dividends(dividends, netuid, hotkey)
+        return dividends
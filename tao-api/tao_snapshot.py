@@ -0,0 +1,219 @@
+# Imports
+from typing import Optional, AsyncIterator
+from tao_redis import TaoRedis
+from tao_scanner import TaoDividendScanner
+from tao_history import TaoDividendHistory
+import asyncio
+import logging
+
+# Configuration
+SNAPSHOT_POLL_INTERVAL_SECONDS = 6
+SNAPSHOT_MAX_AGE_BLOCKS = 360
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoDividendSnapshots:
+    def __init__(self, tao_redis: TaoRedis, scanner: TaoDividendScanner, poll_interval: float = SNAPSHOT_POLL_INTERVAL_SECONDS, max_age_blocks: int = SNAPSHOT_MAX_AGE_BLOCKS, history: Optional[TaoDividendHistory] = None) -> None:
+        self.tao_redis = tao_redis
+        self.scanner = scanner
+        self.history = history
+        self.poll_interval = poll_interval
+        self.max_age_blocks = max_age_blocks
+        self.refresh_task: asyncio.Task | None = None
+
+        # Only populated on the replica currently elected as the refresher
+        self.block_hash: str | None = None
+        self.head_block_hash: str | None = None
+        self.block_number: int | None = None
+        self.netuid_dividends: dict[int, dict[str, float]] = {}
+
+    def start(self):
+        """Starts following new block heads in the background."""
+        self.refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        """Stops following new block heads."""
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+            await asyncio.gather(self.refresh_task, return_exceptions=True)
+            self.refresh_task = None
+
+    async def get_tao_dividends(self, netuid: Optional[int] = None, hotkeys: Optional[list[str]] = None) -> tuple[dict[str, float], dict] | None:
+        """Fetches Tao Dividend values from the newest published snapshot.
+
+        Args:
+            netuid (int | None): The netuid to fetch the value for, or None if all netuids.
+            hotkeys (list[str] | None): The hotkeys to fetch the values for, or None if all hotkeys.
+
+        Returns:
+            tuple[dict[str, float], dict] | None: The dividend value per hotkey and the `block_hash`/`block_number` of
+                the snapshot, or None if no snapshot was published yet.
+        """
+        latest = await self.tao_redis.get_latest_snapshot()
+
+        if latest is None:
+            return None
+
+        dividends = await self.tao_redis.get_snapshot_dividends(latest["block_hash"], netuid, hotkeys)
+
+        if dividends is None:
+            return None
+
+        return dividends, latest
+
+    async def get_tao_dividends_page(
+        self,
+        netuid: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        min_dividend: Optional[float] = None,
+        descending: bool = True,
+        pinned: Optional[dict] = None
+    ) -> tuple[list[tuple[str, float]], int, dict] | None:
+        """Fetches one page of hotkeys ranked by dividend value from a published snapshot.
+
+        Args:
+            netuid (int | None): The netuid to rank the hotkeys of, or None for the aggregate of all netuids.
+            offset (int): How many ranked hotkeys to skip.
+            limit (int): How many ranked hotkeys to return at most.
+            min_dividend (float | None): The lowest dividend value to include, or None to include every hotkey.
+            descending (bool): Whether the highest dividend values come first.
+            pinned (dict | None): The `block_hash`/`block_number` of the snapshot earlier pages came from, so every
+                page is read from the same block while it is kept. None to read the newest snapshot.
+
+        Returns:
+            tuple[list[tuple[str, float]], int, dict] | None: The page of (hotkey, dividend) pairs, the number of
+                hotkeys at or above `min_dividend` and the `block_hash`/`block_number` of the snapshot, or None if no
+                snapshot was published yet.
+        """
+        for snapshot_block in [pinned, await self.tao_redis.get_latest_snapshot()]:
+            if snapshot_block is None:
+                continue
+
+            page = await self.tao_redis.get_tao_dividends_page(netuid, offset, limit, min_dividend, descending, block_hash=snapshot_block["block_hash"])
+
+            if page is not None:
+                return *page, snapshot_block
+
+        return None
+
+    async def stream_tao_dividends(self, latest: dict) -> AsyncIterator[tuple[int, dict[str, float]]]:
+        """Iterates over every netuid of a published snapshot.
+
+        Args:
+            latest (dict): The `block_hash`/`block_number` of the snapshot, as returned by `get_tao_dividends`.
+
+        Yields:
+            tuple[int, dict[str, float]]: The netuid and its dividend value per hotkey.
+        """
+        async for netuid, dividends in self.tao_redis.iter_snapshot_netuids(latest["block_hash"]):
+            yield netuid, dividends
+
+    async def _refresh_loop(self):
+        lock = self.tao_redis.snapshot_refresh_lock()
+
+        while True:
+            try:
+                if await lock.owned():
+                    await lock.reacquire()
+                elif not await lock.acquire(blocking=False):
+                    # Another replica is the refresher, forget our copy so a later takeover starts from scratch
+                    self.block_hash = None
+                    self.head_block_hash = None
+                    self.block_number = None
+                    self.netuid_dividends = {}
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                await self._refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Refreshing the dividend snapshot failed: {e}")
+
+            await asyncio.sleep(self.poll_interval)
+
+    async def _refresh(self):
+        block_hash, block_number = await self.scanner.get_block()
+
+        if block_hash == self.head_block_hash:
+            return
+
+        total_networks, changed_netuids = await self._get_changed_netuids(block_hash, block_number)
+
+        if len(changed_netuids) == 0:
+            self.head_block_hash = block_hash
+            await self._record_history()
+            return
+
+        logger.info(f"Refreshing the dividend snapshot at block {block_number} for {len(changed_netuids)} netuids.")
+
+        changed = set(changed_netuids)
+        netuid_dividends: dict[int, dict[str, float]] = {
+            netuid: {} if netuid in changed else self.netuid_dividends[netuid]
+            for netuid in range(1, total_networks + 1)
+        }
+
+        async for netuid, page_dividends in self.scanner.scan(changed_netuids, block_hash):
+            netuid_dividends[netuid].update(page_dividends)
+
+        total_dividends: dict[str, float] = {}
+
+        for dividends in netuid_dividends.values():
+            for hotkey, dividend in dividends.items():
+                total_dividends[hotkey] = total_dividends.get(hotkey, 0) + dividend
+
+        await self.tao_redis.set_snapshot(block_hash, block_number, netuid_dividends, total_dividends)
+
+        self.block_hash = block_hash
+        self.head_block_hash = block_hash
+        self.block_number = block_number
+        self.netuid_dividends = netuid_dividends
+
+        logger.info(f"Published the dividend snapshot at block {block_number}.")
+
+        await self._record_history()
+
+    async def _record_history(self):
+        """Hands the current snapshot to the history store, which keeps one per ingest interval."""
+        if self.history is None or self.block_number is None:
+            return
+
+        try:
+            await self.history.record_snapshot(self.block_number, self.netuid_dividends)
+        except Exception as e:
+            # History is best effort, a failed ingest must not hold back the next snapshot
+            logger.error(f"Storing the dividend history failed: {e}")
+
+    async def _get_changed_netuids(self, block_hash: str, block_number: int) -> tuple[int, list[int]]:
+        """Works out which netuids may have new dividends since the current snapshot.
+
+        TaoDividendsPerSubnet of a netuid only changes when its epoch runs, which resets BlocksSinceLastStep. Every
+        netuid is rebuilt when there is no snapshot yet or it is older than the max age.
+
+        Returns:
+            tuple[int, list[int]]: The total number of networks and the netuids to rebuild.
+        """
+        async with self.scanner.substrate_pool.connection() as substrate:
+            total_networks = (await substrate.query("SubtensorModule", "TotalNetworks", block_hash=block_hash)).value
+            result = await substrate.query_map(module="SubtensorModule", storage_function="BlocksSinceLastStep", block_hash=block_hash)
+
+            blocks_since_last_step: dict[int, int] = {}
+
+            async for k, v in result:
+                blocks_since_last_step[int(getattr(k, "value", k))] = int(v.value)
+
+        netuids = range(1, total_networks + 1)
+
+        if self.block_number is None or block_number - self.block_number >= self.max_age_blocks:
+            return total_networks, list(netuids)
+
+        blocks_since_snapshot = block_number - self.block_number
+
+        return total_networks, [
+            netuid for netuid in netuids
+            if netuid not in self.netuid_dividends or blocks_since_last_step.get(netuid, blocks_since_snapshot) < blocks_since_snapshot
+        ]
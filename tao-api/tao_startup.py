@@ -0,0 +1,62 @@
+# Imports
+from typing import Iterator
+from contextlib import contextmanager
+import time
+import logging
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+class TaoStartupReport:
+    def __init__(self, started_at: float) -> None:
+        self.started_at = started_at
+        self.timings: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.done = False
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Times one startup step. A failed step is recorded and re-raised.
+
+        Args:
+            name (str): The name of the step in the report.
+        """
+        step_started_at = time.perf_counter()
+
+        try:
+            yield
+        except Exception as e:
+            self.errors[name] = str(e) or type(e).__name__
+            raise
+        finally:
+            self.timings[name] = time.perf_counter() - step_started_at
+
+    def record(self, name: str, seconds: float):
+        """Records a startup step timed elsewhere.
+
+        Args:
+            name (str): The name of the step in the report.
+            seconds (float): How long the step took.
+        """
+        self.timings[name] = seconds
+
+    def finish(self):
+        """Marks startup as done and logs the report."""
+        self.done = True
+        self.timings["total"] = time.perf_counter() - self.started_at
+
+        logger.info("Startup finished: " + ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.timings.items()))
+
+    def report(self) -> dict:
+        """Returns how long each startup step took.
+
+        Returns:
+            dict: Whether startup is `done`, the seconds per step and the errors per failed step.
+        """
+        return {
+            "done": self.done,
+            "timings": { name: round(seconds, 3) for name, seconds in self.timings.items() },
+            "errors": self.errors
+        }
@@ -0,0 +1,220 @@
+# Imports
+from typing import TYPE_CHECKING, Optional, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
+import random
+import logging
+
+# Imported on first connect, the interface and its codecs are slow to load
+if TYPE_CHECKING:
+    from async_substrate_interface import AsyncSubstrateInterface
+
+# Configuration
+# Bittensor's SS58 address format, as in bittensor.core.settings, without importing bittensor for it
+SS58_FORMAT = 42
+DEFAULT_ENDPOINTS: list[str] = ["wss://entrypoint-finney.opentensor.ai:443"]
+CONNECTIONS_PER_ENDPOINT = 1
+MAX_CONCURRENCY_PER_CONNECTION = 32
+HEALTH_CHECK_INTERVAL_SECONDS = 15
+HEALTH_CHECK_TIMEOUT_SECONDS = 10
+RECONNECT_BACKOFF_BASE_SECONDS = 1
+RECONNECT_BACKOFF_MAX_SECONDS = 60
+ACQUIRE_TIMEOUT_SECONDS = 30
+DRAIN_TIMEOUT_SECONDS = 30
+
+# Configure Logger
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# Logic
+def transport_errors() -> tuple[type[Exception], ...]:
+    """Returns the errors that can mean a substrate connection itself broke.
+
+    Only evaluated once a request failed, so websockets is not imported with this module.
+
+    Returns:
+        tuple[type[Exception], ...]: The error types.
+    """
+    from websockets.exceptions import ConnectionClosed
+
+    return (ConnectionError, OSError, asyncio.TimeoutError, ConnectionClosed)
+
+class TaoSubstrateConnection:
+    def __init__(self, url: str, max_concurrency: int) -> None:
+        self.url = url
+        self.substrate: "AsyncSubstrateInterface | None" = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.healthy = False
+        self.failures = 0
+        self.reconnect_task: asyncio.Task | None = None
+        self.probe_task: asyncio.Task | None = None
+
+    async def connect(self):
+        """Opens the websocket and loads the runtime metadata once for the lifetime of this connection."""
+        from async_substrate_interface import AsyncSubstrateInterface
+
+        # ws_shutdown_timer=None keeps the websocket open between requests instead of closing it when idle
+        substrate = AsyncSubstrateInterface(self.url, ss58_format=SS58_FORMAT, ws_shutdown_timer=None)
+        await substrate.initialize()
+        self.substrate = substrate
+        self.healthy = True
+        self.failures = 0
+        logger.info(f"Connected to substrate endpoint {self.url}.")
+
+    async def close(self):
+        """Closes the underlying substrate connection."""
+        self.healthy = False
+
+        if self.substrate is not None:
+            try:
+                await self.substrate.close()
+            except Exception as e:
+                logger.warning(f"Error closing substrate endpoint {self.url}: {e}")
+            self.substrate = None
+
+class TaoSubstratePool:
+    def __init__(
+        self,
+        endpoints: Optional[list[str]] = None,
+        connections_per_endpoint: int = CONNECTIONS_PER_ENDPOINT,
+        max_concurrency_per_connection: int = MAX_CONCURRENCY_PER_CONNECTION,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS
+    ) -> None:
+        self.endpoints = endpoints if endpoints else DEFAULT_ENDPOINTS
+        self.connections: list[TaoSubstrateConnection] = [
+            TaoSubstrateConnection(url, max_concurrency_per_connection)
+            for url in self.endpoints
+            for _ in range(connections_per_endpoint)
+        ]
+        self.health_check_interval = health_check_interval
+        self.health_check_task: asyncio.Task | None = None
+        self.available = asyncio.Event()
+
+    async def start(self):
+        """Connects every pooled connection and starts the background health checks.
+
+        Connections that fail to connect are retried in the background with backoff, the pool only needs one
+        healthy connection to serve requests.
+        """
+        results = await asyncio.gather(*[connection.connect() for connection in self.connections], return_exceptions=True)
+
+        for connection, result in zip(self.connections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to connect to substrate endpoint {connection.url}: {result}")
+                self._schedule_reconnect(connection)
+
+        self._update_available()
+        self.health_check_task = asyncio.create_task(self._health_check_loop())
+
+    async def close(self):
+        """Stops the health checks and closes every pooled connection."""
+        tasks = [self.health_check_task] + [connection.reconnect_task for connection in self.connections] + [connection.probe_task for connection in self.connections]
+        tasks = [task for task in tasks if task is not None]
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*[connection.close() for connection in self.connections])
+        self._update_available()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator["AsyncSubstrateInterface"]:
+        """Borrows the least busy healthy substrate connection.
+
+        Yields:
+            AsyncSubstrateInterface: An initialized substrate connection.
+        """
+        connection = await asyncio.wait_for(self._acquire(), timeout=ACQUIRE_TIMEOUT_SECONDS)
+
+        async with connection.semaphore:
+            connection.in_flight += 1
+            connection.idle.clear()
+            try:
+                yield connection.substrate
+            except transport_errors() as e:
+                # The error may be the caller's own timeout or a slow storage query, so only a failed probe of the
+                # connection itself takes it out of the pool
+                logger.warning(f"Substrate request on {connection.url} failed, probing the connection: {e}")
+                self._schedule_probe(connection)
+                raise
+            finally:
+                connection.in_flight -= 1
+
+                if connection.in_flight == 0:
+                    connection.idle.set()
+
+    async def _acquire(self) -> TaoSubstrateConnection:
+        # Every connection can turn unhealthy between the event firing and the pick, then wait for the next one
+        while True:
+            await self.available.wait()
+            healthy = [connection for connection in self.connections if connection.healthy]
+
+            if len(healthy) > 0:
+                return min(healthy, key=lambda connection: connection.in_flight)
+
+            self._update_available()
+
+    def _update_available(self):
+        if any(connection.healthy for connection in self.connections):
+            self.available.set()
+        else:
+            self.available.clear()
+
+    def _mark_unhealthy(self, connection: TaoSubstrateConnection):
+        connection.healthy = False
+        self._update_available()
+        self._schedule_reconnect(connection)
+
+    def _schedule_probe(self, connection: TaoSubstrateConnection):
+        if not connection.healthy:
+            return
+
+        if connection.probe_task is None or connection.probe_task.done():
+            connection.probe_task = asyncio.create_task(self._probe(connection))
+
+    async def _probe(self, connection: TaoSubstrateConnection):
+        """Checks a connection with a chain head query and takes it out of the pool if the query fails."""
+        if not connection.healthy or connection.substrate is None:
+            return
+
+        try:
+            await asyncio.wait_for(connection.substrate.get_chain_head(), timeout=HEALTH_CHECK_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.error(f"Health check failed for substrate endpoint {connection.url}: {e}")
+            self._mark_unhealthy(connection)
+
+    def _schedule_reconnect(self, connection: TaoSubstrateConnection):
+        if connection.reconnect_task is None or connection.reconnect_task.done():
+            connection.reconnect_task = asyncio.create_task(self._reconnect(connection))
+
+    async def _reconnect(self, connection: TaoSubstrateConnection):
+        while True:
+            connection.failures += 1
+            backoff = min(RECONNECT_BACKOFF_MAX_SECONDS, RECONNECT_BACKOFF_BASE_SECONDS * 2 ** (connection.failures - 1))
+            await asyncio.sleep(backoff * random.uniform(0.5, 1))
+
+            # Borrowers that picked the connection before it turned unhealthy finish first, unless they hang
+            try:
+                await asyncio.wait_for(connection.idle.wait(), timeout=DRAIN_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Closing substrate endpoint {connection.url} with {connection.in_flight} requests still in flight.")
+
+            await connection.close()
+
+            try:
+                await connection.connect()
+                self._update_available()
+                return
+            except Exception as e:
+                logger.error(f"Failed to reconnect to substrate endpoint {connection.url} (attempt {connection.failures}): {e}")
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+
+            for connection in self.connections:
+                await self._probe(connection)
@@ -1,6 +1,6 @@
 
 # Imports
-from tao_celery import celery_instance, test_task
+from tao_celery_app import celery_instance
 import tao_sentiments
 import time
 import logging
@@ -37,7 +37,7 @@ class TaoTests:
     
     def can_send_task_to_celery(self):
         logger.info("Sending task to celery...")
-        result = test_task.delay()
+        result = celery_instance.send_task("tao_celery.test_task")
     
     def run_all_tests(self):
         self.sentiment_analysis_tests()
@@ -1,10 +1,15 @@
 
 # Imports
+from typing import Awaitable, Callable, Optional
 from decouple import config
 from bittensor import Wallet, Balance
 from bittensor.core import async_subtensor
+from bittensor.core.chain_data import DynamicInfo
+from tao_chain_state import TaoChainState
+from tao_signer import TaoSigner
 from bittensor.utils.balance import tao
 import traceback
+import asyncio
 import logging
 
 # Configuration
@@ -12,6 +17,8 @@ TESTNET_URL: str = "wss://test.finney.opentensor.ai:443"
 WALLET_NAME: str = config("WALLET_NAME")
 WALLET_HOTKEY: str = config("WALLET_HOTKEY")
 WALLET_PATH: str = "/app/wallets/"
+STAKE_RATE_TOLERANCE: float = 0.005
+CHAIN_STATE_BLOCK_FEED: bool = config("CHAIN_STATE_BLOCK_FEED", default=False, cast=bool)
 
 # Configure Logger
 logger = logging.getLogger(__name__)
@@ -21,36 +28,85 @@ logger.setLevel(logging.DEBUG)
 class TaoWallet:
     def __init__(self):
         self.wallet = Wallet(name=WALLET_NAME, path=WALLET_PATH, hotkey=WALLET_HOTKEY) # NOTE: Make sure coldkey is not password protected!
-        self.async_subtensor = async_subtensor.AsyncSubtensor(network=TESTNET_URL)
+        self.async_subtensor: async_subtensor.AsyncSubtensor | None = None
+        self.chain_state: TaoChainState | None = None
+        self.signer: TaoSigner | None = None
+        self.reconcile_tasks: set[asyncio.Task] = set()
 
-    async def add_stake(self, netuid: int, amount: float, hotkey: str | None) -> bool:
+    async def connect(self) -> async_subtensor.AsyncSubtensor:
+        """Connects the AsyncSubtensor, unless it is already connected.
+
+        The connection is bound to the event loop it was made on, so it should always be used from the same loop.
+
+        Returns:
+            async_subtensor.AsyncSubtensor: The connected AsyncSubtensor.
+        """
+        if self.async_subtensor is None:
+            # A shutdown timer of None keeps the websocket open between tasks instead of closing it when idle
+            subtensor = async_subtensor.AsyncSubtensor(network=TESTNET_URL, websocket_shutdown_timer=None)
+            await subtensor.initialize()
+            self.async_subtensor = subtensor
+            self.chain_state = TaoChainState(subtensor, self.wallet.coldkeypub.ss58_address)
+            self.signer = TaoSigner(subtensor.substrate, self.wallet.coldkey)
+
+            if CHAIN_STATE_BLOCK_FEED:
+                self.chain_state.start_block_feed()
+
+            logger.info(f"Connected AsyncSubtensor to {TESTNET_URL}")
+
+        return self.async_subtensor
+
+    async def close(self):
+        """Closes the AsyncSubtensor connection."""
+        # An extrinsic the signer stops tracking may still land, so it is neither retried nor counted
+        for reconcile_task in list(self.reconcile_tasks):
+            reconcile_task.cancel()
+
+        await asyncio.gather(*self.reconcile_tasks, return_exceptions=True)
+
+        if self.signer is not None:
+            await self.signer.close()
+            self.signer = None
+
+        if self.chain_state is not None:
+            await self.chain_state.close()
+            self.chain_state = None
+
+        if self.async_subtensor is not None:
+            await self.async_subtensor.close()
+            self.async_subtensor = None
+
+    async def add_stake(self, netuid: int, amount: float, hotkey: str | None, wait_for_inclusion: bool = True) -> bool:
         """Adds a stake to a subnet.
         
         Args:
             netuid (int): The netuid of the subnet to stake on.
             amount (float): The amount of TAO to stake.
             hotkey (str | None): The hotkey to stake on, or None if the subnet owner hotkey should be used.
+            wait_for_inclusion (bool): Whether to wait until the stake is included in a block and
+                succeeded, rather than only accepted by the transaction pool.
 
         Returns:
             bool: True if the stake was added successfully, False otherwise.
         """
         try:
-            subnet = await self.async_subtensor.subnet(netuid=netuid)
+            await self.connect()
+
+            # Pre-trade reads come from the chain state cache, which only goes to the chain once per block
+            subnet, wallet_balance, existential_deposit = await asyncio.gather(
+                self.chain_state.get_subnet(netuid),
+                self.chain_state.get_balance(),
+                self.chain_state.get_existential_deposit()
+            )
 
             if hotkey is None:
                 hotkey: str = subnet.owner_hotkey
             else:
                 hotkey: str = hotkey
 
-            block_hash = await self.async_subtensor.substrate.get_chain_head()
-
             amount_balance: Balance = tao(amount)
             logger.info(f"Subnet slippage for {netuid}: {subnet.slippage(amount_balance)}")
-
-            wallet_balance = await self.async_subtensor.get_balance(self.wallet.coldkeypub.ss58_address)
             logger.info(f"Wallet balance: {wallet_balance}")
-
-            existential_deposit = await self.async_subtensor.get_existential_deposit(block_hash=block_hash)
             logger.info(f"Existential deposit: {existential_deposit}")
 
             if amount_balance > wallet_balance - existential_deposit:
@@ -59,52 +115,44 @@ class TaoWallet:
 
             logger.info(f"Staking {amount} on {netuid} with hotkey {hotkey}")
 
-            success: bool = await self.async_subtensor.add_stake(
-                wallet=self.wallet,
-                netuid=netuid,
-                amount=amount_balance,
-                hotkey_ss58=hotkey,
-                wait_for_inclusion=True,
-                wait_for_finalization=False,
-                safe_staking=True,
-                allow_partial_stake=False
-            )
+            success, message, _ = await self.signer.submit(await self._compose_add_stake(subnet, hotkey, amount_balance), wait_for_inclusion)
+
             if success:
+                self.chain_state.record_stake(netuid, hotkey, amount_balance)
                 logger.info(f"Successfully staked {amount} on netuid {netuid}")
             else:
-                logger.info(f"Failed to stake {amount} on netuid {netuid}")
+                logger.info(f"Failed to stake {amount} on netuid {netuid}: {message}")
             return success
         except Exception as e:
             logger.error(f"Error adding stake: {e}")
             logger.error(traceback.format_exc())
             return False
     
-    async def unstake(self, netuid: int, amount: float, hotkey: str | None) -> bool:
+    async def unstake(self, netuid: int, amount: float, hotkey: str | None, wait_for_inclusion: bool = True) -> bool:
         """Unstakes a stake from a subnet.
         
         Args:
             netuid (int): The netuid of the subnet to unstake from.
             amount (float): The amount of TAO to unstake.
             hotkey (str | None): The hotkey to unstake from, or None if the subnet owner hotkey should be used.
+            wait_for_inclusion (bool): Whether to wait until the unstake is included in a block and
+                succeeded, rather than only accepted by the transaction pool.
 
         Returns:
             bool: True if the unstake was successful, False otherwise.
         """
         try:
-            subnet = await self.async_subtensor.subnet(netuid=netuid)
+            await self.connect()
 
             if hotkey is None:
+                subnet = await self.chain_state.get_subnet(netuid)
                 hotkey: str = subnet.owner_hotkey
             else:
                 hotkey: str = hotkey
 
             to_unstake_balance: Balance = tao(amount)
 
-            staked_amount = await self.async_subtensor.get_stake(
-                netuid=netuid,
-                coldkey_ss58=self.wallet.coldkeypub.ss58_address,
-                hotkey_ss58=hotkey
-            )
+            staked_amount = await self.chain_state.get_stake(netuid, hotkey)
             logger.info(f"Staked amount: {staked_amount}")
 
             if staked_amount < to_unstake_balance:
@@ -113,25 +161,252 @@ class TaoWallet:
             
             logger.info(f"Unstaking {amount} on {netuid} with hotkey {hotkey}")
 
-            success: bool = await self.async_subtensor.unstake(
-                wallet=self.wallet,
-                netuid=netuid,
-                amount=to_unstake_balance,
-                hotkey_ss58=hotkey,
-                wait_for_inclusion=True,
-                wait_for_finalization=False,
-                safe_staking=False,
-                allow_partial_stake=False
-            )
+            success, message, _ = await self.signer.submit(await self._compose_remove_stake(netuid, hotkey, to_unstake_balance), wait_for_inclusion)
+
             if success:
+                self.chain_state.record_unstake(netuid, hotkey, to_unstake_balance)
                 logger.info(f"Successfully unstaked {amount} on netuid {netuid}")
             else:
-                logger.info(f"Failed to unstake {amount} on netuid {netuid}")
+                logger.info(f"Failed to unstake {amount} on netuid {netuid}: {message}")
             return success
         except Exception as e:
             logger.error(f"Error unstaking: {e}")
             return False
-    
+
+    async def stake_batch(
+        self,
+        stake_deltas: dict[tuple[int, str | None], float],
+        wait_for_inclusion: bool = True,
+        on_dispatched: Optional[Callable[[dict[tuple[int, str | None], bool]], Awaitable[None]]] = None
+    ) -> dict[tuple[int, str | None], bool]:
+        """Stakes and unstakes several net amounts with a single extrinsic.
+
+        The calls go out as one `Utility.force_batch`, so there is one inclusion wait and one fee for the whole batch.
+        Unlike `batch_all`, a failing call (e.g. a stake outside its price limit) does not revert the others, each call's
+        result is read from its `ItemCompleted` or `ItemFailed` event. Stakes are price-limited like `add_stake`. If
+        the batch cannot be composed, submitted or dispatched, every call is submitted on its own instead.
+
+        Args:
+            stake_deltas (dict[tuple[int, str | None], float]): The net amount of TAO to stake per (netuid, hotkey),
+                negative to unstake. A hotkey of None stakes on the subnet owner hotkey.
+            wait_for_inclusion (bool): Whether to wait until the batch is included in a block and
+                succeeded, rather than only accepted by the transaction pool.
+            on_dispatched (Callable[[dict[tuple[int, str | None], bool]], Awaitable[None]] | None): If not waiting for
+                inclusion, awaited in the background with whether each submitted (netuid, hotkey) dispatched
+                successfully, once the signer tracked every submitted extrinsic into a block.
+
+        Returns:
+            dict[tuple[int, str | None], bool]: Whether the stake or unstake succeeded, or was accepted if not waiting
+                for inclusion, per (netuid, hotkey) of `stake_deltas`.
+        """
+        results: dict[tuple[int, str | None], bool] = { key: False for key in stake_deltas }
+
+        try:
+            await self.connect()
+            netuids = sorted({ netuid for netuid, _ in stake_deltas })
+            subnets = dict(zip(netuids, await asyncio.gather(*[self.chain_state.get_subnet(netuid) for netuid in netuids])))
+
+            # Owner hotkey intents can net with explicit intents on the same hotkey
+            net_deltas: dict[tuple[int, str], float] = {}
+            sources: dict[tuple[int, str], list[tuple[int, str | None]]] = {}
+
+            for (netuid, hotkey), amount in stake_deltas.items():
+                key = (netuid, hotkey if hotkey is not None else subnets[netuid].owner_hotkey)
+                net_deltas[key] = net_deltas.get(key, 0.0) + amount
+                sources.setdefault(key, []).append((netuid, hotkey))
+
+            net_deltas = { key: amount for key, amount in net_deltas.items() if tao(abs(amount)).rao > 0 }
+
+            for key in sources:
+                if key not in net_deltas:
+                    # Fully netted out, nothing to submit
+                    for source in sources[key]:
+                        results[source] = True
+
+            if len(net_deltas) == 0:
+                logger.info("Stake intents netted out to nothing, not going to stake.")
+                return results
+
+            unstake_keys = [key for key, amount in net_deltas.items() if amount < 0]
+            wallet_balance, existential_deposit, *staked_amounts = await asyncio.gather(
+                self.chain_state.get_balance(),
+                self.chain_state.get_existential_deposit(),
+                *[self.chain_state.get_stake(netuid, hotkey) for netuid, hotkey in unstake_keys]
+            )
+            logger.info(f"Wallet balance: {wallet_balance}, existential deposit: {existential_deposit}")
+
+            calls = []
+            submitted: list[tuple[int, str, Balance]] = []
+
+            # Unstakes go first, they never depend on the free balance
+            for (netuid, hotkey), staked_amount in zip(unstake_keys, staked_amounts):
+                to_unstake_balance: Balance = tao(abs(net_deltas[(netuid, hotkey)]))
+
+                if staked_amount < to_unstake_balance:
+                    logger.info(f"Not enough staked amount to unstake {to_unstake_balance} on {netuid}")
+                    continue
+
+                calls.append(await self._compose_remove_stake(netuid, hotkey, to_unstake_balance))
+                submitted.append((netuid, hotkey, -to_unstake_balance))
+
+            available_balance: Balance = wallet_balance - existential_deposit
+
+            for (netuid, hotkey), amount in net_deltas.items():
+                if amount < 0:
+                    continue
+
+                amount_balance: Balance = tao(amount)
+
+                if amount_balance > available_balance:
+                    logger.info(f"Not enough balance to stake {amount} on {netuid}")
+                    continue
+
+                available_balance -= amount_balance
+                calls.append(await self._compose_add_stake(subnets[netuid], hotkey, amount_balance))
+                submitted.append((netuid, hotkey, amount_balance))
+
+            if len(calls) == 0:
+                return results
+
+            # Resolved with each call's dispatch result by the signer's tracker, even when not waiting for it here
+            dispatched: list[asyncio.Future] = [asyncio.get_running_loop().create_future() for _ in calls]
+
+            if len(calls) == 1:
+                success, message, _ = await self.signer.submit(calls[0], wait_for_inclusion, on_result=self._dispatch_callback(dispatched, batched=False))
+                call_results = [success]
+            else:
+                try:
+                    # force_batch dispatches every call even if another one fails, and reports each with its own event
+                    batch_call = await self.async_subtensor.substrate.compose_call(
+                        call_module="Utility",
+                        call_function="force_batch",
+                        call_params={ "calls": calls }
+                    )
+                    success, message, events = await self.signer.submit(batch_call, wait_for_inclusion, on_result=self._dispatch_callback(dispatched, batched=True))
+                except Exception as e:
+                    success, message, events = False, str(e), []
+
+                if success:
+                    call_results = self._batch_call_results(events, len(calls)) if wait_for_inclusion else [True] * len(calls)
+                else:
+                    # Nothing in the batch was dispatched, so every call can still go out on its own
+                    logger.info(f"Failed to submit {len(calls)} stake calls in one extrinsic ({message}), submitting them one by one")
+                    call_results = []
+
+                    for i, call in enumerate(calls):
+                        call_success, message, _ = await self.signer.submit(call, wait_for_inclusion, on_result=self._dispatch_callback(dispatched[i:i + 1], batched=False))
+                        call_results.append(call_success)
+
+                        if not call_success:
+                            logger.info(f"Failed to submit stake call: {message}")
+
+            for (netuid, hotkey, amount_balance), call_success in zip(submitted, call_results):
+                if call_success:
+                    self._record_submitted(netuid, hotkey, amount_balance)
+                else:
+                    logger.info(f"Stake call of {amount_balance} on netuid {netuid} with hotkey {hotkey} failed")
+
+                for source in sources[(netuid, hotkey)]:
+                    results[source] = call_success
+
+            logger.info(f"{sum(call_results)} of {len(calls)} stake calls succeeded")
+
+            # Calls that were not accepted never dispatch, they already count as failed in the results
+            accepted = [(future, call) for future, call, call_success in zip(dispatched, submitted, call_results) if call_success]
+
+            if not wait_for_inclusion and on_dispatched is not None and len(accepted) > 0:
+                reconcile_task = asyncio.create_task(self._reconcile(accepted, sources, on_dispatched))
+                self.reconcile_tasks.add(reconcile_task)
+                reconcile_task.add_done_callback(self.reconcile_tasks.discard)
+
+            return results
+        except Exception as e:
+            logger.error(f"Error submitting stake batch: {e}")
+            logger.error(traceback.format_exc())
+            return results
+
+    async def _compose_add_stake(self, subnet: DynamicInfo, hotkey: str, amount_balance: Balance):
+        # Price-limited like bittensor's safe staking, so a moving pool cannot fill us far off the quoted price
+        base_price = subnet.price.tao
+        price_with_tolerance = base_price if subnet.netuid == 0 else base_price * (1 + STAKE_RATE_TOLERANCE)
+
+        return await self.async_subtensor.substrate.compose_call(
+            call_module="SubtensorModule",
+            call_function="add_stake_limit",
+            call_params={
+                "hotkey": hotkey,
+                "netuid": subnet.netuid,
+                "amount_staked": amount_balance.rao,
+                "limit_price": tao(price_with_tolerance).rao,
+                "allow_partial": False
+            }
+        )
+
+    async def _compose_remove_stake(self, netuid: int, hotkey: str, amount_balance: Balance):
+        return await self.async_subtensor.substrate.compose_call(
+            call_module="SubtensorModule",
+            call_function="remove_stake",
+            call_params={ "hotkey": hotkey, "netuid": netuid, "amount_unstaked": amount_balance.rao }
+        )
+
+    def _batch_call_results(self, events: list[dict], calls: int) -> list[bool]:
+        """Reads whether each call of a dispatched `force_batch` succeeded from its `Utility` item events.
+
+        Args:
+            events (list[dict]): The events the batch extrinsic triggered.
+            calls (int): How many calls the batch holds.
+
+        Returns:
+            list[bool]: Whether each call succeeded, in batch order. A call without an item event counts as failed.
+        """
+        items = [
+            event["event"]["event_id"] == "ItemCompleted"
+            for event in events
+            if event["event"]["module_id"] == "Utility" and event["event"]["event_id"] in ("ItemCompleted", "ItemFailed")
+        ]
+
+        if len(items) != calls:
+            logger.warning(f"Stake batch of {calls} calls triggered {len(items)} item events")
+
+        return (items + [False] * calls)[:calls]
+
+    def _dispatch_callback(self, dispatched: list[asyncio.Future], batched: bool) -> Callable[[bool, str, list[dict]], None]:
+        def on_result(success: bool, message: str, events: list[dict]):
+            call_results = self._batch_call_results(events, len(dispatched)) if batched and success else [success] * len(dispatched)
+
+            for future, call_success in zip(dispatched, call_results):
+                if not future.done():
+                    future.set_result(call_success)
+
+        return on_result
+
+    async def _reconcile(
+        self,
+        accepted: list[tuple[asyncio.Future, tuple[int, str, Balance]]],
+        sources: dict[tuple[int, str], list[tuple[int, str | None]]],
+        on_dispatched: Callable[[dict[tuple[int, str | None], bool]], Awaitable[None]]
+    ):
+        call_results: list[bool] = await asyncio.gather(*[future for future, _ in accepted])
+        results: dict[tuple[int, str | None], bool] = {}
+
+        for (_, (netuid, hotkey, amount_balance)), call_success in zip(accepted, call_results):
+            if not call_success:
+                logger.warning(f"Stake call of {amount_balance} on netuid {netuid} with hotkey {hotkey} failed to dispatch")
+
+            for source in sources[(netuid, hotkey)]:
+                results[source] = call_success
+
+        try:
+            await on_dispatched(results)
+        except Exception as e:
+            logger.error(f"Failed to reconcile dispatched stake calls: {e}")
+
+    def _record_submitted(self, netuid: int, hotkey: str, amount_balance: Balance):
+        if amount_balance.rao > 0:
+            self.chain_state.record_stake(netuid, hotkey, amount_balance)
+        else:
+            self.chain_state.record_unstake(netuid, hotkey, -amount_balance)
+
     # async def test_stakes(self):
     #     await self.add_stake(netuid=0, amount=0.03)
     #     await self.unstake(netuid=0, amount=0.01)
\ No newline at end of file